@@ -0,0 +1,2 @@
+# 키워드 분석 파이프라인 (수집 → 정제 → 정규화/중복제거 → 분류 → 집계)
+# Streamlit 대시보드와 배치 실행에서 공통으로 사용합니다.
@@ -0,0 +1,4 @@
+from keyword_analysis.cli import main
+
+if __name__ == '__main__':
+    raise SystemExit(main())
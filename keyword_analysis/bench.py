@@ -0,0 +1,256 @@
+import datetime
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from keyword_analysis import pipeline, rules, shard, synthetic
+from keyword_analysis.export import get_excel_download_link, write_sheet
+
+# 단계별 벤치마크 (합성 데이터 1천~2백만 행)
+# 단계마다 실행 시간(반복 중 최솟값)과 tracemalloc 최대 할당량, 결과 크기를 측정해 JSON 으로 저장하고
+# 이전 결과(기준선)와 비교해 느려지거나 메모리가 늘어난 단계를 표시합니다.
+#   python -m keyword_analysis.bench --rows 1k 10k 100k --save bench.json
+#   python -m keyword_analysis.bench --rows 1k 10k 100k --compare bench.json
+
+BENCH_VERSION = 3
+stage_names = [
+    'read_excel',            # 엑셀 파싱 (pipeline.read_workbook)
+    'clean_numeric',         # 숫자/클릭률 변환 (pipeline.clean_metrics)
+    'normalize_keyword',     # 키워드 정규화 + 파일 내 중복 제거
+    'merge',                 # 파일 간 통합/중복 제거 (pipeline.merge_frames)
+    'classification',        # 키워드 분류 + 질적 분류 (pipeline.classify_keywords)
+    'classify_serial',       # 고유 키워드 분류, 한 프로세스 (KeywordClassifier.classify)
+    'classify_sharded',      # 고유 키워드 분류, 여러 프로세스 (shard.classify_sharded)
+    'classification_stats',  # 질적 분류별 통계 (pipeline.aggregate_stats)
+    'category_render',       # 대시보드 7번 분류별 색인 (행 위치 + 지표별 상위 10개)
+    'category_resort',       # 정렬 기준 4가지로 분류별 표 조회
+    'excel_export',          # 전체 엑셀 내보내기 (get_excel_download_link)
+]
+
+
+# 대시보드 "분류별 샘플 키워드" 섹션과 같은 연산 (화면 출력 제외)
+# index 가 없으면 색인부터 만들고, 있으면 정렬 기준만 바꾼 재실행처럼 위치 조회만 합니다.
+def render_category_tables(final_df, sort_column='총 검색수', index=None):
+    display_columns = ['연관키워드', '키워드_상세분류', '총 검색수', '총 클릭수', '월평균클릭률(PC)', '월평균노출 광고수']
+    index = index or pipeline.category_index(final_df)
+    tables = {}
+    for category in list(rules.load_ruleset().qualitative_groups) + ['미분류']:
+        if category not in index['rows']:
+            continue
+        metrics = list(index['means'][category].values())
+        for key in [(category, label) for label in pipeline.split_categories.get(category, [])] or [category]:
+            if key in index['rows']:
+                tables[key] = (metrics, final_df.take(index['top'][(key, sort_column)])[display_columns])
+    return tables
+
+
+def _frame_mb(value):
+    if isinstance(value, pd.DataFrame):
+        return value.memory_usage(deep=True).sum() / 1024 / 1024
+    if isinstance(value, list) and value and all(isinstance(v, pd.DataFrame) for v in value):
+        return sum(_frame_mb(v) for v in value)
+    return None
+
+
+# 단계 하나 실행: (결과, 측정값)
+def _measure(func, repeat, memory):
+    seconds = []
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+    measured = {'seconds': round(min(seconds), 6)}
+    if memory:
+        # 추적 중에는 느려지므로 시간 측정과 별도로 한 번 더 실행
+        tracemalloc.start()
+        func()
+        measured['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 3)
+        tracemalloc.stop()
+    output_mb = _frame_mb(result)
+    if output_mb is not None:
+        measured['output_mb'] = round(output_mb, 3)
+    return result, measured
+
+
+def run_size(rows, files=1, duplicate_ratio=0.1, repeat=1, memory=True, max_read_rows=100000, seed=0, log=None, classify_workers=None):
+    log = log or (lambda message: None)
+    raw_frames = synthetic.generate_exports(rows, files, seed=seed, duplicate_ratio=duplicate_ratio)
+    stages = {}
+
+    def record(name, func):
+        result, measured = _measure(func, repeat, memory)
+        stages[name] = measured
+        log(f"  {name:<22} {measured['seconds']:>9.3f}s" + (f"  peak {measured['peak_mb']:,.1f}MB" if 'peak_mb' in measured else ''))
+        return result
+
+    if rows <= max_read_rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            blobs = []
+            for i, df in enumerate(raw_frames):
+                path = os.path.join(tmp, f'{i}.xlsx')
+                write_sheet(df, path)
+                with open(path, 'rb') as f:
+                    blobs.append(f.read())
+        raw_frames = record('read_excel', lambda: [pipeline.read_workbook(data) for data in blobs])
+    else:
+        stages['read_excel'] = {'skipped': f'{max_read_rows:,}행 초과 (--max-read-rows)'}
+
+    cleaned = record('clean_numeric', lambda: [pipeline.clean_metrics(df) for df in raw_frames])
+
+    def normalize():
+        frames = []
+        for df in cleaned:
+            df = df.copy()
+            df['연관키워드'] = pipeline.normalize_keywords(df['연관키워드'])
+            frames.append(df.drop_duplicates(subset=['연관키워드']))
+        return frames
+
+    normalized = record('normalize_keyword', normalize)
+    combined_df = record('merge', lambda: pipeline.merge_frames(normalized))
+    final_df = record('classification', lambda: pipeline.classify_keywords(combined_df))
+
+    # 분류만 따로: 한 프로세스 vs 여러 프로세스 (결과가 같은지 확인하고 속도 향상 비율 기록)
+    classifier = pipeline.get_classifier()
+    keywords = np.asarray(combined_df['연관키워드'], dtype=object)
+    workers = classify_workers or shard.classify_workers or pipeline.default_workers()
+    serial = record('classify_serial', lambda: classifier.classify(keywords))
+    min_keywords, shard.shard_min_keywords = shard.shard_min_keywords, 0
+    try:
+        shard.classify_sharded(classifier, keywords[:workers], workers)  # 작업 프로세스 미리 시작
+        sharded = record('classify_sharded', lambda: shard.classify_sharded(classifier, keywords, workers))
+    finally:
+        shard.shard_min_keywords = min_keywords
+    if not ((serial[0] == sharded[0]).all() and (serial[1] == sharded[1]).all()):
+        raise AssertionError('여러 프로세스 분류 결과가 한 프로세스 결과와 다릅니다')
+    speedup = stages['classify_serial']['seconds'] / max(stages['classify_sharded']['seconds'], 1e-9)
+    log(f'  분류 {workers}개 프로세스: {speedup:.2f}배')
+    record('classification_stats', lambda: pipeline.aggregate_stats(final_df))
+    index = record('category_render', lambda: pipeline.category_index(final_df))
+    record('category_resort', lambda: [render_category_tables(final_df, col, index) for col in pipeline.sample_metrics])
+    if len(final_df) <= synthetic.EXCEL_MAX_ROWS:
+        record('excel_export', lambda: get_excel_download_link(final_df, 'bench.xlsx'))
+    else:
+        stages['excel_export'] = {'skipped': '엑셀 시트 최대 행 수 초과'}
+
+    return {
+        'rows': rows,
+        'files': files,
+        'duplicate_ratio': duplicate_ratio,
+        'keywords': len(final_df),
+        'final_mb': round(pipeline.memory_mb(final_df), 3),
+        'classify_workers': workers,
+        'classify_speedup': round(speedup, 3),
+        'stages': stages,
+    }
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'pyarrow': pa.__version__,
+    }
+
+
+# 기준선과 비교 → 회귀 목록 [(행 수, 단계, 항목, 기준값, 현재값)]
+# 시간은 tolerance 비율과 min_seconds 를 모두 넘을 때, 메모리는 tolerance 비율과 1MB 를 넘을 때 회귀로 봅니다.
+# 벤치마크 버전(측정 단계/방식)이 다르면 비교하지 않음 (ValueError)
+def compare(baseline, current, tolerance=0.25, min_seconds=0.05):
+    if baseline.get('version') != current.get('version'):
+        raise ValueError(
+            f"벤치마크 버전이 다른 기준선과는 비교할 수 없습니다 (기준선 v{baseline.get('version')}, 현재 v{current.get('version')})"
+        )
+    base_runs = {(run['rows'], run['files']): run for run in baseline['results']}
+    regressions = []
+    for run in current['results']:
+        base = base_runs.get((run['rows'], run['files']))
+        if base is None:
+            continue
+        for stage, measured in run['stages'].items():
+            before = base['stages'].get(stage, {})
+            for metric, floor in (('seconds', min_seconds), ('peak_mb', 1.0)):
+                if metric in measured and metric in before:
+                    old, new = before[metric], measured[metric]
+                    if new > old * (1 + tolerance) and new - old > floor:
+                        regressions.append((run['rows'], stage, metric, old, new))
+    return regressions
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m keyword_analysis.bench', description='파이프라인 단계별 벤치마크')
+    parser.add_argument('--rows', nargs='+', default=['1k', '10k', '100k'], help='행 수 목록 (예: 1k 10k 100k 2M)')
+    parser.add_argument('--files', type=int, default=2, help='행을 나눌 파일 수 (파일 간 중복 포함)')
+    parser.add_argument('--duplicates', type=float, default=0.1, help='파일 간 중복 키워드 비율')
+    parser.add_argument('--repeat', type=int, default=1, help='단계별 반복 횟수 (최솟값 기록)')
+    parser.add_argument('--no-memory', action='store_true', help='메모리 측정 생략')
+    parser.add_argument('--max-read-rows', default='100k', help='엑셀 파싱 단계를 측정할 최대 행 수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compact', action='store_true', help='메모리 절약 형식으로 측정 (KEYWORD_DASHBOARD_COMPACT=1 과 같음)')
+    parser.add_argument('--classify-workers', type=int, default=None, help='classify_sharded 단계의 분류 프로세스 수 (기본: 작업 프로세스 수)')
+    parser.add_argument('--save', metavar='JSON', help='결과를 JSON 으로 저장')
+    parser.add_argument('--compare', metavar='JSON', help='기준선 JSON 과 비교 (회귀가 있으면 종료 코드 1)')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='회귀로 볼 증가 비율 (기본 0.25)')
+    args = parser.parse_args(argv)
+    if args.compact:
+        pipeline.compact_enabled = True
+    # 저장된 라벨을 재사용하면 분류 단계를 측정할 수 없으므로 라벨 저장소 사용 안 함
+    pipeline.label_store_enabled = False
+
+    def log(message):
+        print(message, file=sys.stderr)
+
+    results = []
+    for rows in [synthetic.parse_rows(r) for r in args.rows]:
+        log(f'{rows:,}행 ({args.files}개 파일)')
+        results.append(run_size(
+            rows, args.files, args.duplicates, args.repeat, not args.no_memory,
+            synthetic.parse_rows(args.max_read_rows), args.seed, log, args.classify_workers
+        ))
+    report = {
+        'version': BENCH_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'compact': pipeline.compact_enabled,
+        # ru_maxrss 단위: Linux KB, macOS 바이트
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1),
+        'results': results,
+    }
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        log(f'저장: {args.save}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        try:
+            regressions = compare(baseline, report, args.tolerance)
+        except ValueError as e:
+            print(f'[오류] {e}', file=sys.stderr)
+            return 2
+        for rows, stage, metric, old, new in regressions:
+            print(f'[회귀] {rows:,}행 {stage} {metric}: {old:g} → {new:g} ({new / old - 1:+.0%})' if old else
+                  f'[회귀] {rows:,}행 {stage} {metric}: {old:g} → {new:g}')
+        if regressions:
+            return 1
+        print(f'회귀 없음 (기준선 {args.compare}, 허용 {args.tolerance:.0%})')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
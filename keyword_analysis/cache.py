@@ -0,0 +1,473 @@
+import collections
+import json
+import os
+import sys
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute
+
+# 정제된 엑셀 데이터의 Arrow IPC 디스크 캐시
+# 파일 내용 해시를 키로 저장하고, 다시 읽을 때는 엑셀을 파싱하지 않고 메모리 맵으로 엽니다.
+# 용량이 한도를 넘으면 가장 오래 사용하지 않은 파일부터 삭제합니다 (LRU). 라벨 저장소(labels/) 파일도 같은 한도에 포함됩니다.
+#   python -m keyword_analysis.cache info
+#   python -m keyword_analysis.cache clear
+#   python -m keyword_analysis.cache prebuild sample_data/sample.xlsx --dir sample_data/cache
+# KEYWORD_DASHBOARD_KEYWORD_MEMO=1 이면 원본 → 정규화 키워드 메모도 같은 폴더에 저장해 실행 간에 공유합니다.
+
+# 정제 로직이 바뀌면 올려서 기존 캐시를 무효화
+CACHE_VERSION = 3
+
+default_cache_dir = os.environ.get(
+    'KEYWORD_DASHBOARD_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'keyword_dashboard')
+)
+default_max_bytes = int(float(os.environ.get('KEYWORD_DASHBOARD_CACHE_MB', 1024)) * 1024 * 1024)
+default_result_max_bytes = int(float(os.environ.get('KEYWORD_DASHBOARD_RESULT_CACHE_MB', 512)) * 1024 * 1024)
+keyword_memo_enabled = os.environ.get('KEYWORD_DASHBOARD_KEYWORD_MEMO', '') not in ('', '0')
+label_store_enabled = os.environ.get('KEYWORD_DASHBOARD_LABEL_STORE', '1') not in ('', '0')
+
+# 저장소에 함께 배포하는 읽기 전용 캐시 (샘플 데이터 변환본)
+bundled_cache_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_data', 'cache')
+
+
+class FrameCache:
+    def __init__(self, cache_dir=None, max_bytes=None, readonly_dirs=(bundled_cache_dir,)):
+        self.cache_dir = cache_dir or default_cache_dir
+        self.max_bytes = default_max_bytes if max_bytes is None else max_bytes
+        self.readonly_dirs = list(readonly_dirs)
+
+    def _filename(self, key):
+        return f'{key}-v{CACHE_VERSION}.arrow'
+
+    def _entries(self):
+        entries = []
+        for directory in (self.cache_dir, os.path.join(self.cache_dir, 'labels')):
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name.endswith('.arrow'):
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    # 캐시된 DataFrame (없으면 None)
+    def get(self, key):
+        for directory in [self.cache_dir] + self.readonly_dirs:
+            path = os.path.join(directory, self._filename(key))
+            if not os.path.exists(path):
+                continue
+            try:
+                table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+            except (OSError, pa.ArrowInvalid):
+                continue
+            if directory == self.cache_dir:
+                # 최근 사용 시각 갱신 (LRU 기준)
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+            return table.to_pandas()
+        return None
+
+    def put(self, key, df):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, self._filename(key))
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        # 여러 작업 프로세스가 동시에 써도 완성된 파일만 보이도록 교체
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    # 한도를 넘으면 오래 사용하지 않은 순서대로 삭제
+    def evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        removed = 0
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def info(self):
+        entries = self._entries()
+        return {
+            'cache_dir': self.cache_dir,
+            'files': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+        }
+
+
+# 원본 키워드 → 정규화 키워드 메모
+# 캐시 폴더에 일반 캐시 파일과 같은 형식으로 저장하므로 용량 한도/삭제 대상에 함께 포함됩니다.
+# 여러 프로세스가 동시에 저장하면 일부 항목이 빠질 수 있지만, 메모일 뿐이므로 다시 계산하면 됩니다.
+class KeywordMemo:
+    key = 'keyword_memo'
+
+    def __init__(self, cache=None, max_entries=1000000):
+        self.cache = cache or FrameCache(readonly_dirs=())
+        self.max_entries = max_entries
+        self._memo = None
+
+    def _load(self):
+        if self._memo is None:
+            df = self.cache.get(self.key)
+            if df is None:
+                self._memo = pd.Series([], dtype=object)
+            else:
+                self._memo = pd.Series(df['normalized'].to_numpy(dtype=object), index=df['raw'].to_numpy(dtype=object))
+        return self._memo
+
+    def __len__(self):
+        return len(self._load())
+
+    # 고유 원본 키워드 배열 → (정규화 값 배열, 메모에 없는 위치 마스크)
+    def lookup(self, raw):
+        memo = self._load()
+        positions = memo.index.get_indexer(raw) if len(memo) else np.full(len(raw), -1)
+        missing = positions < 0
+        values = np.empty(len(raw), dtype=object)
+        values[~missing] = memo.to_numpy()[positions[~missing]]
+        return values, missing
+
+    def update(self, raw, normalized):
+        if not len(raw):
+            return
+        # 다른 프로세스가 저장한 항목을 먼저 다시 읽어 합침
+        self._memo = None
+        memo = pd.concat([self._load(), pd.Series(normalized, index=raw, dtype=object)])
+        memo = memo[~memo.index.duplicated(keep='last')].iloc[-self.max_entries:]
+        self._memo = memo
+        self.cache.put(self.key, pd.DataFrame({'raw': memo.index.to_numpy(), 'normalized': memo.to_numpy()}))
+
+
+# 정규화 키워드 → (키워드_분류, 키워드_상세분류) 저장소 (캐시 폴더의 labels/ 아래 Arrow IPC 파일)
+# 분류 규칙 지문마다 파일 하나에 저장하고 규칙 서명을 파일 메타데이터로 함께 기록해, 규칙이 바뀌면
+# 직전 버전의 결과에서 바뀐 규칙만 다시 평가할 수 있게 합니다 (KeywordClassifier.reclassify).
+# 키워드_분류_질적은 상세분류에서 바로 계산되므로 저장하지 않습니다.
+# 최근에 사용한 max_versions 개 규칙 버전만, 버전마다 최근에 저장한 max_keywords 개 키워드만 보관하며,
+# 파일은 정제 데이터 캐시와 같은 용량 한도(KEYWORD_DASHBOARD_CACHE_MB)에 포함됩니다.
+# 저장할 때마다 파일 전체를 다시 쓰므로, 묶음 단위로 분류할 때는 batch=True 로 만들어 새 라벨을 모아 두고
+# 파일을 다 처리한 뒤 flush 로 한 번에 저장합니다.
+# 여러 프로세스가 같은 버전에 동시에 저장하면 일부 키워드가 빠질 수 있지만, 다음 실행에서 다시 분류해 채웁니다.
+LABEL_STORE_VERSION = 1
+
+
+class LabelStore:
+    def __init__(self, cache_dir=None, max_versions=4, max_keywords=1000000, max_bytes=None, batch=False):
+        self.cache = FrameCache(cache_dir, max_bytes, readonly_dirs=())
+        self.label_dir = os.path.join(self.cache.cache_dir, 'labels')
+        self.max_versions = max_versions
+        self.max_keywords = max_keywords
+        self.batch = batch
+        self._pending = {}  # 지문 → (서명, 저장할 라벨 표 목록)
+
+    def _path(self, fingerprint):
+        return os.path.join(self.label_dir, f'{fingerprint}-v{LABEL_STORE_VERSION}.arrow')
+
+    def _versions(self):
+        if not os.path.isdir(self.label_dir):
+            return []
+        versions = []
+        suffix = f'-v{LABEL_STORE_VERSION}.arrow'
+        for name in os.listdir(self.label_dir):
+            if name.endswith(suffix):
+                try:
+                    versions.append((os.stat(os.path.join(self.label_dir, name)).st_mtime, name[:-len(suffix)]))
+                except FileNotFoundError:
+                    continue
+        return sorted(versions, reverse=True)
+
+    def _read(self, fingerprint):
+        path = self._path(fingerprint)
+        if not os.path.exists(path):
+            return None
+        return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+    # 키워드 배열 → (키워드_분류 배열, 키워드_상세분류 배열), 저장되지 않은 키워드는 None
+    def lookup(self, fingerprint, keywords):
+        labels = np.full(len(keywords), None, dtype=object)
+        details = np.full(len(keywords), None, dtype=object)
+        table = self._read(fingerprint) if len(keywords) else None
+        if table is None or not table.num_rows:
+            return labels, details
+        positions = pa.compute.index_in(pa.array(keywords, pa.string()), value_set=table['keyword'])
+        positions = positions.fill_null(-1).to_numpy()
+        found = positions >= 0
+        labels[found] = table['label'].to_numpy()[positions[found]]
+        details[found] = table['detail'].to_numpy()[positions[found]]
+        if found.any():
+            # 최근 사용 시각 갱신 (직전 버전/보관 기준)
+            try:
+                os.utime(self._path(fingerprint))
+            except OSError:
+                pass
+        return labels, details
+
+    # 가장 최근에 사용한 다른 규칙 버전 → (지문, 서명) (없으면 None)
+    def previous(self, fingerprint):
+        for _, other in self._versions():
+            if other == fingerprint:
+                continue
+            try:
+                schema = pa.ipc.open_file(pa.memory_map(self._path(other), 'r')).schema
+            except (OSError, pa.ArrowInvalid):
+                continue
+            return other, json.loads(schema.metadata[b'signature'])
+        return None
+
+    # 라벨 저장 (batch 이면 flush 까지 모아 둠) → 저장한 경로 (모아 두었으면 None)
+    def save(self, fingerprint, signature, keywords, labels, details):
+        new = pa.table({
+            'keyword': pa.array(keywords, pa.string()),
+            'label': pa.array(labels, pa.string()),
+            'detail': pa.array(details, pa.string()),
+        })
+        if self.batch:
+            tables = self._pending.setdefault(fingerprint, (signature, []))[1]
+            tables.append(new)
+            return None
+        return self._write(fingerprint, signature, [new])
+
+    # 모아 둔 라벨을 규칙 버전마다 한 번에 저장 → 저장한 경로 목록
+    def flush(self):
+        pending, self._pending = self._pending, {}
+        return [self._write(fingerprint, signature, tables) for fingerprint, (signature, tables) in pending.items()]
+
+    def _write(self, fingerprint, signature, tables):
+        os.makedirs(self.label_dir, exist_ok=True)
+        table = self._read(fingerprint)
+        for new in tables:
+            if table is not None:
+                # 새 키워드와 겹치지 않는 기존 항목만 유지
+                keep = pa.compute.invert(pa.compute.is_in(table['keyword'], value_set=new['keyword']))
+                new = pa.concat_tables([table.filter(keep), new])
+            table = new
+        table = table.slice(max(0, table.num_rows - self.max_keywords))
+        table = table.replace_schema_metadata({'signature': json.dumps(signature, ensure_ascii=False)})
+        path = self._path(fingerprint)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        # 오래된 규칙 버전 삭제 후 캐시 전체 용량 한도 적용
+        for _, old in self._versions()[self.max_versions:]:
+            try:
+                os.remove(self._path(old))
+            except FileNotFoundError:
+                pass
+        self.cache.evict()
+        return path
+
+    def clear(self):
+        removed = 0
+        for _, fingerprint in self._versions():
+            try:
+                os.remove(self._path(fingerprint))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def info(self):
+        versions = self._versions()
+        keywords = 0
+        size = 0
+        for _, fingerprint in versions:
+            try:
+                keywords += pa.ipc.open_file(pa.memory_map(self._path(fingerprint), 'r')).read_all().num_rows
+                size += os.path.getsize(self._path(fingerprint))
+            except (OSError, pa.ArrowInvalid):
+                continue
+        return {'label_dir': self.label_dir, 'versions': len(versions), 'keywords': keywords, 'bytes': size}
+
+
+# 공유 결과를 읽기 전용으로 표시 (숫자 블록에 값을 쓰면 ValueError)
+# 여러 세션이 같은 DataFrame 을 보므로 블록을 미리 합쳐 두어 읽는 중에 내부 구조가 바뀌지 않게 합니다.
+# object 블록은 pandas 내부 함수가 쓰기 가능한 버퍼를 요구하므로 그대로 둡니다 (키워드는 Arrow 문자열이라 원래 변경 불가).
+def freeze_frame(df):
+    df._consolidate_inplace()
+    for block in df._mgr.blocks:
+        if isinstance(block.values, np.ndarray) and block.values.dtype != object:
+            block.values.flags.writeable = False
+    return df
+
+
+def _value_bytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    # 분류별 색인 같은 중첩 dict/list 는 안에 든 값까지 합산
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_value_bytes(k) + _value_bytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_value_bytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# 프로세스 전체에서 공유하는 분석 결과 메모리 캐시
+# 같은 파일(내용 해시)과 같은 규칙 버전으로 분석한 결과는 모든 세션이 읽기 전용 DataFrame 하나를 함께 씁니다.
+# 용량 한도(KEYWORD_DASHBOARD_RESULT_CACHE_MB)를 넘으면 가장 오래 사용하지 않은 결과부터 내보내고 (LRU),
+# 같은 키를 여러 세션이 동시에 요청하면 한 번만 계산하고 나머지는 그 결과를 기다립니다.
+class ResultCache:
+    def __init__(self, max_bytes=None):
+        self.max_bytes = default_result_max_bytes if max_bytes is None else max_bytes
+        self._entries = collections.OrderedDict()  # 키 → (값, 바이트)
+        self._building = {}  # 계산 중인 키 → Future
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    # 캐시된 결과 (없으면 None)
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = _value_bytes(value)
+        if isinstance(value, pd.DataFrame):
+            freeze_frame(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            # 한도보다 큰 결과는 보관하지 않음 (요청한 세션에만 반환)
+            if size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self.bytes += size
+                self._evict()
+        return value
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    # 캐시된 결과를 반환하고, 없으면 build() 로 한 번만 계산해 저장
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            future = self._building.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = self._building[key] = Future()
+            else:
+                # 다른 세션이 계산 중인 결과를 공유
+                self.hits += 1
+        if not owner:
+            return future.result()
+        try:
+            value = self.put(key, build())
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+        return value
+
+    def clear(self):
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self.bytes = 0
+        return removed
+
+    def info(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+def main(argv=None):
+    import argparse
+
+    from keyword_analysis import pipeline
+
+    parser = argparse.ArgumentParser(prog='python -m keyword_analysis.cache', description='정제 데이터 디스크 캐시 관리')
+    parser.add_argument('--cache-dir', default=None, help=f'캐시 폴더 (기본: {default_cache_dir})')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('info', help='캐시 사용량 출력')
+    sub.add_parser('clear', help='캐시 전체 삭제')
+    prebuild = sub.add_parser('prebuild', help='엑셀 파일을 미리 변환해 저장')
+    prebuild.add_argument('files', nargs='+')
+    prebuild.add_argument('--dir', default=None, help='저장할 폴더 (예: sample_data/cache)')
+    args = parser.parse_args(argv)
+
+    cache = FrameCache(args.cache_dir)
+    if args.command == 'info':
+        info = cache.info()
+        print(f"{info['cache_dir']}: {info['files']}개 파일, {info['bytes'] / 1024 / 1024:.1f}MB / {info['max_bytes'] / 1024 / 1024:.0f}MB")
+        print(f'키워드 정규화 메모: {len(KeywordMemo(cache)):,}개')
+        labels = LabelStore(cache.cache_dir).info()
+        print(f"분류 라벨 저장소: {labels['keywords']:,}개 (규칙 버전 {labels['versions']}개, {labels['bytes'] / 1024 / 1024:.1f}MB)")
+    elif args.command == 'clear':
+        # 라벨 저장소 파일도 함께 삭제
+        print(f'{cache.clear()}개 파일 삭제')
+    else:
+        target = FrameCache(args.dir or cache.cache_dir, max_bytes=sys.maxsize, readonly_dirs=())
+        for path in args.files:
+            with open(path, 'rb') as f:
+                data = f.read()
+            df = pipeline.clean_frame(pipeline.read_workbook(data))
+            print(f'{path} → {target.put(pipeline.content_hash(data), df)}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,669 @@
+import hashlib
+import json
+import re
+import time
+from collections import deque
+
+import numpy as np
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+# 다중 패턴(Aho-Corasick) 키워드 분류기
+#
+# 분류 규칙은 모두 "용어 목록(alternation)"과 ".*" 간격, 전/후방 탐색으로 이루어져 있습니다.
+# 정규식을 파싱해서 아래 세 가지 조건으로 바꾸고, 모든 규칙의 용어를 하나의 오토마톤에 넣어
+# 키워드를 한 번만 훑은 뒤 용어 위치만으로 분류를 결정합니다.
+#   - chain: 용어 집합 T1, T2, ... 가 앞에서부터 순서대로(겹치지 않게) 등장
+#   - neg:   탐색 시작 위치 이후로 해당 용어 집합이 등장하지 않음 ((?!.*(...)))
+#   - 꼬리의 ".*(?!...)" 처럼 항상 만족되는 조건은 제거
+# 해석할 수 없는 모양의 규칙은 기존 정규식으로 평가합니다.
+
+_GAP_OPS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+_MAX_TERMS = 5000
+
+
+class UnsupportedPattern(ValueError):
+    pass
+
+
+def _is_gap(item):
+    op, av = item
+    if op not in _GAP_OPS:
+        return False
+    lo, hi, sub = av
+    return lo == 0 and hi == sre_constants.MAXREPEAT and list(sub) == [(sre_constants.ANY, None)]
+
+
+# 하위 패턴이 매칭하는 문자열 집합 (유한한 경우만)
+def _finite_language(items):
+    result = {''}
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            options = {chr(av)}
+        elif op == sre_constants.IN:
+            options = set()
+            for in_op, in_av in av:
+                if in_op != sre_constants.LITERAL:
+                    return None
+                options.add(chr(in_av))
+        elif op == sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            if add_flags or del_flags:
+                return None
+            options = _finite_language(sub)
+        elif op == sre_constants.BRANCH:
+            options = set()
+            for branch in av[1]:
+                branch_options = _finite_language(branch)
+                if branch_options is None:
+                    return None
+                options |= branch_options
+        else:
+            return None
+        if options is None:
+            return None
+        result = {a + b for a in result for b in options}
+        if len(result) > _MAX_TERMS:
+            return None
+    return result
+
+
+# 순서열 안의 구조적 alternation(용어 목록이 아닌 BRANCH)을 펼쳐 OR 목록으로 만듦
+def _expand_branches(items):
+    items = list(items)
+    for i, (op, av) in enumerate(items):
+        if op == sre_constants.BRANCH and _finite_language([(op, av)]) is None:
+            expanded = []
+            for branch in av[1]:
+                expanded.extend(_expand_branches(list(branch) + items[i + 1:]))
+            return [items[:i] + seq for seq in expanded]
+    return [items]
+
+
+# 간격(.*)으로 구분된 용어 집합들의 순서열 → [frozenset, ...]
+def _parse_chain(items):
+    chain = []
+    pending = []
+
+    def flush():
+        if pending:
+            terms = _finite_language(pending)
+            if terms is None or '' in terms:
+                raise UnsupportedPattern('용어 목록으로 해석할 수 없는 구간')
+            chain.append(frozenset(terms))
+            pending.clear()
+
+    for item in items:
+        if _is_gap(item):
+            flush()
+        else:
+            pending.append(item)
+    flush()
+    return chain
+
+
+def _min_width(items):
+    return sre_parse.SubPattern(sre_parse.State(), list(items)).getwidth()[0]
+
+
+# 마지막 용어 뒤의 꼬리가 항상 만족되는지 검사
+# ".*" 가 문자열 끝까지 진행하면 최소 한 글자를 요구하는 부정 전방탐색은 항상 성공합니다.
+def _is_vacuous_tail(items):
+    seen_gap = False
+    for op, av in items:
+        if _is_gap((op, av)):
+            seen_gap = True
+        elif op == sre_constants.ASSERT_NOT and av[0] == 1 and seen_gap and _min_width(av[1]) > 0:
+            continue
+        else:
+            return False
+    return True
+
+
+# OR 항 하나를 (chains, negs) 로 변환
+def _compile_alternative(items):
+    items = list(items)
+    while items and _is_gap(items[0]):
+        items = items[1:]
+    if not items:
+        raise UnsupportedPattern('빈 패턴')
+
+    if items[0][0] in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        # 전방탐색만으로 이루어진 형태: (?=.*A.*B)(?=.*C)(?!.*D)
+        chains, negs = [], []
+        for op, av in items:
+            if op not in (sre_constants.ASSERT, sre_constants.ASSERT_NOT) or av[0] != 1:
+                raise UnsupportedPattern('전방탐색 외 요소가 섞여 있음')
+            inner = list(av[1])
+            for seq in _expand_branches(inner):
+                if not seq or not _is_gap(seq[0]):
+                    raise UnsupportedPattern('간격으로 시작하지 않는 전방탐색')
+            inner_alts = [_parse_chain(seq) for seq in _expand_branches(inner)]
+            if op == sre_constants.ASSERT:
+                if len(inner_alts) != 1:
+                    raise UnsupportedPattern('전방탐색 안의 OR')
+                chains.append(inner_alts[0])
+            else:
+                for chain in inner_alts:
+                    if len(chain) != 1:
+                        raise UnsupportedPattern('부정 전방탐색 안의 순서열')
+                    negs.append(chain[0])
+        return chains, negs
+
+    # 일반 형태: T1 .* T2 ... [.* (?!...) ...]
+    end = min(i for i in range(len(items) + 1) if _is_vacuous_tail(items[i:]))
+    head = items[:end]
+    while head and _is_gap(head[-1]):
+        head = head[:-1]
+    if not head:
+        raise UnsupportedPattern('용어가 없는 패턴')
+    return [_parse_chain(head)], []
+
+
+# 정규식 → OR 항 목록 [(chains, negs), ...]
+def compile_rule(pattern):
+    parsed = sre_parse.parse(pattern)
+    if parsed.state.flags & ~sre_constants.SRE_FLAG_UNICODE:
+        raise UnsupportedPattern('인라인 플래그')
+    return [_compile_alternative(seq) for seq in _expand_branches(list(parsed))]
+
+
+# 역추적 위험 정적 검사 → 경고 문구 목록
+#   - 무제한 반복 안에 다시 무제한 반복이 있음 ((a+)+ 등): 지수 시간 역추적
+#   - 한 경로에 무제한 반복이 3개 이상 이어짐 (.*(A).*(?!.*(B)) 등): 긴 키워드에서 다항 시간 역추적
+_RISKY_GAP_COUNT = 3
+
+
+def backtracking_risks(pattern):
+    try:
+        tree = sre_parse.parse(pattern)
+    except re.error:
+        return []
+    risks = []
+
+    # 무제한 반복이 이어지는 최대 개수
+    def walk(items, inside_unbounded):
+        count = 0
+        for op, av in items:
+            if op in _GAP_OPS:
+                lo, hi, sub = av
+                unbounded = hi == sre_constants.MAXREPEAT
+                if unbounded and inside_unbounded and '중첩된 무제한 반복' not in risks:
+                    risks.append('중첩된 무제한 반복')
+                count += int(unbounded) + walk(sub, inside_unbounded or unbounded)
+            elif op == sre_constants.SUBPATTERN:
+                count += walk(av[-1], inside_unbounded)
+            elif op == sre_constants.BRANCH:
+                count += max(walk(branch, inside_unbounded) for branch in av[1])
+            elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+                count += walk(av[1], inside_unbounded)
+        return count
+
+    gaps = walk(tree, False)
+    if gaps >= _RISKY_GAP_COUNT:
+        risks.append(f'무제한 반복 {gaps}개 연속')
+    return risks
+
+
+# 정규식 하나를 오토마톤 조건 또는 정규식 대체 평가로 컴파일
+class CompiledRule:
+    def __init__(self, name, pattern):
+        self.name = name
+        self.pattern = pattern
+        self.regex = re.compile(pattern)
+        self.risks = backtracking_risks(pattern)
+        try:
+            self.alternatives = compile_rule(pattern)
+        except (UnsupportedPattern, re.error):
+            self.alternatives = None
+
+    @property
+    def uses_automaton(self):
+        return self.alternatives is not None
+
+
+class _Automaton:
+    def __init__(self, terms):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        self.lengths = []
+        for term in terms:
+            state = 0
+            for ch in term:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] = self.out[state] + (len(self.lengths),)
+            self.lengths.append(len(term))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                f = self.goto[f].get(ch, 0)
+                self.fail[nxt] = f if f != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    # 키워드를 한 번 훑어 (용어 번호, 끝 위치) 목록 반환
+    def scan(self, text):
+        goto, fail, out = self.goto, self.fail, self.out
+        hits = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = i + 1
+                for term_id in out[state]:
+                    hits.append((term_id, end))
+        return hits
+
+
+# 순서열(chain)을 만족하는 첫 용어의 가장 늦은 시작 위치 (없으면 -1)
+def _latest_chain_start(chain, occurrences):
+    firsts = occurrences.get(chain[0])
+    if not firsts:
+        return -1
+    best = -1
+    for start, end in firsts:
+        if start <= best:
+            continue
+        cur_end = end
+        for group in chain[1:]:
+            nxt = None
+            for s, e in occurrences.get(group, ()):
+                if s >= cur_end and (nxt is None or e < nxt):
+                    nxt = e
+            if nxt is None:
+                break
+            cur_end = nxt
+        else:
+            best = start
+    return best
+
+
+def _alternative_matches(chains, negs, occurrences):
+    upper = None
+    for chain in chains:
+        latest = _latest_chain_start(chain, occurrences)
+        if latest < 0:
+            return False
+        upper = latest if upper is None else min(upper, latest)
+    lower = 0
+    for group in negs:
+        for start, _ in occurrences.get(group, ()):
+            lower = max(lower, start + 1)
+    return upper is None or upper >= lower
+
+
+# 분류 단계: (분류명, 규칙 dict, 우선순위)
+# 부적합은 마지막으로 일치한 규칙, 적합/확장 가능은 처음 일치한 규칙이 상세분류가 됩니다.
+# (기존 4번째 "부적합 재적용" 단계는 1단계와 같은 규칙이므로 결과를 바꾸지 않습니다.)
+def classification_passes(unsuitable_filters, suitable_filters, additional_filters):
+    return [
+        ('부적합', unsuitable_filters, 'last'),
+        ('적합', suitable_filters, 'first'),
+        ('확장 가능 키워드', additional_filters, 'first'),
+    ]
+
+
+class KeywordClassifier:
+    def __init__(self, unsuitable_filters, suitable_filters, additional_filters):
+        self.passes = []
+        groups = {}
+        for label, filters, priority in classification_passes(unsuitable_filters, suitable_filters, additional_filters):
+            compiled = []
+            for name, pattern in filters.items():
+                rule = CompiledRule(name, pattern)
+                if rule.uses_automaton:
+                    # 용어 집합 → 그룹 번호로 치환
+                    rule.alternatives = [
+                        (
+                            [tuple(groups.setdefault(g, len(groups)) for g in chain) for chain in chains],
+                            [groups.setdefault(g, len(groups)) for g in negs],
+                        )
+                        for chains, negs in rule.alternatives
+                    ]
+                    rule.required = [
+                        frozenset(g for chain in chains for g in chain) for chains, _ in rule.alternatives
+                    ]
+                compiled.append(rule)
+            if priority == 'last':
+                compiled.reverse()
+            self.passes.append((label, compiled))
+
+        terms = {}
+        for group, group_id in groups.items():
+            for term in group:
+                terms.setdefault(term, []).append(group_id)
+        self.terms = list(terms)
+        self.term_groups = list(terms.values())
+        self.automaton = _Automaton(self.terms)
+
+        # 우선순위 순서로 펼친 (분류명, 규칙) 목록과, 그룹별로 발동 가능한 규칙 위치 색인
+        # 키워드에 등장한 그룹과 관련된 규칙만 평가합니다.
+        self.ordered = [(label, rule) for label, compiled in self.passes for rule in compiled]
+        self.group_rules = [[] for _ in groups]
+        self.regex_rules = []
+        for position, (_, rule) in enumerate(self.ordered):
+            if not rule.uses_automaton:
+                self.regex_rules.append(position)
+                continue
+            for group_id in {g for required in rule.required for g in required}:
+                self.group_rules[group_id].append(position)
+
+    @property
+    def rules(self):
+        return [rule for _, rule in self.ordered]
+
+    def _occurrences(self, text):
+        occurrences = {}
+        lengths = self.automaton.lengths
+        for term_id, end in self.automaton.scan(text):
+            occ = (end - lengths[term_id], end)
+            for group_id in self.term_groups[term_id]:
+                occurrences.setdefault(group_id, []).append(occ)
+        return occurrences
+
+    def _rule_matches(self, rule, text, occurrences):
+        if occurrences is None or not rule.uses_automaton:
+            return rule.regex.search(text) is not None
+        for (chains, negs), required in zip(rule.alternatives, rule.required):
+            if required.issubset(occurrences) and _alternative_matches(chains, negs, occurrences):
+                return True
+        return False
+
+    # 규칙 서명: 평가 순서대로 (분류명, 규칙 이름, 패턴) 목록
+    @property
+    def signature(self):
+        return [(label, rule.name, rule.pattern) for label, rule in self.ordered]
+
+    # 분류 규칙 지문 (라벨 저장소의 규칙 버전 키, 질적 분류 매핑은 포함하지 않음)
+    @property
+    def fingerprint(self):
+        payload = json.dumps(self.signature, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    # 키워드 하나 → 처음 일치한 규칙의 self.ordered 위치 (없으면 -1)
+    # positions 를 주면 그 위치의 규칙만 평가
+    def match_position(self, text, positions=None):
+        # "." 은 줄바꿈과 일치하지 않으므로 줄바꿈이 있는 키워드는 정규식으로 평가
+        if '\n' in text:
+            occurrences = None
+            candidates = range(len(self.ordered))
+        else:
+            occurrences = self._occurrences(text)
+            candidates = set(self.regex_rules)
+            for group_id in occurrences:
+                candidates.update(self.group_rules[group_id])
+            candidates = sorted(candidates)
+        if positions is not None:
+            candidates = [position for position in candidates if position in positions]
+        for position in candidates:
+            if self._rule_matches(self.ordered[position][1], text, occurrences):
+                return position
+        return -1
+
+    # 키워드 하나 → (키워드_분류, 키워드_상세분류)
+    def classify_one(self, text):
+        position = self.match_position(text)
+        if position < 0:
+            return '미분류', '미분류'
+        label, rule = self.ordered[position]
+        return label, rule.name
+
+    # 역추적 위험이 있는 규칙 중 정규식으로 평가되는 규칙 (시간 제한 평가가 필요한 규칙)
+    @property
+    def risky_regex_rules(self):
+        return [rule for rule in self.rules if rule.risks and not rule.uses_automaton]
+
+    # 키워드 배열 → (키워드_분류 배열, 키워드_상세분류 배열), 중복 키워드는 한 번만 평가
+    def classify(self, keywords):
+        keywords = np.asarray(keywords, dtype=object)
+        uniques, inverse = np.unique(keywords.astype(str), return_inverse=True)
+        labels = np.empty(len(uniques), dtype=object)
+        details = np.empty(len(uniques), dtype=object)
+        for i, text in enumerate(uniques):
+            labels[i], details[i] = self.classify_one(text)
+        return labels[inverse], details[inverse]
+
+    # 이전 규칙 버전의 분류 결과를 이어받아 바뀐 규칙만 평가 → (키워드_분류 배열, 키워드_상세분류 배열)
+    # 바뀌지 않은 규칙의 일치 여부는 그대로이므로
+    #   - 이전에 미분류였던 키워드는 새로 추가/변경된 규칙만,
+    #   - 이전 상세분류 규칙이 그대로인 키워드는 그 규칙보다 앞서 평가되는 변경 규칙만 평가하고,
+    #   - 이전 상세분류 규칙이 바뀌었거나 삭제된 키워드만 모든 규칙으로 다시 분류합니다.
+    # 바뀌지 않은 규칙끼리의 평가 순서가 달라졌으면 이어받을 수 없으므로 None 을 반환합니다.
+    def reclassify(self, keywords, labels, details, previous_signature):
+        current = self.signature
+        previous = [tuple(entry) for entry in previous_signature]
+        kept = set(current) & set(previous)
+        if [entry for entry in previous if entry in kept] != [entry for entry in current if entry in kept]:
+            return None
+        position_of = {entry: position for position, entry in enumerate(current)}
+        previous_rule = {(label, name): (label, name, pattern) for label, name, pattern in previous}
+        changed = [position for position, entry in enumerate(current) if entry not in kept]
+
+        keywords = np.asarray(keywords, dtype=object)
+        new_labels = np.empty(len(keywords), dtype=object)
+        new_details = np.empty(len(keywords), dtype=object)
+        # 이전 (분류, 상세분류) 가 같은 키워드는 평가할 규칙도 같음
+        groups = {}
+        for row, pair in enumerate(zip(labels, details)):
+            groups.setdefault(pair, []).append(row)
+        for (label, detail), rows in groups.items():
+            entry = previous_rule.get((label, detail))
+            if label == '미분류' and detail == '미분류':
+                winner, candidates = -1, set(changed)
+            elif entry in kept:
+                winner = position_of[entry]
+                candidates = {position for position in changed if position < winner}
+            else:
+                winner, candidates = -1, None
+            for row in rows:
+                position = self.match_position(str(keywords[row]), candidates) if candidates != set() else -1
+                if position < 0:
+                    position = winner
+                if position < 0:
+                    new_labels[row], new_details[row] = '미분류', '미분류'
+                else:
+                    new_labels[row], new_details[row] = self.ordered[position][0], self.ordered[position][1].name
+        return new_labels, new_details
+
+    # 규칙별 계측: 키워드마다 후보 규칙을 (처음 일치에서 멈추지 않고) 모두 평가해
+    # 규칙별 평가 수, 일치 수, 최종 적용 수, 부적합 규칙에 밀린 수, 평가 시간을 기록합니다.
+    # 중복 키워드는 한 번만 셉니다. 분류 결과는 classify 와 같습니다.
+    def profile(self, keywords):
+        uniques = np.unique(np.asarray(keywords, dtype=object).astype(str))
+        counts = np.zeros((len(self.ordered), 4), dtype=np.int64)  # scanned, matched, assigned, overridden
+        seconds = np.zeros(len(self.ordered))
+        scan_seconds = 0.0
+        start = time.perf_counter()
+        for text in uniques:
+            if '\n' in text:
+                occurrences = None
+                candidates = range(len(self.ordered))
+            else:
+                t = time.perf_counter()
+                occurrences = self._occurrences(text)
+                scan_seconds += time.perf_counter() - t
+                candidates = set(self.regex_rules)
+                for group_id in occurrences:
+                    candidates.update(self.group_rules[group_id])
+                candidates = sorted(candidates)
+            matched = []
+            for position in candidates:
+                t = time.perf_counter()
+                hit = self._rule_matches(self.ordered[position][1], text, occurrences)
+                seconds[position] += time.perf_counter() - t
+                counts[position, 0] += 1
+                if hit:
+                    counts[position, 1] += 1
+                    matched.append(position)
+            if matched:
+                counts[matched[0], 2] += 1
+                # 최종 분류가 부적합이면 함께 일치한 다른 규칙은 부적합 규칙에 밀린 것
+                if self.ordered[matched[0]][0] == '부적합':
+                    counts[matched[1:], 3] += 1
+
+        rules = []
+        for label, compiled in self.passes:
+            positions = [i for i, (l, _) in enumerate(self.ordered) if l == label]
+            # 규칙 dict 에 정의된 순서로 표시 (부적합은 평가용으로 뒤집혀 있음)
+            if label == '부적합':
+                positions.reverse()
+            for position in positions:
+                rule = self.ordered[position][1]
+                scanned, hits, assigned, overridden = counts[position].tolist()
+                rules.append({
+                    'label': label,
+                    'rule': rule.name,
+                    'engine': 'automaton' if rule.uses_automaton else 'regex',
+                    'scanned': scanned,
+                    'matched': hits,
+                    'assigned': assigned,
+                    'overridden': overridden,
+                    'seconds': float(seconds[position]),
+                })
+        return {
+            'keywords': len(uniques),
+            'total_seconds': time.perf_counter() - start,
+            'scan_seconds': scan_seconds,
+            'rules': rules,
+        }
+
+
+# 기존 정규식 4단계 분류 (동등성 검증 기준)
+def classify_with_regex(keywords, unsuitable_filters, suitable_filters, additional_filters):
+    import pandas as pd
+
+    s = pd.Series(keywords, dtype=object)
+    labels = pd.Series('미분류', index=s.index, dtype=object)
+    details = pd.Series('미분류', index=s.index, dtype=object)
+    for category, pattern in unsuitable_filters.items():
+        mask = s.str.contains(pattern, regex=True, na=False)
+        labels[mask] = '부적합'
+        details[mask] = category
+    for category, pattern in suitable_filters.items():
+        mask = s.str.contains(pattern, regex=True, na=False) & (labels == '미분류')
+        labels[mask] = '적합'
+        details[mask] = category
+    for category, pattern in additional_filters.items():
+        mask = s.str.contains(pattern, regex=True, na=False) & (labels == '미분류')
+        labels[mask] = '확장 가능 키워드'
+        details[mask] = category
+    for category, pattern in unsuitable_filters.items():
+        mask = s.str.contains(pattern, regex=True, na=False) & (labels != '부적합')
+        labels[mask] = '부적합'
+        details[mask] = category
+    return labels.to_numpy(), details.to_numpy()
+
+
+# 자동 분류기와 기존 정규식 분류의 라벨 비교 → 불일치 (키워드, 기대값, 실제값) 목록
+def find_mismatches(classifier, keywords, unsuitable_filters, suitable_filters, additional_filters):
+    expected = classify_with_regex(keywords, unsuitable_filters, suitable_filters, additional_filters)
+    actual = classifier.classify(keywords)
+    mismatches = []
+    for i, keyword in enumerate(keywords):
+        exp = (expected[0][i], expected[1][i])
+        act = (actual[0][i], actual[1][i])
+        if exp != act:
+            mismatches.append((keyword, exp, act))
+    return mismatches
+
+
+# 규칙 용어를 무작위로 섞은 검증용 키워드 생성
+def generate_keywords(classifier, n, seed=0, max_parts=4):
+    import random
+
+    rng = random.Random(seed)
+    terms = sorted(classifier.terms)
+    fillers = ['', ' ', '추천', '가격', '후기', '학원', 'a', '1', '\n', '영', '어', '초', '국제', '온라인']
+    keywords = []
+    for _ in range(n):
+        parts = []
+        for _ in range(rng.randint(1, max_parts)):
+            parts.append(rng.choice(terms) if rng.random() < 0.7 else rng.choice(fillers))
+            if rng.random() < 0.3:
+                parts.append(' ')
+        keywords.append(''.join(parts))
+    return keywords
+
+
+# 동등성 검증: python -m keyword_analysis.classifier [엑셀 파일 ...] [--profile rule_profile.json]
+# 샘플 데이터(또는 지정한 파일)와 생성 데이터에서 기존 정규식 분류와 라벨이 모두 같은지 확인합니다.
+def main(argv=None):
+    import argparse
+    import os
+    import warnings
+
+    from keyword_analysis import pipeline, rules
+
+    parser = argparse.ArgumentParser(description='정규식 분류와 자동 분류기의 라벨 동등성 검증')
+    parser.add_argument('files', nargs='*', help='검증할 엑셀 파일 (기본: sample_data/sample.xlsx)')
+    parser.add_argument('--generated', type=int, default=100000, help='생성 키워드 수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', metavar='JSON', help='정규화 키워드로 규칙별 계측을 실행해 JSON 으로 저장')
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore', message='This pattern is interpreted as a regular expression')
+    filters = (rules.unsuitable_filters, rules.suitable_filters, rules.additional_filters)
+    classifier = KeywordClassifier(*filters)
+    fallback = [rule.name for rule in classifier.rules if not rule.uses_automaton]
+    print(f'규칙 {len(classifier.rules)}개, 용어 {len(classifier.terms)}개, 정규식 대체 평가: {fallback or "없음"}')
+    for rule in classifier.rules:
+        if rule.risks:
+            print(f"  역추적 위험 [{rule.name}]: {', '.join(rule.risks)} ({'오토마톤' if rule.uses_automaton else '정규식'} 평가)")
+
+    files = args.files or [os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_data', 'sample.xlsx')]
+    datasets = []
+    for path in files:
+        with open(path, 'rb') as f:
+            raw = pipeline.read_workbook(f.read())
+        keywords = raw['연관키워드'].astype(str).tolist()
+        datasets.append((f'{os.path.basename(path)} (원본)', keywords))
+        datasets.append((f'{os.path.basename(path)} (정규화)', [pipeline.normalize_keyword(k) for k in keywords]))
+    datasets.append((f'생성 데이터 {args.generated:,}개', generate_keywords(classifier, args.generated, seed=args.seed)))
+
+    failed = False
+    for name, keywords in datasets:
+        start = time.perf_counter()
+        mismatches = find_mismatches(classifier, keywords, *filters)
+        elapsed = time.perf_counter() - start
+        print(f'{name}: {len(keywords):,}개 중 불일치 {len(mismatches):,}개 ({elapsed:.1f}초)')
+        for keyword, expected, actual in mismatches[:10]:
+            print(f'  {keyword!r}: 정규식={expected} 분류기={actual}')
+        failed = failed or bool(mismatches)
+
+    if args.profile:
+        import json
+
+        keywords = [k for name, dataset in datasets if name.endswith('(정규화)') for k in dataset]
+        report = pipeline.profile_rules(keywords)
+        with open(args.profile, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        slowest = sorted(report['rules'], key=lambda r: r['seconds'], reverse=True)[:5]
+        dead = [r['rule'] for r in report['rules'] if not r['matched']]
+        print(f"규칙 계측 → {args.profile} (키워드 {report['keywords']:,}개, {report['total_seconds']:.2f}초)")
+        print('  평가 시간 상위: ' + ', '.join(f"{r['rule']} {r['seconds'] * 1000:.1f}ms" for r in slowest))
+        print(f"  일치 없는 규칙 {len(dead)}개: {', '.join(dead) or '없음'}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
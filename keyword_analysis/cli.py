@@ -0,0 +1,205 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import Future, as_completed
+
+from keyword_analysis import pipeline, rules
+from keyword_analysis.export import prepare_export, write_bundle, write_excel
+from keyword_analysis.guard import TIMEOUT_DETAIL
+
+# 배치 실행 (Streamlit/Plotly 없이 동작)
+#   python -m keyword_analysis exports/ -o results/ --format parquet
+#   python -m keyword_analysis "exports/2024-*.xlsx" -o results/ --combine
+
+output_formats = ['xlsx', 'csv', 'parquet']
+
+
+# 입력 인자(파일/폴더/글롭) → 엑셀 파일 경로 목록
+def expand_inputs(inputs):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(glob.glob(os.path.join(item, '*.xlsx')))
+        elif glob.has_magic(item):
+            matches = sorted(glob.glob(item))
+        else:
+            matches = [item]
+        for path in matches:
+            # 엑셀이 열려 있을 때 생기는 잠금 파일 제외
+            if not os.path.basename(path).startswith('~$') and path not in paths:
+                paths.append(path)
+    return paths
+
+
+# 파일 하나 수집 → 정제 → 분류 (작업 프로세스에서 실행)
+# 큰 파일은 스트리밍으로 읽으며 묶음마다 진행 상황을 출력
+def analyze_file(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    def progress(done, total):
+        print(f'  {path}: {done:,}/{total:,}행 처리', file=sys.stderr)
+
+    return pipeline.analyze_workbook(data, progress=progress)
+
+
+# 분류 결과와 통계 시트를 지정한 형식으로 저장 → 저장한 경로 목록
+# bundle 이면 분류별 파일까지 zip 하나로 저장
+def write_result(final_df, output_dir, name, fmt, bundle=False):
+    if bundle:
+        path = os.path.join(output_dir, f'{name}_묶음.zip')
+        write_bundle(final_df, path, fmt, list(rules.load_ruleset().qualitative_groups) + ['미분류'], splits=pipeline.split_categories, name=name)
+        return [path]
+    df, classification_stats = prepare_export(final_df)
+    if fmt == 'xlsx':
+        path = os.path.join(output_dir, f'{name}_분류결과.xlsx')
+        write_excel(df, classification_stats, path)
+        return [path]
+
+    stats_df = classification_stats.reset_index()
+    result_path = os.path.join(output_dir, f'{name}_분류결과.{fmt}')
+    stats_path = os.path.join(output_dir, f'{name}_통계.{fmt}')
+    if fmt == 'csv':
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        df.to_csv(result_path, index=False, encoding='utf-8-sig')
+        stats_df.to_csv(stats_path, index=False, encoding='utf-8-sig')
+    else:
+        df.to_parquet(result_path, index=False)
+        stats_df.to_parquet(stats_path, index=False)
+    return [result_path, stats_path]
+
+
+# 안전 모드에서 시간 한도를 넘긴 키워드 수 안내 문구
+def timeout_note(df):
+    count = int((df['키워드_상세분류'] == TIMEOUT_DETAIL).sum())
+    return f' (평가 시간 초과 {count:,}개)' if count else ''
+
+
+# 파일별 처리 후 바로 저장 (작업 프로세스에서 실행)
+def process_file(path, output_dir, fmt, bundle=False, ruleset=None):
+    final_df = pipeline.merge_frames([analyze_file(path)], ruleset=ruleset)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return f'{len(final_df):,}개 키워드 ({pipeline.memory_mb(final_df):,.1f}MB){timeout_note(final_df)}', write_result(final_df, output_dir, name, fmt, bundle)
+
+
+# 입력 순서대로 결과를 하나씩 넘겨 통합 단계가 파일별로 바로 중복을 제거하게 함
+# names 에는 넘긴 파일의 이름을 같은 순서로 추가 ('출처_파일' 기록용)
+def _completed_in_order(paths, futures, errors, names):
+    for i, (path, future) in enumerate(zip(paths, futures), 1):
+        try:
+            df = future.result()
+        except Exception as e:
+            errors.append(path)
+            print(f'[실패] {path}: {e}', file=sys.stderr)
+            continue
+        print(f'[{i}/{len(paths)}] {path}: {len(df):,}개 키워드{timeout_note(df)}', file=sys.stderr)
+        names.append(os.path.basename(path))
+        yield df
+
+
+# 파일이 하나일 때 쓰는 실행기: 작업 프로세스 없이 이 프로세스에서 바로 실행
+# (파일 단위 병렬이 필요 없으므로 큰 파일의 분류를 모든 코어로 나눔, shard.classify_sharded)
+class InlineExecutor:
+    def submit(self, func, *args):
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m keyword_analysis',
+        description='네이버 키워드 도구 엑셀 파일을 일괄 분류합니다.'
+    )
+    parser.add_argument('inputs', nargs='+', help='엑셀 파일, 폴더 또는 글롭 패턴')
+    parser.add_argument('-o', '--output-dir', default='.', help='결과 저장 폴더 (기본: 현재 폴더)')
+    parser.add_argument('-f', '--format', choices=output_formats, default='xlsx', help='저장 형식 (기본: xlsx)')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1, help='병렬 작업 프로세스 수')
+    parser.add_argument('--combine', action='store_true',
+                        help='모든 파일을 대시보드처럼 합쳐(중복 키워드 제거) 하나의 결과로 저장')
+    parser.add_argument('--name', default='키워드_질적분류_결과', help='--combine 사용 시 결과 파일 이름')
+    parser.add_argument('--merge-policy', default=pipeline.merge_policy,
+                        help='--combine 사용 시 중복 키워드 지표 통합 방식: first(기본)/latest/max/mean/sum '
+                             "또는 지표별 지정 (예: 'latest,월평균노출 광고수=mean'), 총 검색수/총 클릭수는 통합 후 다시 계산")
+    parser.add_argument('--stream-mb', type=float, default=pipeline.stream_min_mb,
+                        help=f'이 크기(MB) 이상인 파일은 묶음 단위 스트리밍으로 처리 (기본 {pipeline.stream_min_mb:g}, 0 이면 항상)')
+    parser.add_argument('--chunk-rows', type=int, default=pipeline.chunk_rows, help='스트리밍 묶음 행 수')
+    parser.add_argument('--bundle', action='store_true',
+                        help='분류별 파일, 적합/부적합, 전체 결과와 통계를 zip 하나로 저장 (--format 형식)')
+    parser.add_argument('--ruleset', default=rules.default_ruleset,
+                        help=f'분류 규칙 세트 이름 (keyword_analysis/rulesets, 기본 {rules.default_ruleset}, 사용 가능: {", ".join(rules.available_rulesets())})')
+    parser.add_argument('--compact', action='store_true',
+                        help='메모리 절약 형식(uint32/float32/범주형)으로 처리 (KEYWORD_DASHBOARD_COMPACT=1 과 같음)')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        pipeline.parse_merge_policy(args.merge_policy)
+        rules.load_ruleset(args.ruleset)
+    except ValueError as e:
+        parser.error(str(e))
+    paths = expand_inputs(args.inputs)
+    missing = [path for path in paths if not os.path.isfile(path)]
+    if missing or not paths:
+        for path in missing:
+            print(f'파일을 찾을 수 없습니다: {path}', file=sys.stderr)
+        if not paths:
+            print('처리할 엑셀 파일이 없습니다.', file=sys.stderr)
+        return 2
+    os.makedirs(args.output_dir, exist_ok=True)
+    # 작업 프로세스에도 적용되도록 풀을 만들기 전에 설정
+    pipeline.stream_min_mb = args.stream_mb
+    pipeline.chunk_rows = args.chunk_rows
+    rules.default_ruleset = args.ruleset
+    if args.compact:
+        os.environ['KEYWORD_DASHBOARD_COMPACT'] = '1'
+        pipeline.compact_enabled = True
+
+    start = time.perf_counter()
+    workers = max(1, min(args.workers, len(paths)))
+    errors = []
+    with (InlineExecutor() if len(paths) == 1 else pipeline.make_process_pool(workers)) as executor:
+        if args.combine:
+            futures = [executor.submit(analyze_file, path) for path in paths]
+            try:
+                names = []
+                final_df = pipeline.merge_frames(
+                    _completed_in_order(paths, futures, errors, names), args.merge_policy, names, args.ruleset
+                )
+            except ValueError:
+                # 모든 파일이 실패해 합칠 결과가 없음
+                if len(errors) < len(paths):
+                    raise
+                final_df = None
+            if final_df is not None:
+                written = write_result(final_df, args.output_dir, args.name, args.format, args.bundle)
+                print(f'[완료] {len(paths) - len(errors)}개 파일, {len(final_df):,}개 키워드 '
+                      f'({pipeline.memory_mb(final_df):,.1f}MB) → {", ".join(written)}', file=sys.stderr)
+        else:
+            futures = {executor.submit(process_file, path, args.output_dir, args.format, args.bundle, args.ruleset): path for path in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    summary, written = future.result()
+                except Exception as e:
+                    errors.append(path)
+                    print(f'[실패] {path}: {e}', file=sys.stderr)
+                    continue
+                print(f'[완료] {path}: {summary} → {", ".join(written)}', file=sys.stderr)
+
+    print(f'{len(paths) - len(errors)}/{len(paths)}개 파일 처리 ({time.perf_counter() - start:.1f}초)', file=sys.stderr)
+    return 1 if errors else 0
@@ -0,0 +1,276 @@
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+
+# float32 로 압축된 값(클릭률)을 float64 로 되돌림
+# 소수 여섯째 자리에서 반올림해 0.54 가 0.5400000214... 로 기록/집계되지 않게 합니다.
+def _restore_floats(series):
+    if series.dtype == np.float32:
+        return series.astype(np.float64).round(6)
+    return series
+
+
+# 그룹별 최빈값 (동률이면 Series.mode 처럼 가장 작은 값)
+def _group_mode(df, group_keys, col, index):
+    if col not in df.columns:
+        return pd.Series('-', index=index)
+    counts = df.groupby(group_keys + [col], observed=True).size().rename('건수').reset_index()
+    counts = counts.sort_values(group_keys + ['건수', col], ascending=[True] * len(group_keys) + [False, True], kind='stable')
+    modes = counts.drop_duplicates(subset=group_keys).set_index(group_keys)[col]
+    return modes.reindex(index)
+
+
+# 내보내기용 정렬 데이터와 분류별 통계 시트 생성
+def prepare_export(df):
+    # 컬럼 순서 재배치 및 정렬
+    df = df[['키워드_분류', '키워드_상세분류', '연관키워드'] + [col for col in df.columns if col not in ['키워드_분류', '키워드_상세분류', '연관키워드']]]
+
+    # 압축 형식의 float32 클릭률은 float64 로 되돌려 집계/기록
+    for col in df.columns:
+        if df[col].dtype == np.float32:
+            df[col] = _restore_floats(df[col])
+
+    # 키워드 분류 순서 정의
+    classification_order = ['적합', '확장 가능 키워드', '부적합', '미분류']
+    df['키워드_분류'] = pd.Categorical(df['키워드_분류'], categories=classification_order, ordered=True)
+
+    # 정렬
+    df = df.sort_values(['키워드_분류', '키워드_상세분류', '연관키워드'], ascending=[True, True, True])
+
+    # 키워드 분류별 상세 통계 생성 (분류 조합별 그룹 집계 한 번으로 계산)
+    # 분류는 classification_order 순, 상세분류는 정렬된 순서 그대로 (기존 조합별 반복과 동일한 결과)
+    group_keys = ['키워드_분류', '키워드_상세분류']
+    grouped = df.groupby(group_keys, observed=True, sort=True)
+    aggregations = {'키워드_건수': ('연관키워드', 'size')}
+    for col in ['총 검색수', '총 클릭수']:
+        aggregations[col] = (col, 'sum')
+    aggregations['월평균노출 광고수'] = ('월평균노출 광고수', 'mean')
+    for col in ['월간검색수(PC)', '월간검색수(모바일)', '월평균클릭수(PC)', '월평균클릭수(모바일)']:
+        aggregations[col] = (col, 'sum')
+    for col in ['월평균클릭률(PC)', '월평균클릭률(모바일)']:
+        aggregations[col] = (col, 'mean')
+    classification_stats = grouped.agg(**aggregations)
+    classification_stats.insert(3, '경쟁정도', _group_mode(df, group_keys, '경쟁정도', classification_stats.index))
+
+    if len(classification_stats):
+        # 분류 레벨을 일반 문자열로 (범주형 인덱스 대신)
+        classification_stats.index = pd.MultiIndex.from_arrays(
+            [classification_stats.index.get_level_values(0).astype(str),
+             classification_stats.index.get_level_values(1)],
+            names=group_keys
+        )
+    else:
+        classification_stats = pd.DataFrame()
+
+    # 소수점 둘째자리까지 반올림
+    classification_stats = classification_stats.round(2)
+    return df, classification_stats
+
+
+# 엑셀 파일은 xlsxwriter 의 constant_memory 모드로 행 순서대로 기록합니다.
+# (pandas 의 to_excel 은 열 단위로 셀을 쓰기 때문에 이 모드에서 사용할 수 없습니다.)
+# 완성된 행은 임시 파일로 바로 내보내므로 큰 데이터도 통합 문서 전체를 메모리에 두지 않습니다.
+EXCEL_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+_CHUNK_ROWS = 10000
+
+
+def _new_workbook(output):
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    # pandas 기본 헤더 서식과 동일
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    return workbook, header_format
+
+
+def _write_cell(worksheet, row, col, value, cell_format=None):
+    if value is None or (isinstance(value, float) and value != value):
+        if cell_format is not None:
+            worksheet.write_blank(row, col, None, cell_format)
+        return
+    worksheet.write(row, col, value, cell_format)
+
+
+# DataFrame 을 시트에 행 단위로 기록 (index=True 이면 인덱스를 앞 열에 헤더 서식으로 기록)
+def _write_frame(worksheet, df, header_format, index=False):
+    index_names = list(df.index.names) if index else []
+    header = [name or '' for name in index_names] + [str(col) for col in df.columns]
+    for col, name in enumerate(header):
+        worksheet.write(0, col, name, header_format)
+
+    offset = len(index_names)
+    previous_outer = None
+    for start in range(0, len(df), _CHUNK_ROWS):
+        block = df.iloc[start:start + _CHUNK_ROWS]
+        columns = [_restore_floats(block[col]).tolist() for col in block.columns]
+        labels = block.index.tolist() if index else None
+        for i, values in enumerate(zip(*columns)):
+            row = start + i + 1
+            if index:
+                label = labels[i] if isinstance(labels[i], tuple) else (labels[i],)
+                for level, value in enumerate(label):
+                    # 바깥 레벨은 같은 값이 이어지면 첫 행에만 기록
+                    if level < len(label) - 1 and previous_outer is not None and label[:level + 1] == previous_outer[:level + 1]:
+                        worksheet.write_blank(row, level, None, header_format)
+                    else:
+                        _write_cell(worksheet, row, level, value, header_format)
+                previous_outer = label
+            for col, value in enumerate(values):
+                _write_cell(worksheet, row, offset + col, value)
+
+
+# 열 너비 = 가장 긴 값의 글자 수 + 2
+# 정수 열은 최솟값/최댓값만, 범주형은 범주만 보고 계산합니다.
+# 그 외 열은 벡터화된 문자열 길이로 계산하되, 큰 데이터는 일부 행만 표본으로 봅니다.
+_WIDTH_SAMPLE_ROWS = 50000
+
+
+def _column_width(series, name):
+    series = series.dropna()
+    if not len(series):
+        width = 0
+    elif pd.api.types.is_integer_dtype(series.dtype):
+        width = max(len(str(series.min())), len(str(series.max())))
+    elif isinstance(series.dtype, pd.CategoricalDtype):
+        used = series.cat.remove_unused_categories().cat.categories
+        width = pd.Series(used).astype(str).str.len().max()
+    else:
+        if len(series) > _WIDTH_SAMPLE_ROWS:
+            series = series.sample(_WIDTH_SAMPLE_ROWS, random_state=0)
+        width = series.astype(str).str.len().max()
+    return max(int(width), len(name)) + 2
+
+
+# 통계/원본데이터 두 시트 엑셀 작성 (output: 경로 또는 버퍼)
+def write_excel(df, classification_stats, output):
+    workbook, header_format = _new_workbook(output)
+    stats_worksheet = workbook.add_worksheet('통계')
+    data_worksheet = workbook.add_worksheet('원본데이터')
+
+    # 통계 시트 열 너비 조정
+    for idx, col in enumerate(classification_stats.columns):
+        stats_worksheet.set_column(idx, idx, _column_width(classification_stats[col], col))
+    # 원본 데이터 시트 열 너비 조정
+    for idx, col in enumerate(df.columns):
+        data_worksheet.set_column(idx, idx, _column_width(df[col], col))
+
+    # 통계 시트 저장
+    _write_frame(stats_worksheet, classification_stats, header_format, index=True)
+    # 원본 데이터 시트 저장
+    _write_frame(data_worksheet, df, header_format)
+    workbook.close()
+
+
+# DataFrame 하나를 단일 시트 엑셀 바이트로 변환 (분류별 전체 다운로드)
+def frame_to_excel(df, sheet_name):
+    output = io.BytesIO()
+    workbook, header_format = _new_workbook(output)
+    worksheet = workbook.add_worksheet(sheet_name)
+    _write_frame(worksheet, df, header_format)
+    workbook.close()
+    return output.getvalue()
+
+
+# DataFrame 하나를 키워드 도구 형식 엑셀로 저장 (output: 경로 또는 버퍼, 합성 데이터/검색광고 API 수집 결과)
+def write_sheet(df, output, sheet_name='Sheet1'):
+    workbook, header_format = _new_workbook(output)
+    _write_frame(workbook.add_worksheet(sheet_name), df, header_format)
+    workbook.close()
+
+
+def get_excel_download_link(df, filename):
+    df, classification_stats = prepare_export(df)
+    output = io.BytesIO()
+    write_excel(df, classification_stats, output)
+    output.seek(0)
+    return output
+
+
+# 내보내기 묶음 (zip 하나에 분류별 파일 + 적합/부적합 + 전체 데이터 + 통계)
+# 정렬/통계 계산은 한 번만 하고, 분류별 파일은 정렬된 데이터의 행 위치로 잘라 zip 항목에 바로 기록합니다.
+# (파일마다 따로 정렬하거나 BytesIO 에 모았다가 압축하지 않음)
+bundle_formats = ['xlsx', 'csv', 'parquet']
+ZIP_MIME = 'application/zip'
+_CSV_CHUNK_ROWS = 50000
+
+
+# 정렬된 데이터에서 분류별/분할별 행 위치 → [(파일 이름, 시트 이름, 위치)]
+# categories 순서대로, splits 의 분류는 키워드_분류 값별로 나눈 파일을 추가합니다.
+def bundle_parts(df, categories, names=None, splits=None):
+    names = names or {}
+    splits = splits or {}
+    qualitative = df['키워드_분류_질적'].astype(str).to_numpy()
+    positions = pd.Series(qualitative).groupby(qualitative, sort=False).indices
+    parts = []
+    for category in categories:
+        if category not in positions:
+            continue
+        name = names.get(category, category)
+        parts.append((name, name, positions[category]))
+        if category in splits:
+            labels = df['키워드_분류'].astype(str).to_numpy()[positions[category]]
+            for label in splits[category]:
+                rows = positions[category][labels == label]
+                if len(rows):
+                    parts.append((f'{name}_{label}', f'{label} 키워드', rows))
+    return parts
+
+
+# zip 항목 하나에 DataFrame 기록
+def _write_entry(stream, df, fmt, sheet_name, index=False):
+    if fmt == 'xlsx':
+        workbook, header_format = _new_workbook(stream)
+        _write_frame(workbook.add_worksheet(sheet_name[:31]), df, header_format, index=index)
+        workbook.close()
+    elif fmt == 'csv':
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함, 묶음 단위로 나눠 기록
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        if index:
+            df = df.reset_index()
+        if not len(df):
+            df.to_csv(text, index=False)
+        for start in range(0, len(df), _CSV_CHUNK_ROWS):
+            df.iloc[start:start + _CSV_CHUNK_ROWS].to_csv(text, index=False, header=start == 0)
+        text.flush()
+        text.detach()
+    else:
+        if index:
+            df = df.reset_index()
+        df.to_parquet(stream, index=False)
+
+
+# 묶음 zip 작성 (output: 경로 또는 버퍼) → 기록한 항목 이름 목록
+# progress(기록한 항목 수, 전체 항목 수, 항목 이름) 는 항목을 하나 기록할 때마다 호출
+def write_bundle(final_df, output, fmt='xlsx', categories=None, names=None, splits=None, name='키워드_질적분류_결과', progress=None):
+    if fmt not in bundle_formats:
+        raise ValueError(f'지원하지 않는 형식: {fmt} (사용 가능: {", ".join(bundle_formats)})')
+    df, classification_stats = prepare_export(final_df)
+    if categories is None:
+        categories = list(dict.fromkeys(df['키워드_분류_질적'].astype(str)))
+    parts = bundle_parts(df, categories, names, splits)
+    total = len(parts) + (1 if fmt == 'xlsx' else 2)
+    written = []
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        def entry(filename, frame, sheet_name, index=False):
+            with bundle.open(filename, 'w', force_zip64=True) as stream:
+                _write_entry(stream, frame, fmt, sheet_name, index)
+            written.append(filename)
+            if progress is not None:
+                progress(len(written), total, filename)
+
+        # 전체 데이터 + 통계 (엑셀은 기존 전체 다운로드와 같은 두 시트 파일 하나)
+        if fmt == 'xlsx':
+            with bundle.open(f'{name}.xlsx', 'w', force_zip64=True) as stream:
+                write_excel(df, classification_stats, stream)
+            written.append(f'{name}.xlsx')
+            if progress is not None:
+                progress(len(written), total, f'{name}.xlsx')
+        else:
+            entry(f'{name}_분류결과.{fmt}', df, '원본데이터')
+            entry(f'{name}_통계.{fmt}', classification_stats, '통계', index=True)
+
+        for filename, sheet_name, rows in parts:
+            entry(f'분류별/{filename}.{fmt}', df.take(rows), sheet_name)
+    return written
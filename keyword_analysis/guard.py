@@ -0,0 +1,97 @@
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+# 시간 제한 분류 (안전 모드)
+# 고유 키워드를 묶음으로 나눠 별도 프로세스에서 분류하고, 묶음마다 시간 한도를 둡니다.
+# 한도를 넘기면 프로세스를 종료하고, 그때 평가 중이던 키워드를 '평가 시간 초과' 로 표시한 뒤
+# 나머지 키워드는 새 프로세스에서 이어서 분류합니다.
+#   KEYWORD_DASHBOARD_SAFE_MODE = auto (기본: 역추적 위험 규칙이 정규식으로 평가될 때만) / 1 / 0
+#   KEYWORD_DASHBOARD_RULE_BUDGET = 묶음당 시간 한도 (초, 기본 5)
+
+TIMEOUT_DETAIL = '평가 시간 초과'
+_TIMEOUT = -2
+
+safe_mode = os.environ.get('KEYWORD_DASHBOARD_SAFE_MODE', 'auto')
+default_budget = float(os.environ.get('KEYWORD_DASHBOARD_RULE_BUDGET', 5))
+default_chunk_size = 2000
+
+
+def guard_enabled(classifier, mode=None):
+    mode = mode or safe_mode
+    if mode == 'auto':
+        return bool(classifier.risky_regex_rules)
+    return mode not in ('', '0')
+
+
+# 작업 프로세스: 공유 배열에 규칙 위치를 기록하고 진행 위치를 갱신
+def _evaluate(classifier, texts, offset, positions, progress):
+    for i in range(progress.value - offset, len(texts)):
+        positions[offset + i] = classifier.match_position(texts[i])
+        progress.value = offset + i + 1
+
+
+# 키워드 배열 → (키워드_분류 배열, 키워드_상세분류 배열, 시간 초과 키워드 목록)
+def classify_guarded(classifier, keywords, budget=None, chunk_size=default_chunk_size, workers=1):
+    budget = default_budget if budget is None else budget
+    keywords = np.asarray(keywords, dtype=object)
+    uniques, inverse = np.unique(keywords.astype(str), return_inverse=True)
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    positions = context.Array('i', len(uniques), lock=False)
+    pending = deque((start, min(start + chunk_size, len(uniques))) for start in range(0, len(uniques), chunk_size))
+    running = []
+    timed_out = []
+
+    try:
+        while pending or running:
+            while pending and len(running) < max(1, workers):
+                start, end = pending.popleft()
+                progress = context.Value('i', start, lock=False)
+                process = context.Process(
+                    target=_evaluate,
+                    args=(classifier, uniques[start:end], start, positions, progress),
+                    daemon=True
+                )
+                process.start()
+                running.append((process, end, progress, time.monotonic() + budget))
+
+            timeout = max(0.0, min(deadline for *_, deadline in running) - time.monotonic())
+            multiprocessing.connection.wait([process.sentinel for process, *_ in running], timeout)
+
+            still_running = []
+            for process, end, progress, deadline in running:
+                if not process.is_alive():
+                    process.join()
+                    # 종료 코드 대신 진행 위치로 완료 여부를 판단
+                    # (스레드에서 fork 된 프로세스는 종료 처리 중 오류로 종료 코드가 1이 될 수 있음)
+                    if progress.value < end:
+                        raise RuntimeError(f'키워드 분류 프로세스가 비정상 종료되었습니다 (exit code {process.exitcode})')
+                elif time.monotonic() >= deadline:
+                    process.kill()
+                    process.join()
+                    # 평가 중이던 키워드만 시간 초과로 표시하고 나머지는 새 한도로 이어서 분류
+                    current = progress.value
+                    if current < end:
+                        positions[current] = _TIMEOUT
+                        timed_out.append(uniques[current])
+                        if current + 1 < end:
+                            pending.appendleft((current + 1, end))
+                else:
+                    still_running.append((process, end, progress, deadline))
+            running = still_running
+    finally:
+        for process, *_ in running:
+            process.kill()
+            process.join()
+
+    label_table = np.array([label for label, _ in classifier.ordered] + ['미분류', '미분류'], dtype=object)
+    detail_table = np.array([rule.name for _, rule in classifier.ordered] + [TIMEOUT_DETAIL, '미분류'], dtype=object)
+    # -1(미분류), -2(시간 초과) 는 표의 마지막 두 칸을 가리킴
+    codes = np.frombuffer(positions, dtype=np.int32)
+    return label_table[codes][inverse], detail_table[codes][inverse], timed_out
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# 백그라운드 작업 큐 (대시보드의 무거운 분석/내보내기)
+# 작업은 입력 해시 등으로 만든 키로 구분하며, 같은 키로 다시 제출하면 새로 시작하지 않고
+# 실행 중이거나 끝난 작업에 연결합니다 (실패한 작업만 다시 실행).
+# 작업 함수는 Job 을 받아 단계(stage)와 단계 안의 진행(done/total)을 기록하고, 페이지는 이를 주기적으로 읽어 표시합니다.
+# 큰 결과(DataFrame, 내보내기 파일)는 작업에 두지 않고 공유 결과 캐시(ResultCache)에 넣어 그 용량 한도를 따르며,
+# 작업 결과에는 결과 캐시 키만 남깁니다 (store/load). 결과 캐시 한도보다 커서 보관되지 않는 값만
+# 작업이 들고 있다가 작업을 지우거나(forget) 오래된 작업으로 정리될 때 놓습니다.
+#   KEYWORD_DASHBOARD_JOB_WORKERS = 동시에 실행할 작업 수 (기본 2)
+#   KEYWORD_DASHBOARD_JOB_WAIT = 페이지가 작업 완료를 바로 기다리는 시간 (초, 기본 3, 넘으면 진행 상황 표시로 전환)
+
+default_job_workers = int(os.environ.get('KEYWORD_DASHBOARD_JOB_WORKERS', 2))
+inline_wait = float(os.environ.get('KEYWORD_DASHBOARD_JOB_WAIT', 3))
+
+
+class Job:
+    def __init__(self, key, name=''):
+        self.key = key
+        self.name = name
+        self.status = 'queued'  # queued → running → done / failed
+        self.stage = '대기 중'
+        self.done = 0
+        self.total = 0
+        self.detail = ''
+        self.result = None
+        self.error = None
+        self.traceback = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished_at = None
+        self._event = threading.Event()
+        self._oversized = {}  # 결과 캐시 한도보다 커서 보관되지 않은 값
+
+    # 새 단계 시작 (total 이 있으면 단계 안에서 done/total 로 진행 표시)
+    def set_stage(self, stage, total=0):
+        self.stage = stage
+        self.done = 0
+        self.total = total
+        self.detail = ''
+
+    def advance(self, done, total=None, detail=''):
+        self.done = done
+        if total is not None:
+            self.total = total
+        self.detail = detail
+
+    # 결과를 결과 캐시에 넣고 키를 반환
+    def store(self, cache, key, value):
+        if key not in cache:
+            cache.put(key, value)
+        if key not in cache:
+            self._oversized[key] = value
+        return key
+
+    # 결과 캐시 키 → 값 (결과 캐시에서 내보내졌으면 None)
+    def load(self, cache, key):
+        if key in self._oversized:
+            return self._oversized[key]
+        return cache.get(key)
+
+    @property
+    def finished(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+    # 현재 단계의 진행 비율 (0~1)
+    @property
+    def fraction(self):
+        if self.finished:
+            return 1.0
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+    @property
+    def text(self):
+        text = self.stage
+        if self.total:
+            text += f' ({int(self.done):,}/{self.total:,})'
+        if self.detail:
+            text += f' · {self.detail}'
+        return text
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started
+
+    def _run(self, func):
+        self.status = 'running'
+        self.started = time.time()
+        try:
+            self.result = func(self)
+            self.status = 'done'
+        except Exception as e:
+            self.error = f'{type(e).__name__}: {e}'
+            self.traceback = traceback.format_exc()
+            self.status = 'failed'
+        finally:
+            self.finished_at = time.time()
+            self._event.set()
+
+
+class JobQueue:
+    def __init__(self, workers=None, keep=16):
+        self.executor = ThreadPoolExecutor(max_workers=workers or default_job_workers, thread_name_prefix='keyword-job')
+        self.keep = keep
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    # 키에 해당하는 작업 (실행 중이거나 끝난 작업이 있으면 그 작업, 없거나 실패했으면 새로 제출)
+    def submit(self, key, func, name=''):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status != 'failed':
+                return job
+            job = Job(key, name)
+            self._jobs[key] = job
+            self._prune()
+        self.executor.submit(job._run, func)
+        return job
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    # 끝난 작업을 목록에서 제거 (다음 submit 에서 다시 실행)
+    def forget(self, key):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.finished:
+                del self._jobs[key]
+
+    # 끝난 작업은 최근 keep 개만 보관
+    def _prune(self):
+        finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at)
+        for job in finished[:max(0, len(finished) - self.keep)]:
+            del self._jobs[job.key]
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def info(self):
+        jobs = self.jobs()
+        return {status: sum(job.status == status for job in jobs) for status in ('queued', 'running', 'done', 'failed')}
@@ -0,0 +1,710 @@
+import functools
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from keyword_analysis import shard
+from keyword_analysis.cache import FrameCache, KeywordMemo, LabelStore, keyword_memo_enabled, label_store_enabled
+from keyword_analysis.classifier import KeywordClassifier
+from keyword_analysis.guard import TIMEOUT_DETAIL, classify_guarded, guard_enabled
+from keyword_analysis.rules import load_ruleset, rules_fingerprint
+from keyword_analysis.shard import classify_sharded
+
+numeric_columns = ['월간검색수(PC)', '월간검색수(모바일)', '월평균클릭수(PC)', '월평균클릭수(모바일)', '월평균노출 광고수']
+ctr_columns = ['월평균클릭률(PC)', '월평균클릭률(모바일)']
+label_columns = ['키워드_분류', '키워드_상세분류', '키워드_분류_질적']
+# 네이버 키워드 도구 엑셀 다운로드의 컬럼 순서 (합성 데이터, 검색광고 API 수집 결과)
+raw_columns = ['연관키워드', '월간검색수(PC)', '월간검색수(모바일)', '월평균클릭수(PC)', '월평균클릭수(모바일)',
+               '월평균클릭률(PC)', '월평균클릭률(모바일)', '경쟁정도', '월평균노출 광고수']
+# 엑셀에서 읽어 오는 컬럼 (그 외 컬럼은 읽지 않음)
+ingest_columns = ['연관키워드'] + numeric_columns + ctr_columns + ['경쟁정도']
+# 정규화된 키워드 컬럼 형식 (Arrow 문자열: 중복 제거/통합 단계가 Arrow 연산으로 비교)
+keyword_dtype = pd.StringDtype('pyarrow')
+
+# 압축 형식 (KEYWORD_DASHBOARD_COMPACT=1): 검색/클릭수 uint32, 클릭률 float32,
+# 라벨 컬럼은 고정 범주의 범주형으로 저장해 메모리를 줄입니다.
+compact_enabled = os.environ.get('KEYWORD_DASHBOARD_COMPACT', '') not in ('', '0')
+count_columns = numeric_columns + ['총 검색수', '총 클릭수']
+
+
+# 업로드 파일 내용 해시 (캐시 키)
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# 1. 수집: 엑셀 바이트 → 원본 DataFrame (필요한 컬럼만)
+def read_workbook(data, columns=ingest_columns):
+    usecols = None if columns is None else (lambda col: col in columns)
+    return pd.read_excel(io.BytesIO(data), usecols=usecols)
+
+
+# 숫자 컬럼 전처리
+def clean_numeric(col):
+    col = col.astype(str).str.replace(',', '', regex=False)
+    col = col.replace('< 10', '5')
+    return pd.to_numeric(col, errors='coerce').fillna(0).astype(int)
+
+
+def clean_ctr(col):
+    col = col.astype(str).str.replace('%', '', regex=False)
+    return pd.to_numeric(col, errors='coerce').fillna(0)
+
+
+# 키워드 정규화 함수 (키워드 하나)
+def normalize_keyword(keyword):
+    keyword = str(keyword).lower()
+    keyword = re.sub(r'[^\w\s]', '', keyword)
+    keyword = re.sub(r'\s+', ' ', keyword)
+    return keyword.strip()
+
+
+# 고유 키워드 배열을 문자열 연산으로 한 번에 정규화 (normalize_keyword 와 같은 결과)
+def _normalize_values(values):
+    s = pd.Series(values, dtype=object).str.lower()
+    s = s.str.replace(r'[^\w\s]', '', regex=True)
+    s = s.str.replace(r'\s+', ' ', regex=True)
+    return s.str.strip().to_numpy(dtype=object)
+
+
+# 키워드 컬럼 정규화: 고유값만 정규화한 뒤 원래 위치로 되돌림
+# memo 가 있으면 이전 실행에서 정규화한 값을 재사용하고 새 값만 추가합니다.
+def normalize_keywords(col, memo=None):
+    codes, uniques = pd.factorize(col.astype(str))
+    uniques = np.asarray(uniques, dtype=object)
+    if memo is None:
+        normalized = _normalize_values(uniques)
+    else:
+        normalized, missing = memo.lookup(uniques)
+        if missing.any():
+            normalized[missing] = _normalize_values(uniques[missing])
+            try:
+                memo.update(uniques[missing], normalized[missing])
+            except OSError:
+                pass  # 캐시 폴더에 쓸 수 없으면 메모 없이 진행
+    return pd.Series(pd.array(normalized, dtype=keyword_dtype).take(codes), index=col.index, name=col.name)
+
+
+# 실행 중인 프로세스에서 공유하는 정규화 메모 (KEYWORD_DASHBOARD_KEYWORD_MEMO 로 사용 여부 설정)
+@functools.lru_cache(maxsize=1)
+def get_keyword_memo():
+    return KeywordMemo() if keyword_memo_enabled else None
+
+
+def add_totals(df):
+    df['총 검색수'] = df['월간검색수(PC)'] + df['월간검색수(모바일)']
+    df['총 클릭수'] = df['월평균클릭수(PC)'] + df['월평균클릭수(모바일)']
+    return df
+
+
+# 숫자/클릭률 변환 및 합계 컬럼 추가
+def clean_metrics(df):
+    df = df.copy()
+    for col in numeric_columns:
+        if col in df.columns:
+            df[col] = clean_numeric(df[col])
+    for col in ctr_columns:
+        if col in df.columns:
+            df[col] = clean_ctr(df[col])
+    return add_totals(df)
+
+
+# 2. 정제: 숫자/클릭률 변환 및 키워드 정규화 (파일 단위)
+def clean_frame(df, memo=None):
+    df = clean_metrics(df)
+    df['연관키워드'] = normalize_keywords(df['연관키워드'], memo)
+    return df.drop_duplicates(subset=['연관키워드'])
+
+
+# 3. 통합: 파일 순서대로 합치면서 중복 키워드 제거
+# 지표별 정책 (KEYWORD_DASHBOARD_MERGE_POLICY, 기본 first)
+#   first  = 먼저 나온 파일 값 유지 (기존 방식)   latest = 나중 파일 값으로 교체
+#   max    = 최댓값   mean = 평균 (검색/클릭/광고수는 정수로 반올림)   sum = 합계
+#   'latest' 처럼 전체에 하나를 쓰거나 'latest,월평균노출 광고수=mean' 처럼 지표별로 지정
+# first 외의 정책을 쓰면 '출처_파일'과 '중복_횟수'(키워드가 나온 파일 수)를 함께 기록합니다.
+#   출처_파일 = latest/max 지표 값을 가져온 파일 (max 는 더 큰 값이 나온 파일, 같으면 먼저 나온 파일)
+#               지표가 mean/sum 뿐이면 여러 파일 값을 합친 키워드는 '병합'
+merge_policies = ['first', 'latest', 'max', 'mean', 'sum']
+merge_policy = os.environ.get('KEYWORD_DASHBOARD_MERGE_POLICY', 'first')
+merge_columns = numeric_columns + ctr_columns
+
+
+# 정책 문자열/딕셔너리 → {지표: 정책}
+def parse_merge_policy(policy=None):
+    policy = merge_policy if policy is None else policy
+    if isinstance(policy, dict):
+        items = dict(policy)
+    else:
+        items = {}
+        for part in str(policy).split(','):
+            part = part.strip()
+            if part:
+                name, _, value = part.rpartition('=')
+                items[name.strip() or '*'] = value.strip()
+    default = items.pop('*', 'first')
+    policies = {col: items.pop(col, default) for col in merge_columns}
+    if items:
+        raise ValueError(f'알 수 없는 지표: {", ".join(items)}')
+    unknown = sorted(set(policies.values()) - set(merge_policies))
+    if unknown:
+        raise ValueError(f'알 수 없는 통합 정책: {", ".join(unknown)} (사용 가능: {", ".join(merge_policies)})')
+    return policies
+
+
+# 파일별 결과를 합친 뒤 결측값 정리와 합계 컬럼 계산
+def _finish_merge(combined_df, ruleset=None):
+    # 일부 파일에만 있는 컬럼은 합친 뒤 결측값이 생기므로 다시 정리
+    for col in numeric_columns:
+        if col in combined_df.columns and combined_df[col].isna().any():
+            combined_df[col] = combined_df[col].fillna(0).astype(int)
+    for col in ctr_columns:
+        if col in combined_df.columns:
+            combined_df[col] = combined_df[col].fillna(0)
+    combined_df = add_totals(combined_df)
+    # 파일마다 범주가 다른 컬럼(경쟁정도)은 합치면 object 로 돌아가므로 다시 압축
+    return compact_frame(combined_df, ruleset) if compact_enabled else combined_df
+
+
+# dfs 는 제너레이터여도 되며, 파일을 하나씩 읽으면서 바로 통합하므로 메모리는 고유 키워드 수에 비례합니다.
+# names 는 '출처_파일' 에 기록할 파일 이름 (없으면 1부터 매긴 파일 번호)
+# ruleset 은 파일을 분류한 규칙 세트 (압축 형식의 라벨 범주)
+def merge_frames(dfs, policy=None, names=None, ruleset=None):
+    policies = parse_merge_policy(policy)
+    if all(value == 'first' for value in policies.values()):
+        return _merge_first(dfs, ruleset)
+    return _merge_policy(dfs, policies, names, ruleset)
+
+
+# first: 파일마다 이미 나온 키워드를 바로 걸러내므로 중복 행을 모두 합친 사본을 만들지 않음
+def _merge_first(dfs, ruleset=None):
+    parts = []
+    seen = pd.Index([], dtype=keyword_dtype)
+    for df in dfs:
+        df = df.drop_duplicates(subset=['연관키워드'])
+        if len(seen):
+            df = df[~df['연관키워드'].isin(seen)]
+        parts.append(df)
+        seen = seen.append(pd.Index(df['연관키워드'])) if len(seen) else pd.Index(df['연관키워드'])
+    combined_df = pd.concat(parts, ignore_index=True)
+    del parts
+    return _finish_merge(combined_df, ruleset)
+
+
+# 키워드 → 행 위치 누적기에 파일을 하나씩 접어 넣는 해시 병합
+def _merge_policy(dfs, policies, names=None, ruleset=None):
+    acc = None
+    counts = np.empty(0, dtype=np.int64)
+    sources = np.empty(0, dtype=np.int64)  # 출처 파일 번호 (-1 = 병합)
+    # 출처를 정하는 지표가 없으면(mean/sum 뿐) 중복 키워드는 '병합'
+    selects_source = any(value in ('latest', 'max') for value in policies.values())
+    # mean 지표별로 값이 있던(결측이 아닌) 파일 수 (지표가 없거나 빈 파일은 평균에서 제외)
+    mean_columns = [col for col, value in policies.items() if value == 'mean']
+    valid = {}
+
+    def has_value(frame, col):
+        if col not in frame.columns:
+            return np.zeros(len(frame), dtype=np.int64)
+        return (~np.isnan(frame[col].to_numpy(dtype=np.float64))).astype(np.int64)
+
+    for i, df in enumerate(dfs):
+        df = df.drop_duplicates(subset=['연관키워드']).reset_index(drop=True)
+        if acc is None:
+            acc = df
+            counts = np.ones(len(df), dtype=np.int64)
+            sources = np.full(len(df), i, dtype=np.int64)
+            valid = {col: has_value(df, col) for col in mean_columns}
+            continue
+        positions = pd.Index(acc['연관키워드']).get_indexer(df['연관키워드'])
+        found = positions >= 0
+        rows = positions[found]
+        if len(rows):
+            incoming = df[found]
+            won = np.zeros(len(rows), dtype=bool)
+            for col, value in policies.items():
+                if col not in incoming.columns or value == 'first':
+                    continue
+                if col not in acc.columns:
+                    acc[col] = np.nan
+                new = incoming[col].to_numpy(dtype=np.float64)
+                if value == 'latest':
+                    merged = new
+                    won[:] = True
+                else:
+                    old = acc[col].to_numpy(dtype=np.float64)[rows]
+                    if value == 'max':
+                        merged = np.fmax(old, new)
+                        won |= (new > old) | (np.isnan(old) & ~np.isnan(new))
+                    else:
+                        # mean 은 합계로 누적한 뒤 마지막에 값이 있던 파일 수로 나눔
+                        merged = np.nansum([old, new], axis=0)
+                        if value == 'mean':
+                            valid[col][rows] += ~np.isnan(new)
+                acc[col] = acc[col].astype(np.float64)
+                acc.iloc[rows, acc.columns.get_loc(col)] = merged
+            # 경쟁정도는 가장 최근 파일 값으로 (범주형이면 새 범주가 들어올 수 있으므로 object 로)
+            if '경쟁정도' in incoming.columns and '경쟁정도' in acc.columns:
+                acc['경쟁정도'] = acc['경쟁정도'].astype(object)
+                acc.iloc[rows, acc.columns.get_loc('경쟁정도')] = incoming['경쟁정도'].astype(object).to_numpy()
+            counts[rows] += 1
+            if selects_source:
+                sources[rows[won]] = i
+            else:
+                sources[rows] = -1
+        fresh = df[~found]
+        if len(fresh):
+            acc = pd.concat([acc, fresh], ignore_index=True)
+            counts = np.concatenate([counts, np.ones(len(fresh), dtype=np.int64)])
+            valid = {col: np.concatenate([valid[col], has_value(fresh, col)]) for col in mean_columns}
+            sources = np.concatenate([sources, np.full(len(fresh), i, dtype=np.int64)])
+    if acc is None:
+        raise ValueError('No objects to concatenate')
+
+    for col, value in policies.items():
+        if col not in acc.columns:
+            continue
+        if value == 'mean':
+            with np.errstate(invalid='ignore'):
+                acc[col] = acc[col].to_numpy(dtype=np.float64) / valid[col]
+        if col in numeric_columns:
+            acc[col] = acc[col].fillna(0).round().astype(int)
+    labels = [str(i + 1) for i in range(sources.max() + 1)] if names is None else list(names)
+    # -1 은 목록 마지막의 '병합' 을 가리킴
+    acc['출처_파일'] = pd.Categorical(np.asarray(labels + ['병합'], dtype=object)[sources])
+    acc['중복_횟수'] = counts
+    return _finish_merge(acc, ruleset)
+
+
+# 캐시에서 정제 결과 읽기 (Arrow 문자열 키워드 컬럼은 to_pandas 에서 python 문자열로 바뀌므로 되돌림)
+def _cached_cleaned(cache, key):
+    df = cache.get(key)
+    if df is not None and df['연관키워드'].dtype != keyword_dtype:
+        df['연관키워드'] = df['연관키워드'].astype(keyword_dtype)
+    return df
+
+
+# 정제 결과를 디스크 캐시에서 읽고, 없으면 엑셀을 파싱해 저장
+def load_cleaned(data, key=None, cache=None):
+    key = key or content_hash(data)
+    cache = cache or FrameCache()
+    df = _cached_cleaned(cache, key)
+    if df is None:
+        df = clean_frame(read_workbook(data), get_keyword_memo())
+        try:
+            cache.put(key, df)
+        except OSError:
+            pass  # 캐시 폴더에 쓸 수 없으면 캐시 없이 진행
+    return df
+
+
+# 파일 하나 수집 → 정제 → 분류 (병렬 수집 작업 프로세스에서 실행)
+# 큰 파일(KEYWORD_DASHBOARD_STREAM_MB 이상)은 묶음 단위로 읽는 스트리밍 방식으로 처리합니다.
+def analyze_workbook(data, key=None, progress=None, ruleset=None):
+    if use_streaming(data):
+        return stream_workbook(data, key, progress=progress, ruleset=ruleset)
+    return classify_keywords(load_cleaned(data, key), ruleset)
+
+
+# 1-1. 대용량 파일 스트리밍 수집
+# pd.read_excel 은 시트 전체를 파이썬 객체로 만든 뒤 정제하므로 100만 행 파일에 수 GB 가 필요합니다.
+# openpyxl 읽기 전용 모드로 chunk_rows 행씩 읽어 묶음마다 정제/정규화/분류하고,
+# 앞 묶음에 나온 키워드는 해시 집합으로 걸러내며, 압축 형식 결과만 모아 둡니다.
+# 묶음의 클릭률은 float64 그대로 두므로 기본 형식으로 되돌린 결과와 캐시는 read_excel 경로와 같습니다.
+#   KEYWORD_DASHBOARD_STREAM_MB = 스트리밍으로 처리할 최소 파일 크기 (MB, 기본 20, 0 이면 항상)
+#   KEYWORD_DASHBOARD_CHUNK_ROWS = 묶음 행 수 (기본 50000)
+stream_min_mb = float(os.environ.get('KEYWORD_DASHBOARD_STREAM_MB', 20))
+chunk_rows = int(os.environ.get('KEYWORD_DASHBOARD_CHUNK_ROWS', 50000))
+# pd.read_excel 이 결측값으로 읽는 문자열 (pandas 기본값)
+_na_strings = frozenset(['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                         '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'])
+
+
+def use_streaming(data):
+    return len(data) >= stream_min_mb * 1024 * 1024
+
+
+# 셀 값을 pd.read_excel 과 같게 변환 (빈 칸/결측 문자열 → NaN, 정수인 실수 → int)
+def _cell_value(value):
+    if value is None or (isinstance(value, str) and value in _na_strings):
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+# 엑셀 바이트 → (전체 행 수 추정값, (시작 행, 원본 DataFrame) 묶음 이터레이터)
+# 전체 행 수는 시트의 dimension 정보로 추정하며 없으면 None
+def iter_workbook_chunks(data, size=None, columns=ingest_columns):
+    import openpyxl
+
+    size = size or chunk_rows
+    workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True, keep_links=False)
+    sheet = workbook.worksheets[0]
+    total = sheet.max_row - 1 if sheet.max_row else None
+    sheet.reset_dimensions()
+    rows = sheet.iter_rows(values_only=True)
+
+    def chunks():
+        try:
+            header = next(rows, ())
+            keep = [i for i, name in enumerate(header) if columns is None or name in columns]
+            names = [header[i] for i in keep]
+            buffer, blank = [], 0
+            start = 0
+            for row in rows:
+                values = [_cell_value(row[i]) if i < len(row) else np.nan for i in keep]
+                if all(value is np.nan for value in values):
+                    # 빈 행은 뒤에 데이터가 있을 때만 포함 (끝의 빈 행은 read_excel 처럼 버림)
+                    blank += 1
+                    continue
+                buffer.extend([[np.nan] * len(keep)] * blank)
+                blank = 0
+                buffer.append(values)
+                if len(buffer) >= size:
+                    yield start, pd.DataFrame(buffer[:size], columns=names, index=pd.RangeIndex(start, start + size))
+                    buffer = buffer[size:]
+                    start += size
+            if buffer:
+                yield start, pd.DataFrame(buffer, columns=names, index=pd.RangeIndex(start, start + len(buffer)))
+        finally:
+            workbook.close()
+
+    return total, chunks()
+
+
+# 스트리밍 수집 → 정제 → 분류 (analyze_workbook 과 같은 결과)
+# progress(처리한 행 수, 전체 행 수 추정값) 는 묶음마다 호출됩니다.
+def stream_workbook(data, key=None, size=None, progress=None, cache=None, ruleset=None):
+    key = key or content_hash(data)
+    cache = cache or FrameCache()
+    cleaned = _cached_cleaned(cache, key)
+    if cleaned is not None:
+        final_df = classify_keywords(cleaned, ruleset)
+        return compact_frame(final_df, ruleset) if compact_enabled else expand_frame(final_df)
+
+    memo = get_keyword_memo()
+    # 묶음마다 새로 분류한 라벨은 모아 두었다가 파일을 다 처리한 뒤 한 번에 저장
+    store = LabelStore(cache.cache_dir, max_bytes=cache.max_bytes, batch=True) if label_store_enabled else None
+    total, chunks = iter_workbook_chunks(data, size)
+    seen = np.empty(0, dtype=np.uint64)
+    parts = []
+    done = 0
+    for start, raw in chunks:
+        done = start + len(raw)
+        df = clean_frame(raw, memo)
+        # 앞 묶음에 나온 키워드 제거 (정규화한 키워드의 64비트 해시로 비교)
+        hashes = pd.util.hash_array(df['연관키워드'].to_numpy(dtype=object))
+        is_new = ~np.isin(hashes, seen)
+        if not is_new.all():
+            df, hashes = df[is_new], hashes[is_new]
+        seen = np.union1d(seen, hashes)
+        parts.append(compact_frame(classify_keywords(df, ruleset, store), ruleset, ctr=False))
+        del raw, df
+        if progress is not None:
+            progress(done, max(total or 0, done))
+
+    if not parts:
+        # 데이터 행이 없는 파일은 기존 방식으로 처리
+        return classify_keywords(load_cleaned(data, key, cache), ruleset)
+    final_df = compact_frame(pd.concat(parts), ruleset, ctr=False)
+    del parts
+    if store is not None:
+        try:
+            store.flush()
+        except (OSError, ValueError):
+            pass  # 저장하지 못하면 다음 실행에서 다시 분류
+    try:
+        # 캐시에는 clean_frame 결과와 같은 기본 형식으로 저장 (load_cleaned 와 같은 키)
+        cache.put(key, expand_frame(final_df.drop(columns=label_columns)))
+    except OSError:
+        pass  # 캐시 폴더에 쓸 수 없으면 캐시 없이 진행
+    return compact_frame(final_df, ruleset) if compact_enabled else expand_frame(final_df)
+
+
+def default_workers():
+    return int(os.environ.get('KEYWORD_DASHBOARD_WORKERS', min(4, os.cpu_count() or 1)))
+
+
+# 작업 프로세스 풀
+# Streamlit 은 페이지 스크립트를 __main__ 으로 실행하므로 spawn/forkserver 방식은
+# 작업 프로세스에서 대시보드 전체를 다시 실행합니다. 가능한 경우 fork 방식을 사용합니다.
+# pyarrow 는 pandas 연동을 처음 사용할 때 잠금을 잡고 초기화하는데, 다른 스레드가 그 잠금을 쥔 순간에
+# fork 하면 작업 프로세스가 캐시를 읽다가 멈추므로 fork 전에 미리 초기화합니다.
+# 작업 프로세스마다 남는 코어를 나눠 주어 큰 파일의 분류를 그 수만큼 나눠 실행합니다 (shard.resolve_workers).
+def make_process_pool(workers=None):
+    workers = workers or default_workers()
+    classify_workers = shard.classify_workers or max(1, (os.cpu_count() or 1) // workers)
+    pa.Table.from_pandas(pd.DataFrame())
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=context,
+        initializer=shard.set_classify_workers, initargs=(classify_workers,)
+    )
+
+
+# 규칙 지문별로 한 번만 컴파일되는 분류기 (RuleSet 은 지문으로 비교되므로 같은 규칙이면 같은 분류기)
+# 세션/재실행 간에 공유되며, 규칙 파일이 바뀌면 새 지문으로 다시 컴파일합니다.
+@functools.lru_cache(maxsize=8)
+def _build_classifier(ruleset):
+    return KeywordClassifier(ruleset.unsuitable_filters, ruleset.suitable_filters, ruleset.additional_filters)
+
+
+# ruleset: 규칙 세트 이름 (None 이면 기본 규칙 세트)
+def get_classifier(ruleset=None):
+    return _build_classifier(load_ruleset(ruleset))
+
+
+# 고유 키워드 → (키워드_분류, 키워드_상세분류)
+# 라벨 저장소(KEYWORD_DASHBOARD_LABEL_STORE, 기본 사용)가 있으면 같은 규칙 버전으로 분류한 키워드는 저장된 결과를 쓰고,
+# 직전 규칙 버전으로 분류한 키워드는 바뀐 규칙만 평가하며, 처음 보는 키워드만 전체 규칙으로 분류합니다.
+# 저장소를 읽거나 쓰지 못하면 전체를 분류합니다.
+def _classify_uniques(classifier, uniques, store=None):
+    labels = np.full(len(uniques), None, dtype=object)
+    details = np.full(len(uniques), None, dtype=object)
+    guarded = guard_enabled(classifier)
+    if store is not None:
+        fingerprint = classifier.fingerprint
+        try:
+            labels[:], details[:] = store.lookup(fingerprint, uniques)
+            rows = np.flatnonzero(pd.isna(labels))
+            previous = store.previous(fingerprint) if len(rows) and not guarded else None
+            if previous is not None:
+                old_labels, old_details = store.lookup(previous[0], uniques[rows])
+                seen = ~pd.isna(old_labels)
+                result = classifier.reclassify(uniques[rows[seen]], old_labels[seen], old_details[seen], previous[1]) if seen.any() else None
+                if result is not None:
+                    labels[rows[seen]], details[rows[seen]] = result
+        except (OSError, ValueError):
+            store = None
+            labels[:] = details[:] = None
+    stored = np.zeros(len(uniques), dtype=bool) if store is None else ~pd.isna(labels)
+    if store is not None:
+        # 저장소에 그대로 있던 키워드 (이어받아 다시 평가한 키워드는 새로 저장)
+        stored[rows] = False
+
+    missing = pd.isna(labels)
+    if missing.any():
+        if guarded:
+            # 안전 모드: 시간 한도를 넘긴 키워드는 상세분류 '평가 시간 초과' 로 표시
+            labels[missing], details[missing], _ = classify_guarded(classifier, uniques[missing])
+        else:
+            labels[missing], details[missing] = classify_sharded(classifier, uniques[missing])
+
+    if store is not None and not stored.all():
+        keep = ~stored & (details != TIMEOUT_DETAIL)
+        try:
+            store.save(fingerprint, classifier.signature, uniques[keep], labels[keep], details[keep])
+        except (OSError, ValueError):
+            pass
+    return labels, details
+
+
+# 4. 키워드 분류
+# 모든 규칙 용어를 담은 오토마톤으로 키워드를 한 번만 훑어 분류합니다.
+# (부적합: 마지막 일치 규칙 → 적합 → 확장 가능 키워드 순, 기존 정규식 4단계와 동일한 결과)
+# 역추적 위험이 있는 규칙을 정규식으로 평가해야 하면 시간 제한 분류(guard)를 사용합니다.
+# store: 사용할 라벨 저장소 (None 이면 설정에 따라 새로 만듦)
+def classify_keywords(combined_df, ruleset=None, store=None):
+    # 고유 키워드만 분류한 뒤 코드로 펼침
+    codes, uniques = pd.factorize(combined_df['연관키워드'])
+    uniques = np.asarray(uniques, dtype=object)
+    if store is None and label_store_enabled:
+        store = LabelStore()
+    labels, details = _classify_uniques(get_classifier(ruleset), uniques, store)
+
+    # 5. 질적 분류 (규칙 세트의 상세분류 → 질적 분류 조회표)
+    quality_of = load_ruleset(ruleset).quality_of
+    detail_codes, detail_uniques = pd.factorize(details)
+    qualities = np.array([quality_of.get(detail, '미분류') for detail in detail_uniques], dtype=object)[detail_codes]
+
+    labels_df = pd.DataFrame({
+        '키워드_분류': labels[codes],
+        '키워드_상세분류': details[codes],
+        '키워드_분류_질적': qualities[codes],
+    }, index=combined_df.index)
+    if any(col in combined_df.columns for col in label_columns):
+        combined_df = combined_df.drop(columns=label_columns, errors='ignore')
+    # 입력 컬럼은 복사하지 않고 라벨 컬럼만 붙임
+    final_df = pd.concat([combined_df, labels_df], axis=1, copy=False)
+    return compact_frame(final_df, ruleset) if compact_enabled else final_df
+
+
+# 라벨 컬럼의 고정 범주
+# 문자열 순서로 정렬해 두어 범주형으로 바꿔도 정렬/그룹 순서가 object 컬럼과 같습니다.
+def label_categories(ruleset=None):
+    details = {rule.name for rule in get_classifier(ruleset).rules} | {'미분류', TIMEOUT_DETAIL}
+    return {
+        '키워드_분류': sorted({'적합', '확장 가능 키워드', '부적합', '미분류'}),
+        '키워드_상세분류': sorted(details),
+        '키워드_분류_질적': sorted(set(load_ruleset(ruleset).qualitative_groups) | {'미분류'}),
+    }
+
+
+# 압축 형식으로 변환 (df 를 제자리에서 바꾸고 반환, 이미 압축된 컬럼은 그대로)
+# ctr=False 이면 클릭률은 float64 로 둠 (float32 는 원래 값으로 정확히 되돌릴 수 없음)
+def compact_frame(df, ruleset=None, ctr=True):
+    uint32_max = np.iinfo(np.uint32).max
+    for col in count_columns:
+        if col in df.columns and df[col].dtype != np.uint32:
+            values = df[col]
+            if not len(values) or (values.min() >= 0 and values.max() <= uint32_max):
+                df[col] = values.astype(np.uint32)
+    for col in ctr_columns:
+        if ctr and col in df.columns and df[col].dtype != np.float32:
+            df[col] = df[col].astype(np.float32)
+    # 라벨 범주는 아직 범주형이 아닌 라벨 컬럼이 있을 때만 계산 (통합 단계에서는 이미 범주형)
+    pending = [col for col in label_columns if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)]
+    if pending:
+        categories = label_categories(ruleset)
+        for col in pending:
+            df[col] = df[col].astype(pd.CategoricalDtype(categories[col]))
+    if '경쟁정도' in df.columns and not isinstance(df['경쟁정도'].dtype, pd.CategoricalDtype):
+        df['경쟁정도'] = df['경쟁정도'].astype('category')
+    if '연관키워드' in df.columns and df['연관키워드'].dtype != keyword_dtype:
+        df['연관키워드'] = df['연관키워드'].astype(keyword_dtype)
+    return df
+
+
+# 압축 형식 → 기본 형식 (int64/float64/object 라벨, df 를 제자리에서 바꾸고 반환)
+# float32 클릭률은 소수 6자리로 반올림해 원래 값으로 되돌림
+def expand_frame(df):
+    for col in count_columns:
+        if col in df.columns and df[col].dtype == np.uint32:
+            df[col] = df[col].astype(np.int64)
+    for col in ctr_columns:
+        if col in df.columns and df[col].dtype == np.float32:
+            df[col] = df[col].astype(np.float64).round(6)
+    for col in label_columns + ['경쟁정도']:
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    return df
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+
+# 같은 데이터를 기본 형식(int64/float64/object 라벨)으로 둘 때의 메모리 (복사하지 않고 계산)
+def default_memory_mb(df):
+    usage = df.memory_usage(deep=True)
+    total = usage['Index']
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # object 컬럼 = 포인터 8바이트 + 값마다 문자열 객체 크기
+            sizes = np.array([sys.getsizeof(c) for c in series.cat.categories], dtype=np.int64)
+            codes = series.cat.codes.to_numpy()
+            counts = np.bincount(codes[codes >= 0], minlength=len(sizes))
+            total += 8 * len(series) + int(counts @ sizes)
+        elif series.dtype in (np.uint32, np.float32):
+            total += 8 * len(series)
+        else:
+            total += usage[col]
+    return total / 1024 / 1024
+
+
+# 규칙별 계측 보고서 (규칙 진단 패널/JSON 내보내기용)
+def profile_rules(keywords, ruleset=None):
+    report = get_classifier(ruleset).profile(np.asarray(keywords, dtype=object))
+    report['rules_fingerprint'] = rules_fingerprint(ruleset)
+    return report
+
+
+# 계측 보고서 → 표시용 DataFrame
+def rule_profile_frame(report):
+    df = pd.DataFrame(report['rules'])
+    df['ms'] = (df.pop('seconds') * 1000).round(2)
+    return df.rename(columns={
+        'label': '분류', 'rule': '규칙', 'engine': '평가 방식', 'scanned': '평가 수',
+        'matched': '일치 수', 'assigned': '최종 적용 수', 'overridden': '부적합에 밀린 수', 'ms': '시간(ms)'
+    })
+
+
+# 6. 질적 분류별 통계 집계
+def aggregate_stats(final_df):
+    gb = final_df.groupby('키워드_분류_질적', observed=True)
+    classification_stats = gb.agg({
+        '총 검색수': ['mean', 'count'],
+        '총 클릭수': ['mean'],
+        '월평균클릭률(PC)': 'mean',
+        '월평균클릭률(모바일)': 'mean',
+        '월평균노출 광고수': 'mean'
+    })
+    # 압축 형식의 float32 평균은 float64 로 되돌린 뒤 반올림
+    restore = {col: np.float64 for col in classification_stats.columns if classification_stats[col].dtype == np.float32}
+    classification_stats = classification_stats.astype(restore).round(2)
+    classification_stats.columns = ['평균_검색수', '키워드_개수', '평균_클릭수', '평균_클릭률_PC', '평균_클릭률_모바일', '평균_노출광고수']
+    return classification_stats.reset_index()
+
+
+# 7. 분류별 샘플 키워드 표용 색인
+# 한 번의 그룹화로 분류(및 타겟 경쟁 영역의 적합/부적합)별 행 위치와 지표별 상위 k개 위치를 미리 계산해
+# 정렬 기준을 바꿀 때 분류마다 전체를 다시 정렬하지 않고 위치만 조회합니다.
+sample_metrics = ['총 검색수', '월평균클릭률(PC)', '총 클릭수', '월평균노출 광고수']
+split_categories = {'타겟 경쟁 영역': ['적합', '부적합']}
+
+
+# 그룹별 행 위치와 지표별 상위 k개 위치 (값 내림차순, 같은 값은 원래 순서, NaN 은 마지막)
+def _index_groups(final_df, keys, positions, top_k, metrics, rows, top):
+    codes, uniques = pd.factorize(keys)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    for i, key in enumerate(uniques):
+        rows[key] = positions[order[bounds[i]:bounds[i + 1]]]
+    for metric in metrics:
+        values = final_df[metric].to_numpy(dtype=np.float64)[positions]
+        order = np.lexsort((-values, codes))
+        for i, key in enumerate(uniques):
+            top[(key, metric)] = positions[order[bounds[i]:min(bounds[i] + top_k, bounds[i + 1])]]
+
+
+# → {'rows': {키: 행 위치}, 'top': {(키, 지표): 상위 k개 행 위치}, 'means': {분류: {지표: 평균}}, 'details': {분류: 상세분류별 개수}}
+#   키는 분류 이름, 분리해서 보여 주는 분류는 (분류, 키워드_분류) 도 포함
+def category_index(final_df, top_k=10, metrics=None):
+    metrics = metrics or sample_metrics
+    categories = final_df['키워드_분류_질적'].astype(object).to_numpy()
+    rows, top = {}, {}
+    _index_groups(final_df, categories, np.arange(len(final_df)), top_k, metrics, rows, top)
+
+    split = np.flatnonzero(np.isin(categories, list(split_categories)))
+    labels = final_df['키워드_분류'].astype(object).to_numpy()[split]
+    pairs = np.empty(len(split), dtype=object)
+    pairs[:] = list(zip(categories[split], labels))
+    _index_groups(final_df, pairs, split, top_k, metrics, rows, top)
+
+    details = final_df.groupby(['키워드_분류_질적', '키워드_상세분류'], observed=True).size()
+    return {
+        'rows': rows,
+        'top': top,
+        'means': final_df.groupby('키워드_분류_질적', observed=True)[metrics].mean().to_dict('index'),
+        'details': {category: counts.droplevel(0) for category, counts in details.groupby(level=0, observed=True)},
+    }
+
+
+# 분류 전체 키워드 탐색 (페이지 단위로 화면에 보냄)
+browse_metrics = ['총 검색수', '총 클릭수', '월간검색수(PC)', '월간검색수(모바일)', '월평균클릭수(PC)', '월평균클릭수(모바일)',
+                  '월평균클릭률(PC)', '월평균클릭률(모바일)', '월평균노출 광고수']
+
+
+# 행 위치를 지표 기준으로 정렬 (같은 값은 원래 순서, NaN 은 방향과 관계없이 마지막)
+# details 가 주어지면 해당 키워드_상세분류만 남김
+def sorted_positions(final_df, positions, sort_column, ascending=False, details=None):
+    values = final_df[sort_column].to_numpy(dtype=np.float64)[positions]
+    order = positions[np.argsort(values if ascending else -values, kind='stable')]
+    if details:
+        order = order[final_df['키워드_상세분류'].take(order).isin(details).to_numpy()]
+    return order
+
+
+# 정렬된 위치에서 한 페이지만 잘라 DataFrame 으로 (page 는 1부터)
+def page_frame(final_df, order, page, page_size, columns=None):
+    start = (page - 1) * page_size
+    page_df = final_df.take(order[start:start + page_size])
+    return page_df[columns] if columns else page_df
@@ -0,0 +1,154 @@
+import functools
+import hashlib
+import json
+import os
+
+# 분류 규칙 세트 (규칙 파일: keyword_analysis/rulesets/<이름>.json)
+# 고객사별로 이름이 다른 규칙 파일을 두고 KEYWORD_DASHBOARD_RULESET 또는 --ruleset 으로 고릅니다.
+# 규칙 파일은 (경로, 수정 시각, 크기) 버전별로 한 번만 읽고, 분류기도 규칙 지문별로 한 번만 컴파일합니다.
+# 파일을 고치면 다음 실행에서 새 버전으로 읽습니다.
+#   python -m keyword_analysis.rules            # 규칙 세트 목록 (버전, 지문, 규칙 수)
+#   python -m keyword_analysis.rules --check    # 모든 규칙 세트 검사 + 분류기 컴파일
+# 규칙 파일 형식:
+#   {"name": ..., "version": 1, "description": ...,
+#    "suitable_filters": {상세분류: 정규식}, "additional_filters": {...}, "unsuitable_filters": {...},
+#    "qualitative_groups": {질적 분류: [상세분류, ...]}}   # 상세분류 → 질적 분류 매핑 (순서대로 적용)
+
+rules_dir = os.environ.get(
+    'KEYWORD_DASHBOARD_RULES_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rulesets')
+)
+default_ruleset = os.environ.get('KEYWORD_DASHBOARD_RULESET', 'default')
+filter_keys = ['suitable_filters', 'additional_filters', 'unsuitable_filters']
+
+
+class RuleSet:
+    def __init__(self, name, suitable_filters, additional_filters, unsuitable_filters, qualitative_groups, version=None, description=''):
+        self.name = name
+        self.version = version
+        self.description = description
+        self.suitable_filters = suitable_filters
+        self.additional_filters = additional_filters
+        self.unsuitable_filters = unsuitable_filters
+        self.qualitative_groups = qualitative_groups
+
+        # 상세분류 → 질적 분류 조회표 (그룹 순서대로 적용하므로 여러 그룹에 속한 상세분류는 마지막 그룹을 따름)
+        self.quality_of = {}
+        for quality, categories in qualitative_groups.items():
+            for category in categories:
+                self.quality_of[category] = quality
+
+        # 규칙 지문 (캐시 키로 사용, 이름/버전/설명은 포함하지 않음)
+        payload = json.dumps(
+            [suitable_filters, additional_filters, unsuitable_filters, qualitative_groups],
+            ensure_ascii=False, sort_keys=False
+        )
+        self.fingerprint = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    # 같은 규칙이면 같은 세트로 취급 (분류기 캐시 키)
+    def __eq__(self, other):
+        return isinstance(other, RuleSet) and self.fingerprint == other.fingerprint
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+    @property
+    def label(self):
+        return f'{self.name} v{self.version}' if self.version is not None else self.name
+
+
+def ruleset_path(name=None):
+    return os.path.join(rules_dir, f'{name or default_ruleset}.json')
+
+
+def available_rulesets():
+    if not os.path.isdir(rules_dir):
+        return []
+    return sorted(name[:-len('.json')] for name in os.listdir(rules_dir) if name.endswith('.json'))
+
+
+# 규칙 파일 검사 → RuleSet (형식이 맞지 않으면 ValueError)
+def parse_ruleset(doc, name):
+    missing = [key for key in filter_keys + ['qualitative_groups'] if key not in doc]
+    if missing:
+        raise ValueError(f'규칙 세트 {name}: 항목 없음 ({", ".join(missing)})')
+    for key in filter_keys:
+        if not isinstance(doc[key], dict) or not all(isinstance(v, str) for v in doc[key].values()):
+            raise ValueError(f'규칙 세트 {name}: {key} 는 {{상세분류: 정규식}} 형식이어야 합니다')
+    details = {detail for key in filter_keys for detail in doc[key]}
+    unknown = [c for categories in doc['qualitative_groups'].values() for c in categories if c not in details]
+    if unknown:
+        raise ValueError(f'규칙 세트 {name}: qualitative_groups 에 없는 상세분류 ({", ".join(unknown)})')
+    return RuleSet(
+        doc.get('name', name), doc['suitable_filters'], doc['additional_filters'], doc['unsuitable_filters'],
+        doc['qualitative_groups'], doc.get('version'), doc.get('description', '')
+    )
+
+
+@functools.lru_cache(maxsize=16)
+def _load(path, mtime_ns, size):
+    with open(path, encoding='utf-8') as f:
+        doc = json.load(f)
+    return parse_ruleset(doc, os.path.splitext(os.path.basename(path))[0])
+
+
+# 이름 → RuleSet (없으면 기본 규칙 세트, 파일이 그대로면 캐시된 객체)
+def load_ruleset(name=None):
+    if isinstance(name, RuleSet):
+        return name
+    path = ruleset_path(name)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise ValueError(f'규칙 세트를 찾을 수 없습니다: {name or default_ruleset} (사용 가능: {", ".join(available_rulesets()) or "없음"})')
+    return _load(path, stat.st_mtime_ns, stat.st_size)
+
+
+# 규칙 지문 (캐시 키로 사용)
+def rules_fingerprint(name=None):
+    return load_ruleset(name).fingerprint
+
+
+# 기본 규칙 세트 (기존 모듈 속성)
+_default = load_ruleset()
+suitable_filters = _default.suitable_filters
+additional_filters = _default.additional_filters
+unsuitable_filters = _default.unsuitable_filters
+qualitative_groups = _default.qualitative_groups
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m keyword_analysis.rules', description='분류 규칙 세트 목록/검사')
+    parser.add_argument('--check', action='store_true', help='모든 규칙 세트를 읽고 분류기를 컴파일해 검사')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name in available_rulesets():
+        try:
+            ruleset = load_ruleset(name)
+        except ValueError as e:  # json.JSONDecodeError 포함
+            print(f'[오류] {name}: {e}')
+            failed = True
+            continue
+        counts = '/'.join(str(len(getattr(ruleset, key))) for key in filter_keys)
+        marker = '*' if name == default_ruleset else ' '
+        print(f'{marker} {name:<16} {ruleset.label:<20} {ruleset.fingerprint}  규칙 {counts} (적합/확장/부적합)  {ruleset.description}')
+        if args.check:
+            import re
+
+            from keyword_analysis.pipeline import get_classifier
+            try:
+                classifier = get_classifier(name)
+            except re.error as e:
+                print(f'  [오류] 정규식 컴파일 실패: {e}')
+                failed = True
+                continue
+            fallback = [rule.name for rule in classifier.rules if not rule.uses_automaton]
+            print(f'  용어 {len(classifier.terms)}개, 정규식 대체 평가: {", ".join(fallback) or "없음"}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
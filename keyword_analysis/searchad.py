@@ -0,0 +1,360 @@
+import base64
+import hashlib
+import hmac
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential
+
+from keyword_analysis.cache import default_cache_dir
+from keyword_analysis.export import write_sheet
+from keyword_analysis.pipeline import raw_columns
+
+# 네이버 검색광고 API 키워드 도구 수집
+# 시드 키워드를 5개씩 묶어 여러 스레드에서 동시에 요청하고 (연결 재사용 세션, 초당 요청 수 제한,
+# 429/5xx/연결 오류는 지수 백오프로 재시도), 응답은 디스크에 캐시합니다.
+# 결과는 키워드 도구 엑셀 다운로드와 같은 컬럼의 DataFrame 이므로 기존 정제/분류 단계를 그대로 사용합니다.
+#   KEYWORD_DASHBOARD_SEARCHAD_API_KEY / _SECRET / _CUSTOMER = API 라이선스, 비밀키, 고객 ID
+#   KEYWORD_DASHBOARD_SEARCHAD_URL = API 주소 (테스트용 스텁 서버 주소로 바꿀 수 있음)
+#   KEYWORD_DASHBOARD_SEARCHAD_RATE = 초당 최대 요청 수 (기본 5)
+#   KEYWORD_DASHBOARD_SEARCHAD_CACHE_HOURS = 응답 캐시 유효 시간 (기본 24, 0 이면 캐시 사용 안 함)
+#   python -m keyword_analysis.searchad 영어유치원 초등영어 -o seeds.xlsx
+#   python -m keyword_analysis.searchad --seeds-file seeds.txt -o seeds.xlsx --stub   (로컬 스텁 서버, 네트워크 없음)
+
+default_base_url = os.environ.get('KEYWORD_DASHBOARD_SEARCHAD_URL', 'https://api.searchad.naver.com')
+default_rate = float(os.environ.get('KEYWORD_DASHBOARD_SEARCHAD_RATE', 5))
+default_cache_hours = float(os.environ.get('KEYWORD_DASHBOARD_SEARCHAD_CACHE_HOURS', 24))
+response_cache_dir = os.path.join(default_cache_dir, 'searchad')
+
+KEYWORDS_TOOL_URI = '/keywordstool'
+# 요청당 최대 시드 키워드 수 (API 제한)
+batch_size = 5
+retry_status = {429, 500, 502, 503, 504}
+
+# API 응답 필드 → 키워드 도구 엑셀 컬럼
+field_columns = {
+    'relKeyword': '연관키워드',
+    'monthlyPcQcCnt': '월간검색수(PC)',
+    'monthlyMobileQcCnt': '월간검색수(모바일)',
+    'monthlyAvePcClkCnt': '월평균클릭수(PC)',
+    'monthlyAveMobileClkCnt': '월평균클릭수(모바일)',
+    'monthlyAvePcCtr': '월평균클릭률(PC)',
+    'monthlyAveMobileCtr': '월평균클릭률(모바일)',
+    'compIdx': '경쟁정도',
+    'plAvgDepth': '월평균노출 광고수',
+}
+
+
+def credentials():
+    return (
+        os.environ.get('KEYWORD_DASHBOARD_SEARCHAD_API_KEY', ''),
+        os.environ.get('KEYWORD_DASHBOARD_SEARCHAD_SECRET', ''),
+        os.environ.get('KEYWORD_DASHBOARD_SEARCHAD_CUSTOMER', ''),
+    )
+
+
+def configured():
+    return all(credentials())
+
+
+# 요청 서명: base64(HMAC-SHA256(비밀키, "타임스탬프.메서드.경로"))
+def signature(secret_key, timestamp, method, uri):
+    digest = hmac.new(secret_key.encode(), f'{timestamp}.{method}.{uri}'.encode(), hashlib.sha256).digest()
+    return base64.b64encode(digest).decode()
+
+
+# 시드 키워드 → 요청용 형태 (API 는 공백을 허용하지 않음), 순서를 지키며 중복 제거
+def normalize_seeds(seeds):
+    hints = []
+    for seed in seeds:
+        hint = str(seed).replace(' ', '').strip()
+        if hint and hint not in hints:
+            hints.append(hint)
+    return hints
+
+
+# 스레드 간 공유하는 초당 요청 수 제한 (요청 시작 시각을 1/rate 초 간격으로 배정)
+class RateLimiter:
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+# 요청(시드 묶음)별 응답 JSON 디스크 캐시
+class ResponseCache:
+    def __init__(self, cache_dir=None, ttl_hours=None):
+        self.cache_dir = cache_dir or response_cache_dir
+        self.ttl = (default_cache_hours if ttl_hours is None else ttl_hours) * 3600
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def get(self, key):
+        if self.ttl <= 0:
+            return None
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, payload):
+        if self.ttl <= 0:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def _retryable(error):
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    return isinstance(error, requests.HTTPError) and error.response is not None and error.response.status_code in retry_status
+
+
+class SearchAdClient:
+    def __init__(self, api_key=None, secret_key=None, customer_id=None, base_url=None, workers=4, rate=None,
+                 cache=None, timeout=10, max_attempts=5, backoff=0.5):
+        env_key, env_secret, env_customer = credentials()
+        self.api_key = api_key or env_key
+        self.secret_key = secret_key or env_secret
+        self.customer_id = str(customer_id or env_customer)
+        if not (self.api_key and self.secret_key and self.customer_id):
+            raise ValueError('검색광고 API 키가 없습니다 (KEYWORD_DASHBOARD_SEARCHAD_API_KEY/_SECRET/_CUSTOMER)')
+        self.base_url = (base_url or default_base_url).rstrip('/')
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(default_rate if rate is None else rate)
+        self.cache = cache if cache is not None else ResponseCache()
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        # 작업 스레드 수만큼 연결을 유지하는 세션
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.counter_lock = threading.Lock()
+        self.requests_sent = 0
+        self.cache_hits = 0
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _headers(self, method, uri):
+        timestamp = str(int(time.time() * 1000))
+        return {
+            'X-Timestamp': timestamp,
+            'X-API-KEY': self.api_key,
+            'X-Customer': self.customer_id,
+            'X-Signature': signature(self.secret_key, timestamp, method, uri),
+        }
+
+    def _cache_key(self, hints):
+        text = json.dumps([self.base_url, self.customer_id, sorted(hints)], ensure_ascii=False)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _request(self, hints):
+        retrying = Retrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_exponential(multiplier=self.backoff, max=30),
+            retry=retry_if_exception(_retryable),
+            reraise=True,
+        )
+        for attempt in retrying:
+            with attempt:
+                self.limiter.wait()
+                with self.counter_lock:
+                    self.requests_sent += 1
+                response = self.session.get(
+                    self.base_url + KEYWORDS_TOOL_URI,
+                    params={'hintKeywords': ','.join(hints), 'showDetail': 1},
+                    headers=self._headers('GET', KEYWORDS_TOOL_URI),
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                return response.json().get('keywordList', [])
+
+    # 시드 묶음 하나 → 연관 키워드 목록 (캐시 우선)
+    def fetch_batch(self, hints):
+        key = self._cache_key(hints)
+        cached = self.cache.get(key)
+        if cached is not None:
+            with self.counter_lock:
+                self.cache_hits += 1
+            return cached
+        keywords = self._request(hints)
+        try:
+            self.cache.put(key, keywords)
+        except OSError:
+            pass  # 캐시 폴더에 쓸 수 없으면 캐시 없이 진행
+        return keywords
+
+    # 시드 키워드 목록 → 키워드 도구 엑셀과 같은 컬럼의 DataFrame (묶음 순서대로, 같은 연관 키워드는 처음 것만)
+    # progress(완료한 묶음 수, 전체 묶음 수)
+    def fetch(self, seeds, progress=None):
+        hints = normalize_seeds(seeds)
+        batches = [hints[i:i + batch_size] for i in range(0, len(hints), batch_size)]
+        results = [None] * len(batches)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.fetch_batch, batch): i for i, batch in enumerate(batches)}
+            for done, future in enumerate(futures, 1):
+                results[futures[future]] = future.result()
+                if progress is not None:
+                    progress(done, len(batches))
+        rows = [item for keywords in results for item in keywords]
+        df = pd.DataFrame([{column: item.get(field) for field, column in field_columns.items()} for item in rows],
+                          columns=raw_columns)
+        return df.drop_duplicates(subset=['연관키워드'], ignore_index=True)
+
+
+# 시드 키워드 → 키워드 도구 형식 엑셀 바이트 (대시보드 업로드 파일과 같은 경로로 분석)
+def fetch_workbook(seeds, progress=None, **options):
+    with SearchAdClient(**options) as client:
+        df = client.fetch(seeds, progress)
+    output = io.BytesIO()
+    write_sheet(df, output)
+    return output.getvalue()
+
+
+# 테스트/데모용 로컬 스텁 서버 (실제 API 와 같은 서명 검사와 응답 형식, 네트워크 사용 안 함)
+# fail_every=n 이면 n 번째 요청마다 429 를 돌려줘 재시도를 확인할 수 있습니다.
+stub_credentials = {'api_key': 'stub-key', 'secret_key': 'stub-secret', 'customer_id': '1234'}
+_stub_suffixes = ['', '추천', '가격', '후기', '비용', '학원', '온라인', '방법']
+
+
+def _stub_keyword(keyword):
+    seed = int(hashlib.md5(keyword.encode()).hexdigest(), 16)
+    pc, mobile = seed % 5000, (seed >> 16) % 20000
+
+    def count(value):
+        return '< 10' if value < 10 else value
+
+    return {
+        'relKeyword': keyword,
+        'monthlyPcQcCnt': count(pc),
+        'monthlyMobileQcCnt': count(mobile),
+        'monthlyAvePcClkCnt': round(pc * ((seed >> 32) % 50) / 1000, 1),
+        'monthlyAveMobileClkCnt': round(mobile * ((seed >> 40) % 50) / 1000, 1),
+        'monthlyAvePcCtr': round(((seed >> 48) % 800) / 100, 2),
+        'monthlyAveMobileCtr': round(((seed >> 56) % 800) / 100, 2),
+        'plAvgDepth': (seed >> 64) % 16,
+        'compIdx': ['낮음', '중간', '높음'][(seed >> 72) % 3],
+    }
+
+
+def start_stub_server(port=0, fail_every=0, secret_key=stub_credentials['secret_key']):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json;charset=UTF-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            with server.lock:
+                server.request_count += 1
+                count = server.request_count
+            if url.path != KEYWORDS_TOOL_URI:
+                return self._send(404, {'title': 'Not Found'})
+            expected = signature(secret_key, self.headers.get('X-Timestamp', ''), 'GET', KEYWORDS_TOOL_URI)
+            if not hmac.compare_digest(self.headers.get('X-Signature', ''), expected):
+                return self._send(403, {'title': 'Invalid Signature'})
+            if fail_every and count % fail_every == 0:
+                return self._send(429, {'title': 'Too Many Requests'})
+            hints = parse_qs(url.query).get('hintKeywords', [''])[0].split(',')
+            keywords = [_stub_keyword(hint + suffix) for hint in hints if hint for suffix in _stub_suffixes]
+            self._send(200, {'keywordList': keywords})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.request_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def main(argv=None):
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(prog='python -m keyword_analysis.searchad', description='검색광고 API 키워드 도구 수집')
+    parser.add_argument('seeds', nargs='*', help='시드 키워드')
+    parser.add_argument('--seeds-file', help='시드 키워드 파일 (한 줄에 하나)')
+    parser.add_argument('-o', '--output', default='searchad_keywords.xlsx', help='키워드 도구 형식 엑셀 저장 경로')
+    parser.add_argument('-j', '--workers', type=int, default=4, help='동시 요청 수')
+    parser.add_argument('--rate', type=float, default=default_rate, help='초당 최대 요청 수')
+    parser.add_argument('--no-cache', action='store_true', help='응답 캐시 사용 안 함')
+    parser.add_argument('--stub', action='store_true', help='로컬 스텁 서버로 요청 (네트워크/API 키 없이 동작 확인)')
+    args = parser.parse_args(argv)
+
+    seeds = list(args.seeds)
+    if args.seeds_file:
+        with open(args.seeds_file, encoding='utf-8') as f:
+            seeds += [line.strip() for line in f if line.strip()]
+    if not seeds:
+        parser.error('시드 키워드가 없습니다.')
+
+    options = {'workers': args.workers, 'rate': args.rate}
+    if args.no_cache:
+        options['cache'] = ResponseCache(ttl_hours=0)
+    server = None
+    if args.stub:
+        server, options['base_url'] = start_stub_server()
+        options.update(stub_credentials)
+        options.setdefault('cache', ResponseCache(ttl_hours=0))
+    elif not configured():
+        parser.error('KEYWORD_DASHBOARD_SEARCHAD_API_KEY/_SECRET/_CUSTOMER 를 설정하거나 --stub 을 사용하세요.')
+
+    start = time.perf_counter()
+    try:
+        with SearchAdClient(**options) as client:
+            df = client.fetch(seeds, lambda done, total: print(f'[{done}/{total}] 묶음 완료', file=sys.stderr))
+            sent, hits = client.requests_sent, client.cache_hits
+    finally:
+        if server is not None:
+            server.shutdown()
+    write_sheet(df, args.output)
+    print(f'{len(normalize_seeds(seeds)):,}개 시드 → {len(df):,}개 키워드 ({sent}회 요청, 캐시 {hits}회, '
+          f'{time.perf_counter() - start:.1f}초) → {args.output}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
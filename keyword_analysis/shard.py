@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+import pyarrow as pa
+
+# 여러 코어로 나눠 분류
+# 고유 키워드를 Arrow 문자열 배열 하나로 공유 메모리에 올리고, 작업 프로세스마다 자기 구간만 읽어
+# 규칙 위치(self.ordered 의 위치, 미분류 -1)만 돌려받습니다. 키워드를 프로세스마다 피클로 복사하지 않으며,
+# 라벨은 부모 프로세스에서 위치 → (분류, 상세분류) 표로 펼치므로 한 프로세스에서 분류한 결과와 같습니다.
+#   KEYWORD_DASHBOARD_CLASSIFY_WORKERS = 분류 프로세스 수 (기본: KEYWORD_DASHBOARD_WORKERS, 1 이면 나누지 않음)
+#   KEYWORD_DASHBOARD_SHARD_MIN = 나눠서 분류할 최소 고유 키워드 수 (기본 20000)
+# 파일별 작업 프로세스 안에서는(이미 파일 단위로 병렬) 풀을 만들 때 나눠 준 코어 수만큼만 나눕니다
+# (pipeline.make_process_pool, 나눠 받지 않은 작업 프로세스는 나누지 않음).
+
+classify_workers = int(os.environ.get('KEYWORD_DASHBOARD_CLASSIFY_WORKERS', 0)) or None
+shard_min_keywords = int(os.environ.get('KEYWORD_DASHBOARD_SHARD_MIN', 20000))
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()  # 대시보드에서는 여러 스레드가 함께 사용
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            from keyword_analysis.pipeline import make_process_pool
+
+            if _pool is not None:
+                # 다른 스레드가 쓰고 있을 수 있으므로 기다리지 않고 교체 (진행 중인 작업은 끝까지 실행)
+                _pool.shutdown(wait=False)
+            _pool = make_process_pool(workers)
+            _pool_workers = workers
+        return _pool
+
+
+# 작업 프로세스: 공유 메모리의 [start, end) 구간 키워드 → 규칙 위치 배열
+def _classify_range(classifier, name, size, start, end):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        keywords = pa.ipc.open_stream(pa.py_buffer(shm.buf[:size])).read_all().column(0)
+        texts = keywords.slice(start, end - start).to_pylist()
+        del keywords
+    finally:
+        shm.close()
+    return np.fromiter((classifier.match_position(text) for text in texts), dtype=np.int32, count=len(texts))
+
+
+def shard_bounds(total, shards):
+    step = -(-total // shards)
+    return [(start, min(start + step, total)) for start in range(0, total, step)]
+
+
+# 작업 프로세스 초기화: 이 프로세스가 분류에 쓸 프로세스 수
+def set_classify_workers(workers):
+    global classify_workers
+    classify_workers = workers
+
+
+# 사용할 분류 프로세스 수 (키워드가 적으면 1)
+def resolve_workers(count, workers=None):
+    if count < shard_min_keywords:
+        return 1
+    if workers is None:
+        from keyword_analysis.pipeline import default_workers
+
+        in_worker = multiprocessing.parent_process() is not None
+        workers = classify_workers or (1 if in_worker else default_workers())
+    return max(1, workers)
+
+
+# 키워드 배열 → (키워드_분류 배열, 키워드_상세분류 배열), classifier.classify 와 같은 결과
+def classify_sharded(classifier, keywords, workers=None):
+    keywords = np.asarray(keywords, dtype=object)
+    uniques, inverse = np.unique(keywords.astype(str), return_inverse=True)
+    workers = resolve_workers(len(uniques), workers)
+    if workers <= 1:
+        return classifier.classify(keywords)
+
+    sink = pa.BufferOutputStream()
+    array = pa.array(uniques, pa.large_string())
+    with pa.ipc.new_stream(sink, pa.schema([('keyword', array.type)])) as writer:
+        writer.write_batch(pa.record_batch([array], names=['keyword']))
+    buffer = sink.getvalue()
+    del array
+    shm = shared_memory.SharedMemory(create=True, size=max(1, buffer.size))
+    try:
+        shm.buf[:buffer.size] = memoryview(buffer).cast('B')
+        pool = _get_pool(workers)
+        # 프로세스 수보다 잘게 나눠 키워드 길이 차이로 한 프로세스만 늦게 끝나는 일을 줄임
+        futures = [
+            pool.submit(_classify_range, classifier, shm.name, buffer.size, start, end)
+            for start, end in shard_bounds(len(uniques), workers * 4)
+        ]
+        positions = np.concatenate([future.result() for future in futures])
+    finally:
+        shm.close()
+        shm.unlink()
+
+    label_table = np.array([label for label, _ in classifier.ordered] + ['미분류'], dtype=object)
+    detail_table = np.array([rule.name for _, rule in classifier.ordered] + ['미분류'], dtype=object)
+    # -1(미분류) 은 표의 마지막 칸을 가리킴
+    return label_table[positions][inverse], detail_table[positions][inverse]
@@ -0,0 +1,148 @@
+import datetime
+import json
+import os
+import sys
+import time
+
+# 대시보드 시작 시간 측정 (첫 화면까지 걸린 시간)
+# 대시보드 스크립트가 가장 먼저 불러오는 모듈이며, 표준 라이브러리만 사용합니다.
+# 프로세스의 첫 페이지 실행에서 단계별로 이 모듈을 불러온 시점부터의 경과 시간과
+# 그때까지 불러온 무거운 모듈을 기록합니다.
+#   KEYWORD_DASHBOARD_STARTUP_LOG=startup.jsonl → 첫 페이지 실행 결과를 JSON 한 줄로 추가
+#   python -m keyword_analysis.startup --runs 3 --save startup.json
+#   python -m keyword_analysis.startup --compare startup.json
+
+STARTUP_VERSION = 1
+watched_modules = ['pandas', 'numpy', 'pyarrow', 'openpyxl', 'xlsxwriter', 'plotly.graph_objects', 'plotly.express']
+log_path = os.environ.get('KEYWORD_DASHBOARD_STARTUP_LOG', '')
+
+_origin = time.perf_counter()
+marks = {}
+loaded = {}
+_finished = False
+
+
+# 단계 기록 (첫 페이지 실행에서 처음 지날 때만)
+def mark(name):
+    if not _finished and name not in marks:
+        marks[name] = round(time.perf_counter() - _origin, 4)
+        loaded[name] = [module for module in watched_modules if module in sys.modules]
+
+
+# 첫 페이지 실행 완료 → 보고서 (이후 실행에서는 None)
+def finish():
+    global _finished
+    if _finished:
+        return None
+    mark('page')
+    _finished = True
+    report = {
+        'version': STARTUP_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'marks': dict(marks),
+        'loaded': dict(loaded),
+    }
+    if log_path:
+        try:
+            with open(log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(report, ensure_ascii=False) + '\n')
+        except OSError:
+            pass  # 기록하지 못해도 페이지는 그대로 표시
+    return report
+
+
+# 새 프로세스에서 대시보드를 한 번 실행해 시작 시간 측정 (Streamlit AppTest, 캐시 없는 첫 실행)
+def measure(script, timeout=300):
+    import subprocess
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'startup.jsonl')
+        env = dict(os.environ, KEYWORD_DASHBOARD_STARTUP_LOG=path)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.path.dirname(os.path.abspath(script)), env.get('PYTHONPATH')]))
+        code = (
+            'import sys, time\n'
+            'start = time.perf_counter()\n'
+            'from streamlit.testing.v1 import AppTest\n'
+            'at = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2]))\n'
+            'at.run()\n'
+            'print(time.perf_counter() - start)\n'
+            'sys.exit(1 if at.exception else 0)\n'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code, script, str(timeout)],
+            env=env, capture_output=True, text=True, timeout=timeout + 60
+        )
+        if result.returncode != 0 or not os.path.exists(path):
+            raise RuntimeError(f'대시보드 실행 실패: {result.stderr.strip()[-500:]}')
+        with open(path, encoding='utf-8') as f:
+            report = json.loads(f.readline())
+    report['total_seconds'] = round(float(result.stdout.split()[-1]), 4)
+    return report
+
+
+# 여러 번 측정해 단계별 최솟값
+def summarize(reports):
+    names = list(reports[0]['marks'])
+    return {
+        'marks': {name: min(r['marks'][name] for r in reports if name in r['marks']) for name in names},
+        'loaded': reports[0]['loaded'],
+        'total_seconds': min(r['total_seconds'] for r in reports),
+    }
+
+
+# 기준선과 비교 → 회귀 목록 [(단계, 기준값, 현재값)]
+def compare(baseline, current, tolerance=0.25, min_seconds=0.05):
+    regressions = []
+    for name, new in current['marks'].items():
+        old = baseline['marks'].get(name)
+        if old is not None and new > old * (1 + tolerance) and new - old > min_seconds:
+            regressions.append((name, old, new))
+    return regressions
+
+
+def main(argv=None):
+    import argparse
+
+    default_script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'streamlit_keyword_dashboard.py')
+    parser = argparse.ArgumentParser(prog='python -m keyword_analysis.startup', description='대시보드 시작 시간 측정')
+    parser.add_argument('--script', default=default_script, help='측정할 대시보드 스크립트')
+    parser.add_argument('--runs', type=int, default=3, help='측정 횟수 (단계별 최솟값 기록)')
+    parser.add_argument('--save', metavar='JSON', help='결과를 JSON 으로 저장')
+    parser.add_argument('--compare', metavar='JSON', help='기준선 JSON 과 비교 (회귀가 있으면 종료 코드 1)')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='회귀로 볼 증가 비율 (기본 0.25)')
+    args = parser.parse_args(argv)
+
+    reports = [measure(args.script) for _ in range(max(1, args.runs))]
+    summary = summarize(reports)
+    for name, seconds in summary['marks'].items():
+        print(f'{name:<12} {seconds:>8.3f}s  {", ".join(summary["loaded"][name]) or "-"}')
+    print(f'{"total":<12} {summary["total_seconds"]:>8.3f}s  (AppTest 포함)')
+
+    report = {
+        'version': STARTUP_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'runs': len(reports),
+        **summary,
+    }
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'저장: {args.save}', file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.tolerance)
+        for name, old, new in regressions:
+            print(f'[회귀] {name}: {old:g}s → {new:g}s ({new / old - 1:+.0%})' if old else f'[회귀] {name}: {old:g}s → {new:g}s')
+        if regressions:
+            return 1
+        print(f'회귀 없음 (기준선 {args.compare}, 허용 {args.tolerance:.0%})')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
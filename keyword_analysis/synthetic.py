@@ -0,0 +1,157 @@
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+from keyword_analysis.export import write_sheet
+from keyword_analysis.pipeline import raw_columns
+
+# 네이버 키워드 도구 형식의 합성 데이터 생성 (벤치마크/규모 검증용)
+#   - 모든 분류 규칙에 걸리는 키워드 + 일반 수식어 조합 (대소문자/특수문자/공백 변형 포함)
+#   - 검색수 '< 10' 과 쉼표 숫자, 클릭률 '%' 문자열과 '-', 파일 간 중복 키워드
+#   python -m keyword_analysis.synthetic out/ --rows 100k --files 3
+
+# 엑셀 시트 최대 행 수 (헤더 제외)
+EXCEL_MAX_ROWS = 1048575
+
+_modifiers = ['', '추천', '가격', '후기', '비용', '순위', '잘하는곳', '인강', '교재', '무료', '방법', '시간표',
+              '강남', '분당', '일산', '부산', '2024', '2025', '주말', '방학', '1학년', '3학년', '6살', '7세',
+              '온라인', '화상', 'kids', 'Best', '기초', '레벨테스트', '상담', '체험', '할인', '모집']
+_variants = [lambda k: k, lambda k: k.upper(), lambda k: k + '!', lambda k: ' ' + k + ' ', lambda k: k.replace(' ', '  ')]
+
+
+# 규칙별로 실제 그 규칙으로 분류되는 기본 키워드 (+ 규칙 용어 자체)
+def base_keywords(classifier, per_rule=20, seed=0):
+    rng = random.Random(seed)
+    group_terms = {}
+    for term, groups in zip(classifier.terms, classifier.term_groups):
+        for group_id in groups:
+            group_terms.setdefault(group_id, []).append(term)
+
+    bases = []
+    for _, rule in classifier.ordered:
+        if not rule.uses_automaton:
+            continue
+        found = []
+        for _ in range(per_rule * 20):
+            chains, _ = rng.choice(rule.alternatives)
+            keyword = ' '.join(rng.choice(group_terms[group_id]) for chain in chains for group_id in chain)
+            if classifier.classify_one(keyword)[1] == rule.name and keyword not in found:
+                found.append(keyword)
+                if len(found) >= per_rule:
+                    break
+        bases.extend(found)
+    bases.extend(classifier.terms)
+    return sorted(set(bases))
+
+
+# 합성 엑셀 원본 한 개 분량 (read_excel 결과와 같은 형식의 DataFrame)
+# shared 가 주어지면 duplicate_ratio 만큼 해당 키워드를 (표기만 바꿔) 다시 사용합니다.
+def generate_export(rows, bases, seed=0, shared=None, duplicate_ratio=0.0):
+    rng = np.random.default_rng(seed)
+    bases = np.asarray(bases, dtype=object)
+    modifiers = np.asarray(_modifiers, dtype=object)
+
+    keywords = []
+    base_idx = rng.integers(0, len(bases), rows)
+    mod_idx = rng.integers(0, len(modifiers), rows)
+    suffix = rng.integers(0, 1000, rows)
+    variant = rng.integers(0, len(_variants), rows)
+    use_suffix = rng.random(rows) < 0.6
+    for i in range(rows):
+        keyword = bases[base_idx[i]]
+        if modifiers[mod_idx[i]]:
+            keyword = f'{keyword} {modifiers[mod_idx[i]]}'
+        if use_suffix[i]:
+            keyword = f'{keyword} {seed}{suffix[i]}'
+        keywords.append(_variants[variant[i]](keyword))
+    if shared is not None and len(shared) and duplicate_ratio > 0:
+        n_dup = min(int(rows * duplicate_ratio), len(shared))
+        positions = rng.choice(rows, n_dup, replace=False)
+        picks = rng.choice(len(shared), n_dup, replace=False)
+        for position, pick in zip(positions, picks):
+            keywords[position] = _variants[variant[position]](shared[pick].strip())
+
+    def counts(scale):
+        values = np.maximum(0, rng.lognormal(np.log(scale), 1.6, rows)).astype(np.int64) // 10 * 10
+        column = np.empty(rows, dtype=object)
+        small = values < 10
+        column[small] = '< 10'
+        large = values >= 1000
+        column[large] = [f'{v:,}' for v in values[large]]
+        middle = ~small & ~large
+        column[middle] = values[middle]
+        return column, np.where(small, 5, values)
+
+    def clicks(searches):
+        return np.round(searches * rng.uniform(0, 0.05, rows), 1)
+
+    def ctr():
+        values = np.round(rng.uniform(0, 8, rows), 2)
+        column = np.array([f'{v:g}%' for v in values], dtype=object)
+        column[rng.random(rows) < 0.15] = '-'
+        return column
+
+    pc, pc_values = counts(150)
+    mobile, mobile_values = counts(600)
+    return pd.DataFrame({
+        '연관키워드': keywords,
+        '월간검색수(PC)': pc,
+        '월간검색수(모바일)': mobile,
+        '월평균클릭수(PC)': clicks(pc_values),
+        '월평균클릭수(모바일)': clicks(mobile_values),
+        '월평균클릭률(PC)': ctr(),
+        '월평균클릭률(모바일)': ctr(),
+        '경쟁정도': rng.choice(np.array(['높음', '중간', '낮음'], dtype=object), rows, p=[0.6, 0.3, 0.1]),
+        '월평균노출 광고수': rng.integers(0, 16, rows),
+    }, columns=raw_columns)
+
+
+# 전체 rows 행을 files 개 파일로 나눠 생성 (두 번째 파일부터 앞 파일 키워드와 중복 포함)
+def generate_exports(rows, files=1, classifier=None, seed=0, duplicate_ratio=0.1):
+    if classifier is None:
+        from keyword_analysis.pipeline import get_classifier
+        classifier = get_classifier()
+    bases = base_keywords(classifier, seed=seed)
+    frames = []
+    shared = []
+    for i in range(files):
+        part_rows = rows // files + (1 if i < rows % files else 0)
+        df = generate_export(part_rows, bases, seed=seed + i, shared=shared, duplicate_ratio=duplicate_ratio if i else 0.0)
+        frames.append(df)
+        shared = df['연관키워드'].to_numpy(dtype=object)
+    return frames
+
+
+# 행 수 인자: 1000, 10k, 2M 형식
+def parse_rows(text):
+    text = str(text).strip().lower().replace(',', '')
+    scale = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m keyword_analysis.synthetic', description='합성 키워드 도구 엑셀 파일 생성')
+    parser.add_argument('output_dir')
+    parser.add_argument('--rows', default='10k', help='전체 행 수 (예: 1000, 100k, 2M)')
+    parser.add_argument('--files', type=int, default=1, help='나눌 파일 수 (파일당 최대 1,048,575행)')
+    parser.add_argument('--duplicates', type=float, default=0.1, help='두 번째 파일부터 앞 파일 키워드를 다시 쓰는 비율')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rows = parse_rows(args.rows)
+    if -(-rows // args.files) > EXCEL_MAX_ROWS:
+        parser.error(f'파일당 {EXCEL_MAX_ROWS:,}행을 넘습니다. --files 를 늘려 주세요.')
+    os.makedirs(args.output_dir, exist_ok=True)
+    for i, df in enumerate(generate_exports(rows, args.files, seed=args.seed, duplicate_ratio=args.duplicates), 1):
+        path = os.path.join(args.output_dir, f'synthetic_{rows}_{i}.xlsx')
+        write_sheet(df, path)
+        print(f'{path}: {len(df):,}행')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
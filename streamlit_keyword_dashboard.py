@@ -1,12 +1,14 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import re
+import json
 import os
-import plotly.graph_objects as go
 import io
+from concurrent.futures import ThreadPoolExecutor, wait
 import streamlit.components.v1 as components
 
+# pandas/pyarrow 를 쓰는 분석 모듈(keyword_analysis.pipeline, export, guard)은
+# 소개 글과 업로드 영역을 그린 뒤 불러오고, plotly 는 매트릭스를 그릴 때 불러옵니다.
+from keyword_analysis import rules, startup
+
 # 1. 파일 업로드
 st.set_page_config(layout="wide", initial_sidebar_state="collapsed")
 
@@ -152,17 +154,183 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 st.title("SEO 키워드 분석기")
+startup.mark('first_paint')
 
 # 기본 샘플 데이터 경로
 SAMPLE_DATA_PATH = os.path.join(os.path.dirname(__file__), "sample_data", "sample.xlsx")
 
 # 2. 데이터 통합 및 전처리
-dfs = []
+# 단계별 캐시: 파일 내용 해시와 규칙 지문을 키로 사용하므로
+# 같은 입력으로 다시 실행되면 화면만 다시 그리고, 파일이 추가되면 해당 파일만 새로 처리합니다.
+# 엑셀 파싱은 CPU 작업이므로 작업 프로세스 풀에서 실행 (세션 간 공유)
+@st.cache_resource
+def get_process_pool():
+    return pipeline.make_process_pool()
+
+# 파일별 분류 결과와 통합 결과는 프로세스 전체에서 공유하는 메모리 캐시에 보관
+# (파일 내용 해시 + 규칙 지문이 같으면 세션마다 다시 분석하거나 복사본을 만들지 않고 읽기 전용 DataFrame 하나를 함께 사용)
+@st.cache_resource
+def get_result_cache():
+    return ResultCache()
+
+# 분석과 내보내기 파일 생성은 백그라운드 작업 큐에서 실행 (세션 간 공유)
+# 작업 키는 입력 파일 해시/규칙 지문/통합 방식이므로, 다시 실행되거나 다른 세션이 같은 파일을 열면
+# 새로 시작하지 않고 실행 중인 작업에 연결합니다. 페이지는 진행 단계를 주기적으로 읽어 표시하고
+# 작업이 끝나면 바로 결과를 그립니다. 작업 스레드에서는 st.* 를 호출하지 않습니다.
+# 작업은 결과 캐시 키만 돌려주고 값은 공유 결과 캐시에서 읽으므로 메모리는 결과 캐시 한도를 따릅니다.
+@st.cache_resource
+def get_job_queue():
+    return JobQueue()
+
+# 큰 파일은 이 스레드에서 스트리밍으로 처리하며 progress_rows[file_hash] 에 (처리한 행 수, 전체 행 수) 기록
+# 파일이 하나면(inline) 작업 프로세스를 거치지 않고 이 스레드에서 분석해 분류를 모든 코어로 나눔
+def load_classified(file_hash, rules_fp, data, progress_rows, result_cache, pool, ruleset=None, inline=False):
+    def analyze():
+        if pipeline.use_streaming(data):
+            def progress(done, total):
+                progress_rows[file_hash] = (done, total)
+            return pipeline.stream_workbook(data, file_hash, progress=progress, ruleset=ruleset)
+        if inline:
+            return pipeline.analyze_workbook(data, file_hash, None, ruleset)
+        return pool.submit(pipeline.analyze_workbook, data, file_hash, None, ruleset).result()
+    return result_cache.get_or_build(("classified", file_hash, rules_fp, pipeline.compact_enabled), analyze)
+
+# 분석 작업: 파일별 분석/통합 → 통계 → 분류별 색인 (단계마다 job 에 진행 상황 기록)
+# → (통합 결과, 통계, 분류별 색인) 의 결과 캐시 키
+def run_analysis(job, file_hashes, rules_fp, files, merge_policy, file_names, ruleset, result_cache, pool):
+    key = ("final_df", file_hashes, rules_fp, merge_policy, file_names, pipeline.compact_enabled)
+    final_df = result_cache.get_or_build(
+        key, lambda: merge_files(job, file_hashes, rules_fp, files, merge_policy, file_names, ruleset, result_cache, pool)
+    )
+    job.store(result_cache, key, final_df)
+    if ("stats",) + key not in result_cache:
+        job.set_stage("분류 통계 계산 중")
+        job.store(result_cache, ("stats",) + key, pipeline.aggregate_stats(final_df))
+    if ("category_index",) + key not in result_cache:
+        job.set_stage("분류별 색인 생성 중")
+        job.store(result_cache, ("category_index",) + key, pipeline.category_index(final_df))
+    return key, ("stats",) + key, ("category_index",) + key
+
+def merge_files(job, file_hashes, rules_fp, files, merge_policy, file_names, ruleset, result_cache, pool):
+    # 파일별 수집/정제/분류는 병렬로, 통합은 파일 순서대로 하나씩 진행
+    job.set_stage("파일 처리 중", len(file_hashes))
+    rows_done = {}
+    with ThreadPoolExecutor(max_workers=pipeline.default_workers()) as executor:
+        inline = len(file_hashes) == 1
+        futures = [
+            executor.submit(load_classified, h, rules_fp, files[h], rows_done, result_cache, pool, ruleset, inline)
+            for h in file_hashes
+        ]
+
+        def frames():
+            for i, (h, future) in enumerate(zip(file_hashes, futures), 1):
+                job.advance(i - 1, detail=file_names[i - 1])
+                # 스트리밍 중인 파일은 분류한 묶음/행 수를 함께 표시
+                while not wait([future], timeout=0.5).done:
+                    if h in rows_done:
+                        done, total = rows_done[h]
+                        chunks = -(-total // pipeline.chunk_rows)
+                        job.advance(
+                            i - 1 + done / total,
+                            detail=f"{file_names[i - 1]} · 분류 묶음 {-(-done // pipeline.chunk_rows)}/{chunks} · {done:,}/{total:,}행"
+                        )
+                yield future.result()
+                job.advance(i)
+            job.set_stage("파일 통합 중")
+
+        return pipeline.merge_frames(frames(), merge_policy, file_names, ruleset)
+
+# 진행 상황 표시 (작업이 끝나면 페이지 전체를 다시 실행해 결과를 그림)
+@st.fragment(run_every=1.0)
+def job_progress(job):
+    if job.finished:
+        st.rerun()
+    st.progress(job.fraction, text=f"{job.text} · {job.elapsed:,.0f}초")
+
+# 작업을 잠시 기다려 끝나면 True, 아니면 진행 상황을 표시하고 False (작은 입력은 같은 실행에서 바로 그림)
+def wait_for_job(job):
+    if job.wait(jobs.inline_wait):
+        return True
+    job_progress(job)
+    return False
+
+# 작업 제출(실행 중이면 연결) → (작업, 결과 값 목록), 아직 실행 중이면 진행 상황을 표시하고 값은 None
+# func 는 결과 캐시 키 목록을 반환하며, 결과가 결과 캐시에서 내보내졌으면 작업을 지우고 다시 실행
+# (결과 캐시 한도보다 큰 결과는 작업이 들고 있으므로 다시 실행하지 않음)
+def run_job(key, func, name):
+    job = get_job_queue().submit(key, func, name)
+    if not wait_for_job(job) or job.error:
+        return job, None
+    values = [job.load(result_cache, result_key) for result_key in job.result]
+    if any(value is None for value in values):
+        get_job_queue().forget(key)
+        return run_job(key, func, name)
+    return job, values
+
+# 엑셀 내보내기는 다운로드를 요청했을 때만 작업으로 만들고 (데이터셋, 분류, 형식) 별로 작업 큐에 보관
+def build_category_export(job, df, sheet_name):
+    job.set_stage("엑셀 파일 생성 중")
+    return frame_to_excel(df, sheet_name)
+
+def build_full_export(job, df):
+    job.set_stage("엑셀 파일 생성 중")
+    return get_excel_download_link(df, "키워드_질적분류_결과.xlsx").getvalue()
+
+# 분류별 파일 + 적합/부적합 + 전체 데이터 + 통계를 한 번의 정렬로 zip 하나에 기록
+def build_export_bundle(job, fmt, df):
+    job.set_stage("묶음 파일 생성 중")
+    output = io.BytesIO()
+    export.write_bundle(
+        df, output, fmt, importance_order,
+        {category: label.replace("\n", " ") for category, label in labels_kr.items()},
+        pipeline.split_categories,
+        progress=lambda done, total, name: job.advance(done, total, name)
+    )
+    return output.getvalue()
+
+# 분류 전체 탐색용 정렬 위치 (분류, 정렬 기준, 방향, 상세분류 필터별로 한 번만 정렬)
+@st.cache_data(show_spinner=False, max_entries=64)
+def build_browse_order(dataset_key, category, sort_column, ascending, details, _final_df, _rows):
+    return pipeline.sorted_positions(_final_df, _rows, sort_column, ascending, list(details))
+
+# 규칙별 계측은 진단 패널에서 요청했을 때만 실행
+@st.cache_data(show_spinner=False, max_entries=4)
+def build_rule_profile(dataset_key, ruleset_name, _keywords):
+    return pipeline.profile_rules(_keywords, ruleset_name)
+
+def lazy_download_button(label, file_name, export_key, build, mime=None):
+    # 첫 클릭에서 파일 생성 작업을 시작하고, 끝나면 작업 결과로 다운로드 버튼을 표시
+    ready_key = f"export_ready_{dataset_key}_{export_key}"
+    key = ("export", dataset_key, pipeline.compact_enabled, export_key)
+    if st.session_state.get(ready_key) and key not in result_cache:
+        job = get_job_queue().get(key)
+        if job is None or (job.finished and not job.error and job.load(result_cache, key) is None):
+            # 만든 파일이 결과 캐시에서 내보내졌으면 클릭 없이 다시 만들지 않고 준비 버튼부터 다시 표시
+            get_job_queue().forget(key)
+            st.session_state[ready_key] = False
+    if st.session_state.get(ready_key) or st.button(f"{label} 준비", key=f"prepare_{export_key}"):
+        st.session_state[ready_key] = True
+        job, values = run_job(
+            key, lambda job: [key if key in result_cache else job.store(result_cache, key, build(job))], label
+        )
+        if job.error:
+            st.error(f"파일 생성에 실패했습니다: {job.error}")
+            st.session_state[ready_key] = False
+            return
+        if values is None:
+            return
+        st.download_button(
+            label=label,
+            data=values[0],
+            file_name=file_name,
+            mime=mime or EXCEL_MIME,
+            key=f"download_{export_key}"
+        )
 
-# 샘플 데이터 로드
+# 샘플 데이터 로드 (해시는 분석 모듈을 불러온 뒤 계산)
 if os.path.exists(SAMPLE_DATA_PATH):
-    df = pd.read_excel(SAMPLE_DATA_PATH)
-    dfs.append(df)
+    with open(SAMPLE_DATA_PATH, 'rb') as f:
+        sample_bytes = f.read()
     st.info("기본 샘플 데이터를 사용합니다.")
 else:
     st.error(f"샘플 데이터 파일을 찾을 수 없습니다: {SAMPLE_DATA_PATH}")
@@ -210,152 +378,115 @@ uploaded_files = st.file_uploader(
     accept_multiple_files=True
 )
 
-if uploaded_files:
-    dfs = []  # 샘플 데이터 초기화
-    for file in uploaded_files:
-        df = pd.read_excel(file)
-        dfs.append(df)
-    st.info("업로드된 파일로 데이터가 업데이트되었습니다.")
-
-combined_df = pd.concat(dfs, ignore_index=True)
-
-# 숫자 컬럼 전처리
-def clean_numeric(col):
-    col = col.astype(str).str.replace(',', '', regex=False)
-    col = col.replace('< 10', '5')
-    return pd.to_numeric(col, errors='coerce').fillna(0).astype(int)
-
-numeric_columns = ['월간검색수(PC)', '월간검색수(모바일)', '월평균클릭수(PC)', '월평균클릭수(모바일)', '월평균노출 광고수']
-for col in numeric_columns:
-    if col in combined_df.columns:
-        combined_df[col] = clean_numeric(combined_df[col])
-
-for col in ['월평균클릭률(PC)', '월평균클릭률(모바일)']:
-    if col in combined_df.columns:
-        combined_df[col] = combined_df[col].astype(str).str.replace('%', '', regex=False)
-        combined_df[col] = pd.to_numeric(combined_df[col], errors='coerce').fillna(0)
-
-combined_df['총 검색수'] = combined_df['월간검색수(PC)'] + combined_df['월간검색수(모바일)']
-combined_df['총 클릭수'] = combined_df['월평균클릭수(PC)'] + combined_df['월평균클릭수(모바일)']
-
-# 키워드 정규화 함수
-def normalize_keyword(keyword):
-    keyword = str(keyword).lower()
-    keyword = re.sub(r'[^\w\s]', '', keyword)
-    keyword = re.sub(r'\s+', ' ', keyword)
-    return keyword.strip()
-
-combined_df['연관키워드'] = combined_df['연관키워드'].apply(normalize_keyword)
-combined_df = combined_df.drop_duplicates(subset=['연관키워드'])
-
-# 3. 분류 필터 정의
-suitable_filters = {
-    '유아/초등 타겟 영어교육': r'(?=.*?(유아|아기|어린이|아동|초등|유치원|영유아|초1|초2|초3|초4|초5|초6|키즈|1세|2세|3세|4세|5세|6세|7세|8세|9세|10세|11세|12세|1살|2살|3살|4살|5살|6살|7살|8살|9살|10살|11살|12살|개월|예비초|영어유치원|학년|방과후|엄마|아이).*?영어)|(?=.*?영어.*?(유아|아기|어린이|아동|초등|유치원|영유아|초1|초2|초3|초4|초5|초6|키즈|1세|2세|3세|4세|5세|6세|7세|8세|9세|10세|11세|12세|1살|2살|3살|4살|5살|6살|7살|8살|9살|10살|11살|12살|개월|예비초|영어유치원|학년|방과후|엄마|아이))',
-    '미국 교육 커리큘럼': r'(?=.*?(미국|공교육|교과서|커리큘럼|IXL|북미|아메리칸|미국식|교육과정|학제|영어권|미국교과|미국식교육|미교|미국학교|미국초등|미국유치원|미교리딩|미국교과서리딩|미국교과서읽는리딩단계))',
-    'Pre-K, K 유아/초등 영어 콘텐츠': r'(?=.*?(영어놀이|영어동요|영어동화|알파벳|사이트워드|파닉스|영어게임|영어애니메이션|영어학습게임|영어만화|애니메이션영어))',
-    '국제학교/글로벌 교육': r'(?=.*?(국제학교|인터내셔널스쿨|글로벌학교|국제교육|글로벌교육|외국인학교|온라인국제학교|채드윅|스쿨링|해외학교|글로벌스쿨|국제초등학교|국제유치원|외국교육|외국학교|국제교과|IB|국제학생|글로벌인재|국제교육과정|글로벌교육과정|인터내셔널교육|인터내셔널스쿨|온라인스쿨|캐나다온라인고등학교|로렐스프링스스쿨|로렐스프링스|LAURELSPRINGSSCHOOL|ICNA))',
-    '프리미엄 학군 유아/초등 영어': r'(?=.*?(강남|대치|목동|청담|삼성동|도곡|양재|개포|송파|잠실|분당|판교|동탄|광교|송도|위례|일산|하남).*?(초등|유아|어린이|아동|키즈|영어|영어학원|영어교육|영어학습|영어공부))',
-    '유아/초등 영어교육': r'(?=.*?(영어문법|영문법|영어단어|영단어|영어교구|영어학습지|영어교재|영어프로그램|영어앱|영어책|원서|영어독서|영어발음|영어학습|영어공부).*?(유아|초등|어린이|아동|키즈|아이))'
+startup.mark('intro')
+
+from keyword_analysis import export, jobs, pipeline
+from keyword_analysis.cache import ResultCache
+from keyword_analysis.jobs import JobQueue
+from keyword_analysis.export import EXCEL_MIME, frame_to_excel, get_excel_download_link
+from keyword_analysis.guard import TIMEOUT_DETAIL
+startup.mark('imports')
+
+# 검색광고 API 키(KEYWORD_DASHBOARD_SEARCHAD_*)가 설정되어 있으면 시드 키워드로 직접 가져오기
+# 가져온 결과는 키워드 도구 형식 엑셀로 만들어 업로드 파일과 같은 경로로 분석
+from keyword_analysis import searchad
+if searchad.configured():
+    with st.expander("네이버 검색광고 API로 키워드 가져오기"):
+        seeds_text = st.text_area("시드 키워드 (한 줄에 하나)", key="searchad_seeds")
+        if st.button("키워드 가져오기", key="searchad_fetch"):
+            seeds = [line for line in seeds_text.splitlines() if line.strip()]
+            if seeds:
+                fetch_progress = st.progress(0.0, text="검색광고 API 요청 중...")
+                try:
+                    st.session_state["searchad_workbook"] = searchad.fetch_workbook(
+                        seeds,
+                        lambda done, total: fetch_progress.progress(done / total, text=f"검색광고 API 요청 중 ({done}/{total})")
+                    )
+                except Exception as e:
+                    st.error(f"검색광고 API 요청에 실패했습니다: {e}")
+                fetch_progress.empty()
+
+files = {pipeline.content_hash(sample_bytes): sample_bytes}
+file_names = {pipeline.content_hash(sample_bytes): os.path.basename(SAMPLE_DATA_PATH)}
+api_workbook = st.session_state.get("searchad_workbook")
+if uploaded_files or api_workbook:
+    files = {}  # 샘플 데이터 초기화
+    file_names = {}
+    for file in uploaded_files or []:
+        data = file.getvalue()
+        files[pipeline.content_hash(data)] = data
+        file_names.setdefault(pipeline.content_hash(data), file.name)
+    if api_workbook:
+        files[pipeline.content_hash(api_workbook)] = api_workbook
+        file_names.setdefault(pipeline.content_hash(api_workbook), "검색광고 API")
+    st.info("업로드된 파일로 데이터가 업데이트되었습니다." if uploaded_files else "검색광고 API에서 가져온 키워드로 분석합니다.")
+
+# 여러 파일에 같은 키워드가 있을 때 지표 통합 방식 (first 외에는 출처 파일/중복 횟수 컬럼 추가)
+merge_policy_labels = {
+    "first": "먼저 올린 파일 값 유지",
+    "latest": "나중에 올린 파일 값 사용",
+    "max": "최댓값",
+    "mean": "평균",
+    "sum": "합계",
 }
+merge_policy = pipeline.merge_policy
+if len(files) > 1:
+    merge_policy = st.selectbox(
+        "중복 키워드 지표 통합 방식",
+        list(merge_policy_labels),
+        index=list(merge_policy_labels).index(merge_policy) if merge_policy in merge_policy_labels else 0,
+        format_func=merge_policy_labels.get,
+        key="merge_policy"
+    )
 
-additional_filters = {
-    '타겟 없는 온라인 영어 교육': r'(?=.*(온라인|화상|인터넷|비대면|원격|디지털|스마트|태블릿|패드|앱|어플|홈스쿨|홈스쿨링|홈러닝|자기주도|자기주도학습|엄마표|e러닝|이러닝|인터넷강의|온라인강의|온라인수업|온라인학습|온라인교육|스마트러닝))(?=.*영어)',
-    '타겟 없는 영어 콘텐츠 (교재 등)': r'(?=.*(영어책|영어독서|영어발음|영어문법|영어단어|영어학습지|영어교재|영어교구|영어프로그램|영어앱|영어학습|영어공부))',
-    '타겟없는 일반 영어 교육': r'(?=.*(영어|원어민|영어학원|영어공부|영어학습|영어교육|영어수업|영어강의|영어과외|영어회화|영어인강|영어학습지|영어교재|영어교구|영어프로그램|영어앱|영어학습|영어공부))'
-}
+file_hashes = tuple(files)
+file_name_list = tuple(file_names[h] for h in file_hashes)
+# 분류 규칙 세트 (keyword_analysis/rulesets 에 여러 개가 있으면 선택)
+rule_set_names = rules.available_rulesets()
+ruleset_name = rules.default_ruleset
+if len(rule_set_names) > 1:
+    ruleset_name = st.selectbox(
+        "분류 규칙 세트",
+        rule_set_names,
+        index=rule_set_names.index(ruleset_name) if ruleset_name in rule_set_names else 0,
+        key="ruleset"
+    )
+ruleset = rules.load_ruleset(ruleset_name)
+rules_fp = ruleset.fingerprint
+dataset_key = pipeline.content_hash("|".join(file_hashes + (rules_fp, merge_policy)).encode())[:16]
+# 분류별 행 위치/지표별 상위 10개 위치도 작업에서 함께 계산 (정렬 기준을 바꿔도 다시 정렬하지 않음)
+result_cache, process_pool = get_result_cache(), get_process_pool()
+analysis_job, analysis_values = run_job(
+    ("analysis", dataset_key, pipeline.compact_enabled),
+    lambda job: run_analysis(
+        job, file_hashes, rules_fp, files, merge_policy, file_name_list, ruleset_name, result_cache, process_pool
+    ),
+    "키워드 분석"
+)
+if analysis_job.error:
+    st.error(f"키워드 분석에 실패했습니다: {analysis_job.error}")
+    st.stop()
+if analysis_values is None:
+    st.stop()
+final_df, classification_stats, category_index = analysis_values
+startup.mark('analysis')
+
+# 메모리 절약 형식(KEYWORD_DASHBOARD_COMPACT=1)일 때 기본 형식 대비 메모리 사용량 표시
+if pipeline.compact_enabled:
+    st.caption(
+        f"메모리 절약 형식: 분석 결과 {pipeline.memory_mb(final_df):,.1f}MB "
+        f"(기본 형식 {pipeline.default_memory_mb(final_df):,.1f}MB)"
+    )
 
-unsuitable_filters = {
-    '중등/고등/대학': r'.*(중학|고등|대학|성인|직장인|노인|50대|40대|30대|20대|청소년|중등|고1|고2|고3|중1|중2|중3).*(?!.*(초등|유아|어린이|아동|키즈)).*(?!.*(국제학교|온라인국제학교))',
-    '제2외국어/수학/한국사 등 교육 분야 외': r'.*(일본어|중국어|프랑스어|스페인어|독일어|베트남어|태국어|러시아어|아랍어).*(?!.*영어|.*글로벌)|.*(수학|과학|사회|국어|한국어|한국사|물리|화학|생물|지구과학|역사|문학|한문|컴퓨터|코딩|프로그래밍|경제|미술|체육|음악|무용|태권도|발레).*(?!.*영어|.*국제학교|.*온라인국제학교|.*글로벌)',
-    '시험/자격증 관련': r'.*(토익|토플|아이엘츠|오픽|텝스|HSK|JLPT|DELE|DELF|TSC|JPT|TOPIK|EJU|AP|수능|내신|모의고사|TOEIC|TOEFL|IELTS|OPIC|TEPS).*(?!.*초등|.*유아|.*어린이|.*아동|.*키즈|.*국제학교|.*온라인국제학교)|.*(SAT|SSAT).*(?!.*초등|.*유아|.*어린이|.*아동|.*키즈|.*국제학교)',
-    '캠프/기숙학원 등 오프라인 중심': r'.*(방문학습|방문교사|대면|현장체험학습|체험학습|체험활동|캠프|기숙).*(?!.*온라인|.*화상|.*인터넷|.*국제학교|.*온라인국제학교|.*초등영어)',
-    '대안학교/경시대회 등': r'.*(검정고시|재수|편입|입시|윈터스쿨|서머스쿨|논술|특목고|영재|올림피아드|경시대회|대회|마이스터|특성화).*(?!.*초등|.*유아|.*어린이|.*아동|.*키즈|.*국제학교|.*온라인국제학교|.*영어)',
-    '경쟁 브랜드명': r'.*(눈높이|구몬|웅진|대교|YBM|YBM토익|튼튼영어|윤선생|EBSe|와이즈만|라이즈|하바|크라운|뽀로로|핑크퐁|몬테소리|발도르프|키즈랜드|숲유치원|이투스|메가|대성|스카이에듀|강남구청|시원스쿨).*(?!.*국제학교|.*온라인국제학교|.*초등영어|.*유아영어)',
-    '비프리미엄 지역 및 업무/대학 지역': r'.*(노원구|도봉구|강동구|은평구|중랑구|광화문|여의도|종로|홍대|신촌|용산|광진구|구로구|금천구|서대문구|성동구|성북구|영등포구|동작구|관악구|양천구|강서구|마포구).*(?!.*(초등|유아|어린이|아동|키즈|국제학교|인터내셔널))',
-    '육아/여행 등 기타상품': r'(?=.*(육아|여행|장난감|놀이공원|인형|블럭|퍼즐|레고|책장|가구|영양제|건강|운동|다이어트))(?!.*(?:영어|영어교육|영어학습|영어공부|영어학원|영어교재|영어교구|영어프로그램|영어앱|영어학습지|영어동화|영어동요|영어책|영어독서|영어발음|영어문법|영어단어|국제학교|온라인국제학교))',
-    '직장인/성인/비즈니스 타겟 키워드': r'.*(비즈니스영어|비지니스영어|강남역|역삼역|직장인영어|성인영어|영어과외알바|영어회화알바|영어학원창업|영어공부방창업|영어학원매매|영어PT|왕초보영어|기초영어|주말영어|토요일영어|종로영어|한달영어|평생영어|6개월영어|영어회화주말반|영어회화단기|비즈니스영어학원|비즈니스영어과외|비즈니스영어회화|비즈니스영어인강|직장인화상영어|영어가맹|영어학원가맹|영어학원체인점|영어프랜차이즈|이력서영어|면접영어|인터뷰영어|취업영어|스피킹|토킹|프리토킹|회사|직장|취업|면접|이력서|토요일|평일|평생|한달|6개월|알바|창업|매매|가맹|PT).*(?!(?:.*(?:초등|유아|어린이|아동|키즈|국제학교|인터내셔널학교)|^(?:초등|유아|어린이|아동|키즈|국제학교|인터내셔널학교).*))',
-    '사전/번역 관련': r'.*(사전|번역|번역기|번역사|통역|통역사)'
-}
+# 안전 모드에서 규칙 평가 시간 한도를 넘긴 키워드 안내
+timed_out_keywords = final_df.loc[final_df['키워드_상세분류'] == TIMEOUT_DETAIL, '연관키워드']
+if not timed_out_keywords.empty:
+    st.warning(
+        f"규칙 평가 시간 한도를 넘긴 키워드 {len(timed_out_keywords):,}개는 '{TIMEOUT_DETAIL}'(미분류)로 표시했습니다: "
+        + ", ".join(timed_out_keywords.head(10).str.slice(0, 50))
+    )
 
-# 4. 키워드 분류
-final_df = combined_df.copy()
-final_df['키워드_분류'] = '미분류'
-final_df['키워드_상세분류'] = '미분류'
-
-# 부적합 키워드 필터 적용
-for category, pattern in unsuitable_filters.items():
-    mask = final_df['연관키워드'].str.contains(pattern, regex=True, na=False)
-    final_df.loc[mask, '키워드_분류'] = '부적합'
-    final_df.loc[mask, '키워드_상세분류'] = category
-
-# 적합 키워드 필터 적용 (부적합이 아닌 것만)
-for category, pattern in suitable_filters.items():
-    mask = (final_df['연관키워드'].str.contains(pattern, regex=True, na=False)) & (final_df['키워드_분류'] == '미분류')
-    final_df.loc[mask, '키워드_분류'] = '적합'
-    final_df.loc[mask, '키워드_상세분류'] = category
-
-# 확장 가능 키워드 필터 적용 (미분류만)
-for category, pattern in additional_filters.items():
-    mask = (final_df['연관키워드'].str.contains(pattern, regex=True, na=False)) & (final_df['키워드_분류'] == '미분류')
-    final_df.loc[mask, '키워드_분류'] = '확장 가능 키워드'
-    final_df.loc[mask, '키워드_상세분류'] = category
-
-# 부적합 필터 재적용 (확장 가능 키워드 포함)
-for category, pattern in unsuitable_filters.items():
-    mask = (final_df['연관키워드'].str.contains(pattern, regex=True, na=False)) & (final_df['키워드_분류'] != '부적합')
-    final_df.loc[mask, '키워드_분류'] = '부적합'
-    final_df.loc[mask, '키워드_상세분류'] = category
-
-# 5. 질적 분류
-final_df['키워드_분류_질적'] = '미분류'
-mask_purple = final_df['키워드_상세분류'].isin([
-    '국제학교/글로벌 교육',
-    '프리미엄 학군 유아/초등 영어'
-])
-final_df.loc[mask_purple, '키워드_분류_질적'] = '전략적 Sweet Spot'
-mask_blue = final_df['키워드_상세분류'].isin([
-    '미국 교육 커리큘럼'
-])
-final_df.loc[mask_blue, '키워드_분류_질적'] = '특화 영역'
-mask_red = final_df['키워드_상세분류'].isin([
-    '유아/초등 타겟 영어교육',
-    'Pre-K, K 유아/초등 영어 콘텐츠',    
-    '경쟁 브랜드명'
-])
-final_df.loc[mask_red, '키워드_분류_질적'] = '타겟 경쟁 영역'
-mask_expandable = final_df['키워드_상세분류'].isin([
-    '타겟없는 일반 영어 교육',
-    '타겟 없는 영어 콘텐츠 (교재 등)',
-    '타겟 없는 온라인 영어 교육'
-])
-final_df.loc[mask_expandable, '키워드_분류_질적'] = '확장 가능 키워드'
-mask_junk = final_df['키워드_상세분류'].isin([
-    '육아/여행 등 기타상품',
-    '비프리미엄 지역 및 업무/대학 지역'
-])
-final_df.loc[mask_junk, '키워드_분류_질적'] = '정크 키워드'
-mask_off_target = final_df['키워드_상세분류'].isin([
-    '제2외국어/수학/한국사 등 교육 분야 외',
-    '시험/자격증 관련', 
-    '캠프/기숙학원 등 오프라인 중심',
-    '직장인/성인/비즈니스 타겟 키워드',
-    '중등/고등/대학',
-    '대안학교/경시대회 등',
-    '사전/번역 관련'
-])
-final_df.loc[mask_off_target, '키워드_분류_질적'] = '타겟 외 경쟁 영역'
-
-# 6. 통계 집계 및 트렙맵 시각화
-gb = final_df.groupby('키워드_분류_질적')
-classification_stats = gb.agg({
-    '총 검색수': ['mean', 'count'],
-    '총 클릭수': ['mean'],
-    '월평균클릭률(PC)': 'mean',
-    '월평균클릭률(모바일)': 'mean',
-    '월평균노출 광고수': 'mean'
-}).round(2)
-classification_stats.columns = ['평균_검색수', '키워드_개수', '평균_클릭수', '평균_클릭률_PC', '평균_클릭률_모바일', '평균_노출광고수']
-classification_stats = classification_stats.reset_index()
+# 3~6. 분류 필터, 키워드 분류, 질적 분류, 통계 집계는 keyword_analysis 패키지에서 수행
 
 # importance_order와 labels_kr 키 일치 보장
 importance_order = [
@@ -399,164 +530,182 @@ area_defs = [
     [0, 0, 0.5, 0.5, '정크 키워드', '#F8F8F8'],
 ]
 
+# 2x2 매트릭스 그림은 (데이터셋, 좁은/넓은 화면) 별로 한 번만 생성
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_matrix_figure(dataset_key, narrow, _classification_stats, _details):
+    import plotly.graph_objects as go
+
+    # 레이아웃 업데이트
+    data = []
+    for x0, y0, x1, y1, area_name, color in area_defs:
+        # 해당 영역의 통계 데이터 가져오기
+        area_stats = _classification_stats[_classification_stats['키워드_분류_질적'] == area_name]
+        stat = area_stats.iloc[0].to_dict() if not area_stats.empty else {
+            '키워드_개수': 0,
+            '평균_검색수': 0,
+            '평균_클릭수': 0,
+            '평균_클릭률_PC': 0,
+            '평균_노출광고수': 0
+        }
+    
+        # 해당 영역의 세부 카테고리와 키워드 개수 계산
+        area_categories = _details.get(area_name, {})
+        category_text = "<br>".join([f"{cat}: {count:,}개" for cat, count in area_categories.items()])
+
+        # 분기: 넓은 화면(폭 충분) vs 좁은 화면(폭 부족)
+        if narrow:
+            # 좁은 화면: 간단한 정보만 표시
+            area_text = f"<b><span style='font-size: 16px; color: #2C3E50;'>{area_name}</span></b><br>"
+            area_text += f"키워드: {stat['키워드_개수']:,}개<br>"
+            area_text += f"검색수: {stat['평균_검색수']:,}회"
+            hover_text = f"<b>{area_name}</b><br>키워드: {stat['키워드_개수']:,}개<br>검색수: {stat['평균_검색수']:,}회<br>클릭수: {stat['평균_클릭수']:,}회<br>클릭률: {stat['평균_클릭률_PC']:.1f}%<br>광고수: {stat['평균_노출광고수']:,}개<br><b>세부 카테고리:</b><br>{category_text}"
+        else:
+            # 넓은 화면: 모든 정보 표시
+            area_text = f"<b><span style='font-size: 20px; color: #2C3E50;'>{area_name}</span></b><br>"
+            area_text += f"키워드: {stat['키워드_개수']:,}개<br>"
+            area_text += f"검색수: {stat['평균_검색수']:,}회<br>"
+            area_text += f"클릭수: {stat['평균_클릭수']:,}회<br>"
+            area_text += f"클릭률: {stat['평균_클릭률_PC']:.1f}%<br>"
+            area_text += f"광고수: {stat['평균_노출광고수']:,}개<br><br>"
+            area_text += f"<b>세부 카테고리:</b><br>{category_text}"
+            hover_text = ""
+
+        data.append(dict(
+            x=(x0+x1)/2, y=(y0+y1)/2, x0=x0, y0=y0, x1=x1, y1=y1,
+            area_name=area_name, color=color, area_text=area_text, hover_text=hover_text
+        ))
+
+    # 레이아웃 업데이트
+    fig = go.Figure()
+
+    # 사각형 영역 그리기
+    for d in data:
+        fig.add_shape(
+            type="rect",
+            x0=d['x0'], y0=d['y0'], x1=d['x1'], y1=d['y1'],
+            line=dict(color="#E0E0E0", width=1),
+            fillcolor=d['color'],
+            layer="below"
+        )
+
+    # 영역 내 텍스트 배치
+    fig.add_trace(go.Scatter(
+        x=[d['x'] for d in data],
+        y=[d['y'] for d in data],
+        text=[d['area_text'] for d in data],
+        mode="text",
+        textposition="middle center",
+        hoverinfo="text",
+        hovertext=[d['hover_text'] for d in data],
+        marker=dict(opacity=0),
+        showlegend=False,
+        textfont=dict(size=14, color="#2C3E50")
+    ))
+
+    # 레이아웃 업데이트
+    fig.update_layout(
+        width=1200 if not narrow else 600,
+        height=1200 if not narrow else 600,
+        margin=dict(l=40, r=40, t=40, b=40),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        font=dict(
+            family="Pretendard, -apple-system, BlinkMacSystemFont, system-ui, Roboto, sans-serif",
+            size=14,
+            color="#2C3E50"
+        ),
+        title=dict(
+            text="2x2 매트릭스 보기",
+            font=dict(
+                size=24 if not narrow else 18,
+                color="#1E1E1E"
+            )
+        ),
+        hovermode="closest",
+        hoverlabel=dict(
+            bgcolor="white",
+            font_size=14,
+            font_family="Pretendard, -apple-system, BlinkMacSystemFont, system-ui, Roboto, sans-serif"
+        )
+    )
+
+    # 축 업데이트
+    fig.update_xaxes(
+        showticklabels=False,
+        showgrid=False,
+        zeroline=False,
+        range=[0, 1],
+        title_text="타겟 관련성(아이덴티티) →",
+        title_font=dict(size=20, color="#2C3E50"),
+        linecolor="#E0E0E0"  # 축 선 색상을 연한 회색으로 변경
+    )
+
+    fig.update_yaxes(
+        showticklabels=False,
+        showgrid=False,
+        zeroline=False,
+        range=[0, 1],
+        title_text="↑ 확장성(트래픽)",
+        title_font=dict(size=20, color="#2C3E50"),
+        linecolor="#E0E0E0"  # 축 선 색상을 연한 회색으로 변경
+    )
+    return fig
+
 # JS로 화면 폭 감지 및 session_state에 저장
 if 'is_narrow' not in st.session_state:
     st.session_state['is_narrow'] = True  # 기본값을 좁은 모드로 설정
 
-# JavaScript 디버깅을 위한 컴포넌트
-components.html(
-    """
-    <script>
-    function updateStreamlitState(isNarrow) {
-        const message = {
-            type: 'streamlit:setComponentValue',
-            value: isNarrow
-        };
-        window.parent.postMessage(message, '*');
-    }
-
-    function checkWidth() {
-        const width = window.innerWidth;
-        const isNarrow = width < 900;
-        updateStreamlitState(isNarrow);
-    }
+def toggle_narrow():
+    st.session_state['is_narrow'] = not st.session_state['is_narrow']
 
-    // 초기 실행
-    checkWidth();
-
-    // 리사이즈 이벤트 리스너
-    let resizeTimeout;
-    window.addEventListener('resize', function() {
-        clearTimeout(resizeTimeout);
-        resizeTimeout = setTimeout(checkWidth, 100);
-    });
-    </script>
-    """,
-    height=0,
-)
+# 폭 감지, 상세/간단 보기 버튼, 매트릭스는 이 부분만 다시 실행
+@st.fragment
+def matrix_section():
+    # JavaScript 디버깅을 위한 컴포넌트
+    components.html(
+        """
+        <script>
+        function updateStreamlitState(isNarrow) {
+            const message = {
+                type: 'streamlit:setComponentValue',
+                value: isNarrow
+            };
+            window.parent.postMessage(message, '*');
+        }
 
-# 상세 정보 보기 버튼
-if st.button("상세 정보 보기" if st.session_state['is_narrow'] else "간단 정보 보기"):
-    st.session_state['is_narrow'] = not st.session_state['is_narrow']
-    st.rerun()
-
-# 레이아웃 업데이트
-data = []
-for x0, y0, x1, y1, area_name, color in area_defs:
-    # 해당 영역의 통계 데이터 가져오기
-    area_stats = classification_stats[classification_stats['키워드_분류_질적'] == area_name]
-    stat = area_stats.iloc[0].to_dict() if not area_stats.empty else {
-        '키워드_개수': 0,
-        '평균_검색수': 0,
-        '평균_클릭수': 0,
-        '평균_클릭률_PC': 0,
-        '평균_노출광고수': 0
-    }
-    
-    # 해당 영역의 세부 카테고리와 키워드 개수 계산
-    area_categories = final_df[final_df['키워드_분류_질적'] == area_name].groupby('키워드_상세분류').size()
-    category_text = "<br>".join([f"{cat}: {count:,}개" for cat, count in area_categories.items()])
-
-    # 분기: 넓은 화면(폭 충분) vs 좁은 화면(폭 부족)
-    if st.session_state.get('is_narrow', False):
-        # 좁은 화면: 간단한 정보만 표시
-        area_text = f"<b><span style='font-size: 16px; color: #2C3E50;'>{area_name}</span></b><br>"
-        area_text += f"키워드: {stat['키워드_개수']:,}개<br>"
-        area_text += f"검색수: {stat['평균_검색수']:,}회"
-        hover_text = f"<b>{area_name}</b><br>키워드: {stat['키워드_개수']:,}개<br>검색수: {stat['평균_검색수']:,}회<br>클릭수: {stat['평균_클릭수']:,}회<br>클릭률: {stat['평균_클릭률_PC']:.1f}%<br>광고수: {stat['평균_노출광고수']:,}개<br><b>세부 카테고리:</b><br>{category_text}"
-    else:
-        # 넓은 화면: 모든 정보 표시
-        area_text = f"<b><span style='font-size: 20px; color: #2C3E50;'>{area_name}</span></b><br>"
-        area_text += f"키워드: {stat['키워드_개수']:,}개<br>"
-        area_text += f"검색수: {stat['평균_검색수']:,}회<br>"
-        area_text += f"클릭수: {stat['평균_클릭수']:,}회<br>"
-        area_text += f"클릭률: {stat['평균_클릭률_PC']:.1f}%<br>"
-        area_text += f"광고수: {stat['평균_노출광고수']:,}개<br><br>"
-        area_text += f"<b>세부 카테고리:</b><br>{category_text}"
-        hover_text = ""
-
-    data.append(dict(
-        x=(x0+x1)/2, y=(y0+y1)/2, x0=x0, y0=y0, x1=x1, y1=y1,
-        area_name=area_name, color=color, area_text=area_text, hover_text=hover_text
-    ))
+        function checkWidth() {
+            const width = window.innerWidth;
+            const isNarrow = width < 900;
+            updateStreamlitState(isNarrow);
+        }
 
-# 레이아웃 업데이트
-fig = go.Figure()
-
-# 사각형 영역 그리기
-for d in data:
-    fig.add_shape(
-        type="rect",
-        x0=d['x0'], y0=d['y0'], x1=d['x1'], y1=d['y1'],
-        line=dict(color="#E0E0E0", width=1),
-        fillcolor=d['color'],
-        layer="below"
+        // 초기 실행
+        checkWidth();
+
+        // 리사이즈 이벤트 리스너
+        let resizeTimeout;
+        window.addEventListener('resize', function() {
+            clearTimeout(resizeTimeout);
+            resizeTimeout = setTimeout(checkWidth, 100);
+        });
+        </script>
+        """,
+        height=0,
     )
 
-# 영역 내 텍스트 배치
-fig.add_trace(go.Scatter(
-    x=[d['x'] for d in data],
-    y=[d['y'] for d in data],
-    text=[d['area_text'] for d in data],
-    mode="text",
-    textposition="middle center",
-    hoverinfo="text",
-    hovertext=[d['hover_text'] for d in data],
-    marker=dict(opacity=0),
-    showlegend=False,
-    textfont=dict(size=14, color="#2C3E50")
-))
-
-# 레이아웃 업데이트
-fig.update_layout(
-    width=1200 if not st.session_state.get('is_narrow', False) else 600,
-    height=1200 if not st.session_state.get('is_narrow', False) else 600,
-    margin=dict(l=40, r=40, t=40, b=40),
-    plot_bgcolor="white",
-    paper_bgcolor="white",
-    font=dict(
-        family="Pretendard, -apple-system, BlinkMacSystemFont, system-ui, Roboto, sans-serif",
-        size=14,
-        color="#2C3E50"
-    ),
-    title=dict(
-        text="2x2 매트릭스 보기",
-        font=dict(
-            size=24 if not st.session_state.get('is_narrow', False) else 18,
-            color="#1E1E1E"
-        )
-    ),
-    hovermode="closest",
-    hoverlabel=dict(
-        bgcolor="white",
-        font_size=14,
-        font_family="Pretendard, -apple-system, BlinkMacSystemFont, system-ui, Roboto, sans-serif"
+    # 상세 정보 보기 버튼
+    # 콜백에서 상태를 바꾸므로 st.rerun() 없이 이 프래그먼트만 다시 그려짐
+    st.button(
+        "상세 정보 보기" if st.session_state['is_narrow'] else "간단 정보 보기",
+        on_click=toggle_narrow
     )
-)
 
-# 축 업데이트
-fig.update_xaxes(
-    showticklabels=False,
-    showgrid=False,
-    zeroline=False,
-    range=[0, 1],
-    title_text="타겟 관련성(아이덴티티) →",
-    title_font=dict(size=20, color="#2C3E50"),
-    linecolor="#E0E0E0"  # 축 선 색상을 연한 회색으로 변경
-)
+    # 반응형 레이아웃을 위한 컨테이너 설정
+    fig = build_matrix_figure(dataset_key, st.session_state['is_narrow'], classification_stats, category_index['details'])
+    st.plotly_chart(fig, use_container_width=True, config={'responsive': True})
 
-fig.update_yaxes(
-    showticklabels=False,
-    showgrid=False,
-    zeroline=False,
-    range=[0, 1],
-    title_text="↑ 확장성(트래픽)",
-    title_font=dict(size=20, color="#2C3E50"),
-    linecolor="#E0E0E0"  # 축 선 색상을 연한 회색으로 변경
-)
-
-# 반응형 레이아웃을 위한 컨테이너 설정
-st.plotly_chart(fig, use_container_width=True, config={'responsive': True})
+matrix_section()
+startup.mark('matrix')
 
 # 7. 분류별 샘플 키워드 표
 st.subheader("분류별 샘플 키워드")
@@ -571,13 +720,6 @@ display_columns = [
     '월평균노출 광고수'
 ]
 
-# 정렬 기준 선택
-sort_by = st.selectbox(
-    "정렬 기준 선택",
-    ["총 검색수 (기본)", "월평균 클릭률", "총 클릭수", "월평균노출 광고수"],
-    index=0
-)
-
 # 정렬 기준에 따른 컬럼 매핑
 sort_column_map = {
     "총 검색수 (기본)": "총 검색수",
@@ -586,197 +728,214 @@ sort_column_map = {
     "월평균노출 광고수": "월평균노출 광고수"
 }
 
-# 각 분류별로 데이터 표시 (중요도 순서대로)
-for category in importance_order:
-    category_df = final_df[final_df['키워드_분류_질적'] == category]
+# 미리 계산한 분류별 상위 10개 위치로 표 만들기 (정렬 기준을 바꿔도 전체 정렬 없음)
+def show_top_keywords(key, sort_column):
+    top_df = final_df.take(category_index['top'][(key, sort_column)])
+    st.dataframe(
+        top_df[display_columns].style.format({
+            '총 검색수': '{:,.0f}',
+            '총 클릭수': '{:,.0f}',
+            '월평균클릭률(PC)': '{:.2f}%','월평균노출 광고수': '{:,.0f}'
+        }),
+        use_container_width=True
+    )
+
+# 분류 하나의 통계/표/다운로드 (다운로드 준비 버튼은 이 분류만 다시 실행)
+@st.fragment
+def category_section(category, sort_column):
+    # 통계 계산
+    means = category_index['means'][category]
+    avg_search = means['총 검색수']
+    avg_clicks = means['총 클릭수']
+    avg_ctr = means['월평균클릭률(PC)']
+    avg_ads = means['월평균노출 광고수']
     
-    if not category_df.empty:
-        # 통계 계산
-        avg_search = category_df['총 검색수'].mean()
-        avg_clicks = category_df['총 클릭수'].mean()
-        avg_ctr = category_df['월평균클릭률(PC)'].mean()
-        avg_ads = category_df['월평균노출 광고수'].mean()
-        
-        # 통계 표시
-        st.markdown(f"### {labels_kr.get(category, '')}")
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("평균 검색수", f"{avg_search:,.0f}")
-        with col2:
-            st.metric("평균 클릭수", f"{avg_clicks:,.0f}")
-        with col3:
-            st.metric("평균 클릭률", f"{avg_ctr:.2f}%")
-        with col4:
-            st.metric("평균 노출광고수", f"{avg_ads:,.0f}")
-        
-        # 경쟁 키워드인 경우 적합/부적합으로 나누어 표시
-        if category == '타겟 경쟁 영역':
-            # 적합 키워드
-            suitable_df = category_df[category_df['키워드_분류'] == '적합']
-            if not suitable_df.empty:
-                st.markdown("#### 적합 키워드")
-                sorted_suitable = suitable_df.sort_values(
-                    by=sort_column_map[sort_by],
-                    ascending=False
-                ).head(10)
-                st.dataframe(
-                    sorted_suitable[display_columns].style.format({
-                        '총 검색수': '{:,.0f}',
-                        '총 클릭수': '{:,.0f}',
-                        '월평균클릭률(PC)': '{:.2f}%','월평균노출 광고수': '{:,.0f}'
-                    }),
-                    use_container_width=True
-                )
-                # 적합 전체 다운로드 버튼
-                excel_data = io.BytesIO()
-                with pd.ExcelWriter(excel_data, engine='xlsxwriter') as writer:
-                    suitable_df.to_excel(writer, index=False, sheet_name='적합 키워드')
-                excel_data.seek(0)
-                st.download_button(
-                    label="적합 키워드 전체 다운로드 (Excel)",
-                    data=excel_data,
-                    file_name=f"{labels_kr.get(category, category)}_적합_전체.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            # 부적합 키워드
-            unsuitable_df = category_df[category_df['키워드_분류'] == '부적합']
-            if not unsuitable_df.empty:
-                st.markdown("#### 부적합 키워드")
-                sorted_unsuitable = unsuitable_df.sort_values(
-                    by=sort_column_map[sort_by],
-                    ascending=False
-                ).head(10)
-                st.dataframe(
-                    sorted_unsuitable[display_columns].style.format({
-                        '총 검색수': '{:,.0f}',
-                        '총 클릭수': '{:,.0f}',
-                        '월평균클릭률(PC)': '{:.2f}%','월평균노출 광고수': '{:,.0f}'
-                    }),
-                    use_container_width=True
-                )
-                # 부적합 전체 다운로드 버튼
-                excel_data = io.BytesIO()
-                with pd.ExcelWriter(excel_data, engine='xlsxwriter') as writer:
-                    unsuitable_df.to_excel(writer, index=False, sheet_name='부적합 키워드')
-                excel_data.seek(0)
-                st.download_button(
-                    label="부적합 키워드 전체 다운로드 (Excel)",
-                    data=excel_data,
-                    file_name=f"{labels_kr.get(category, category)}_부적합_전체.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    # 통계 표시
+    st.markdown(f"### {labels_kr.get(category, '')}")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("평균 검색수", f"{avg_search:,.0f}")
+    with col2:
+        st.metric("평균 클릭수", f"{avg_clicks:,.0f}")
+    with col3:
+        st.metric("평균 클릭률", f"{avg_ctr:.2f}%")
+    with col4:
+        st.metric("평균 노출광고수", f"{avg_ads:,.0f}")
+    
+    # 경쟁 키워드인 경우 적합/부적합으로 나누어 표시
+    if category == '타겟 경쟁 영역':
+        for label in ['적합', '부적합']:
+            key = (category, label)
+            if key not in category_index['rows']:
+                continue
+            st.markdown(f"#### {label} 키워드")
+            show_top_keywords(key, sort_column)
+            # 적합/부적합 전체 다운로드 버튼
+            lazy_download_button(
+                f"{label} 키워드 전체 다운로드 (Excel)",
+                f"{labels_kr.get(category, category)}_{label}_전체.xlsx",
+                f"{category}_{label}",
+                lambda job, key=key: build_category_export(
+                    job, final_df.take(category_index['rows'][key]), f'{key[1]} 키워드'
                 )
-        else:
-            # 다른 카테고리는 기존대로 표시
-            sorted_df = category_df.sort_values(
-                by=sort_column_map[sort_by],
-                ascending=False
-            ).head(10)
-            st.dataframe(
-                sorted_df[display_columns].style.format({
-                    '총 검색수': '{:,.0f}',
-                    '총 클릭수': '{:,.0f}',
-                    '월평균클릭률(PC)': '{:.2f}%','월평균노출 광고수': '{:,.0f}'
-                }),
-                use_container_width=True
             )
-            # 카테고리 전체 다운로드 버튼
-            excel_data = io.BytesIO()
-            with pd.ExcelWriter(excel_data, engine='xlsxwriter') as writer:
-                category_df.to_excel(writer, index=False, sheet_name=labels_kr.get(category, category))
-            excel_data.seek(0)
-            st.download_button(
-                label=f"{labels_kr.get(category, category)} 전체 다운로드 (Excel)",
-                data=excel_data,
-                file_name=f"{labels_kr.get(category, category)}_전체.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        # 다른 카테고리는 기존대로 표시
+        show_top_keywords(category, sort_column)
+        # 카테고리 전체 다운로드 버튼
+        lazy_download_button(
+            f"{labels_kr.get(category, category)} 전체 다운로드 (Excel)",
+            f"{labels_kr.get(category, category)}_전체.xlsx",
+            category,
+            lambda job: build_category_export(
+                job, final_df.take(category_index['rows'][category]), labels_kr.get(category, category)
             )
-        st.markdown("---")
+        )
+    st.markdown("---")
+
+# 정렬 기준 선택은 분류별 표만 다시 실행
+@st.fragment
+def sample_tables_section():
+    # 정렬 기준 선택
+    sort_by = st.selectbox(
+        "정렬 기준 선택",
+        ["총 검색수 (기본)", "월평균 클릭률", "총 클릭수", "월평균노출 광고수"],
+        index=0
+    )
+
+    # 각 분류별로 데이터 표시 (중요도 순서대로)
+    for category in importance_order:
+        if category in category_index['rows']:
+            category_section(category, sort_column_map[sort_by])
+
+sample_tables_section()
+
+# 7-1. 분류별 전체 키워드 탐색
+# 정렬/필터는 서버에서 위치 배열로 처리하고 현재 페이지의 행만 화면으로 보냅니다.
+@st.fragment
+def browse_section():
+    st.subheader("분류별 전체 키워드 보기")
+    browse_categories = [category for category in importance_order if category in category_index['rows']]
+    browse_col1, browse_col2, browse_col3 = st.columns([2, 2, 1])
+    with browse_col1:
+        browse_category = st.selectbox(
+            "분류", browse_categories, format_func=lambda c: labels_kr.get(c, c).replace("\n", " "), key="browse_category"
+        )
+    with browse_col2:
+        browse_sort = st.selectbox("정렬 기준", pipeline.browse_metrics, key="browse_sort")
+    with browse_col3:
+        browse_ascending = st.toggle("오름차순", key="browse_ascending")
+    browse_details = st.multiselect(
+        "키워드 상세분류 필터 (비우면 전체)",
+        list(category_index['details'].get(browse_category, {}).keys()),
+        key=f"browse_details_{browse_category}"
+    )
+    browse_order = build_browse_order(
+        dataset_key, browse_category, browse_sort, browse_ascending, tuple(browse_details),
+        final_df, category_index['rows'][browse_category]
+    )
+
+    page_col1, page_col2 = st.columns([1, 3])
+    with page_col1:
+        page_size = st.selectbox("페이지당 행 수", [25, 50, 100, 500], index=1, key="browse_page_size")
+    page_count = max(1, -(-len(browse_order) // page_size))
+    # 분류/필터가 바뀌어 페이지 수가 줄면 마지막 페이지로 맞춤
+    if st.session_state.get("browse_page", 1) > page_count:
+        st.session_state["browse_page"] = page_count
+    with page_col2:
+        page = st.number_input(f"페이지 (전체 {page_count:,}쪽)", min_value=1, max_value=page_count, step=1, key="browse_page")
+
+    browse_columns = ['연관키워드', '키워드_분류', '키워드_상세분류', '총 검색수', '총 클릭수',
+                      '월평균클릭률(PC)', '월평균클릭률(모바일)', '경쟁정도', '월평균노출 광고수']
+    page_df = pipeline.page_frame(final_df, browse_order, int(page), page_size, browse_columns)
+    st.dataframe(
+        page_df.style.format({
+            '총 검색수': '{:,.0f}',
+            '총 클릭수': '{:,.0f}',
+            '월평균클릭률(PC)': '{:.2f}%', '월평균클릭률(모바일)': '{:.2f}%', '월평균노출 광고수': '{:,.0f}'
+        }),
+        use_container_width=True
+    )
+    first_row = (int(page) - 1) * page_size
+    st.caption(f"전체 {len(browse_order):,}개 중 {min(first_row + 1, len(browse_order)):,}~{first_row + len(page_df):,}번째 키워드")
+
+browse_section()
 
 # 8. 전체 데이터 다운로드
-def get_excel_download_link(df, filename):
-    # 컬럼 순서 재배치 및 정렬
-    df = df[['키워드_분류', '키워드_상세분류', '연관키워드'] + [col for col in df.columns if col not in ['키워드_분류', '키워드_상세분류', '연관키워드']]]
-
-    # 키워드 분류 순서 정의
-    classification_order = ['적합', '확장 가능 키워드', '부적합', '미분류']
-    df['키워드_분류'] = pd.Categorical(df['키워드_분류'], categories=classification_order, ordered=True)
-
-    # 정렬
-    df = df.sort_values(['키워드_분류', '키워드_상세분류', '연관키워드'], ascending=[True, True, True])
-
-    # 키워드 분류별 상세 통계 생성
-    stats_columns = ['월간검색수(PC)', '월간검색수(모바일)', '월평균클릭수(PC)', '월평균클릭수(모바일)', 
-                    '월평균클릭률(PC)', '월평균클릭률(모바일)', '경쟁정도', '월평균노출 광고수', 
-                    '총 검색수', '총 클릭수']
-
-    # 빈 DataFrame 생성
-    classification_stats = pd.DataFrame()
-
-    # 각 분류 조합에 대해 통계 계산
-    for 분류 in classification_order:
-        for 상세분류 in df[df['키워드_분류'] == 분류]['키워드_상세분류'].unique():
-            mask = (df['키워드_분류'] == 분류) & (df['키워드_상세분류'] == 상세분류)
-            subset = df[mask]
-            
-            if not subset.empty:
-                stats = {
-                    '키워드_건수': len(subset),
-                    '총 검색수': subset['총 검색수'].sum(),
-                    '총 클릭수': subset['총 클릭수'].sum(),           
-                    '경쟁정도': subset['경쟁정도'].mode().iloc[0] if '경쟁정도' in subset.columns else '-',
-                    '월평균노출 광고수': subset['월평균노출 광고수'].mean(),         
-                    '월간검색수(PC)': subset['월간검색수(PC)'].sum(),
-                    '월간검색수(모바일)': subset['월간검색수(모바일)'].sum(),
-                    '월평균클릭수(PC)': subset['월평균클릭수(PC)'].sum(),
-                    '월평균클릭수(모바일)': subset['월평균클릭수(모바일)'].sum(),
-                    '월평균클릭률(PC)': subset['월평균클릭률(PC)'].mean(),
-                    '월평균클릭률(모바일)': subset['월평균클릭률(모바일)'].mean()
-                }
-                
-                # MultiIndex 생성
-                idx = pd.MultiIndex.from_tuples([(분류, 상세분류)], names=['키워드_분류', '키워드_상세분류'])
-                temp_df = pd.DataFrame([stats], index=idx)
-                classification_stats = pd.concat([classification_stats, temp_df])
-
-    # 소수점 둘째자리까지 반올림
-    classification_stats = classification_stats.round(2)
-
-    # 엑셀 파일로 저장
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        # 통계 시트 저장
-        classification_stats.to_excel(writer, sheet_name='통계')
-        # 원본 데이터 시트 저장
-        df.to_excel(writer, sheet_name='원본데이터', index=False)
-        
-        # 워크시트 가져오기
-        stats_worksheet = writer.sheets['통계']
-        data_worksheet = writer.sheets['원본데이터']
-        
-        # 통계 시트 열 너비 조정
-        for idx, col in enumerate(classification_stats.columns):
-            max_length = max(
-                classification_stats[col].astype(str).apply(len).max(),
-                len(col)
-            ) + 2
-            stats_worksheet.set_column(idx, idx, max_length)
-        
-        # 원본 데이터 시트 열 너비 조정
-        for idx, col in enumerate(df.columns):
-            max_length = max(
-                df[col].astype(str).apply(len).max(),
-                len(col)
-            ) + 2
-            data_worksheet.set_column(idx, idx, max_length)
-    
-    output.seek(0)
-    return output
-
-# 다운로드 버튼 생성
-excel_data = get_excel_download_link(final_df, "키워드_질적분류_결과.xlsx")
-st.download_button(
-    label="전체 분류 데이터 다운로드 (Excel)",
-    data=excel_data,
-    file_name="키워드_질적분류_결과.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-) 
\ No newline at end of file
+# 다운로드 버튼 생성 (준비 버튼은 이 부분만 다시 실행)
+@st.fragment
+def full_export_section():
+    lazy_download_button(
+        "전체 분류 데이터 다운로드 (Excel)",
+        "키워드_질적분류_결과.xlsx",
+        "전체",
+        lambda job: build_full_export(job, final_df)
+    )
+
+    # 분류별 전체 파일을 한 번에 (형식 선택)
+    bundle_format = st.selectbox(
+        "묶음 다운로드 형식", export.bundle_formats,
+        format_func={'xlsx': 'Excel (xlsx)', 'csv': 'CSV', 'parquet': 'Parquet'}.get,
+        key="bundle_format"
+    )
+    lazy_download_button(
+        f"분류별 전체 묶음 다운로드 (zip, {bundle_format})",
+        f"키워드_질적분류_결과_{bundle_format}.zip",
+        f"묶음_{bundle_format}",
+        lambda job: build_export_bundle(job, bundle_format, final_df),
+        export.ZIP_MIME
+    )
+
+full_export_section()
+
+# 9. 규칙 진단 (규칙별 평가 시간, 일치 수, 부적합 규칙에 밀린 수)
+with st.expander("규칙 진단"):
+    # 규칙을 불러올 때 검사한 역추적 위험
+    st.caption(f"규칙 세트 {ruleset.label} · 지문 {rules_fp}" + (f" · {ruleset.description}" if ruleset.description else ""))
+    for rule in pipeline.get_classifier(ruleset_name).rules:
+        if rule.risks:
+            engine = "오토마톤으로 평가되어 역추적 없음" if rule.uses_automaton else "정규식으로 평가 (안전 모드에서 시간 제한)"
+            st.markdown(f"- ⚠️ **{rule.name}**: {', '.join(rule.risks)} — {engine}")
+    st.caption("규칙별로 평가한 키워드 수, 일치한 키워드 수, 최종 분류에 적용된 수, 부적합 규칙에 밀린 수와 평가 시간을 측정합니다. 일치 수가 0인 규칙은 한 번도 발동하지 않은 규칙입니다.")
+    if st.session_state.get(f"rule_profile_{dataset_key}") or st.button("규칙별 계측 실행", key="run_rule_profile"):
+        st.session_state[f"rule_profile_{dataset_key}"] = True
+        with st.spinner("규칙 계측 중..."):
+            report = build_rule_profile(dataset_key, ruleset_name, final_df['연관키워드'].to_numpy())
+        st.markdown(
+            f"키워드 {report['keywords']:,}개 · 전체 {report['total_seconds'] * 1000:,.0f}ms "
+            f"(용어 검색 {report['scan_seconds'] * 1000:,.0f}ms)"
+        )
+        st.dataframe(
+            pipeline.rule_profile_frame(report).sort_values('시간(ms)', ascending=False),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.download_button(
+            label="계측 결과 다운로드 (JSON)",
+            data=json.dumps(report, ensure_ascii=False, indent=2),
+            file_name=f"rule_profile_{report['rules_fingerprint']}.json",
+            mime="application/json",
+            key="download_rule_profile"
+        )
+
+# 10. 세션 간 공유 결과 캐시 사용량
+with st.expander("공유 결과 캐시"):
+    cache_info = get_result_cache().info()
+    cache_col1, cache_col2, cache_col3, cache_col4 = st.columns(4)
+    with cache_col1:
+        st.metric("사용량", f"{cache_info['bytes'] / 1024 / 1024:,.1f}MB", help=f"한도 {cache_info['max_bytes'] / 1024 / 1024:,.0f}MB (KEYWORD_DASHBOARD_RESULT_CACHE_MB)")
+    with cache_col2:
+        st.metric("적중", f"{cache_info['hits']:,}")
+    with cache_col3:
+        st.metric("미적중", f"{cache_info['misses']:,}")
+    with cache_col4:
+        st.metric("내보냄", f"{cache_info['evictions']:,}")
+    st.caption(f"보관 중인 결과 {cache_info['entries']:,}개 · 같은 파일과 규칙으로 분석한 결과는 모든 세션이 함께 사용합니다.")
+    job_info = get_job_queue().info()
+    st.caption(
+        f"백그라운드 작업: 대기 {job_info['queued']:,} · 실행 중 {job_info['running']:,} · "
+        f"완료 {job_info['done']:,} · 실패 {job_info['failed']:,}"
+    )
+
+# 첫 페이지 실행의 단계별 시간 기록 (KEYWORD_DASHBOARD_STARTUP_LOG)
+startup.finish()
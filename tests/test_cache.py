@@ -0,0 +1,146 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from keyword_analysis import pipeline, rules
+from keyword_analysis.cache import FrameCache, LabelStore, ResultCache
+from keyword_analysis.classifier import KeywordClassifier
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_data', 'sample.xlsx')
+FILTERS = (rules.unsuitable_filters, rules.suitable_filters, rules.additional_filters)
+
+
+@pytest.fixture(scope='module')
+def sample_bytes():
+    with open(SAMPLE_PATH, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture(scope='module')
+def uniques(sample_bytes):
+    keywords = pipeline.clean_frame(pipeline.read_workbook(sample_bytes))['연관키워드']
+    return np.asarray(pd.unique(keywords), dtype=object)
+
+
+@pytest.fixture(autouse=True)
+def default_mode(monkeypatch):
+    monkeypatch.setattr(pipeline, 'compact_enabled', False)
+    monkeypatch.setattr(pipeline, 'label_store_enabled', True)
+
+
+def _count_writes(monkeypatch):
+    writes = []
+    write = LabelStore._write
+
+    def spy(self, fingerprint, signature, tables):
+        writes.append(sum(table.num_rows for table in tables))
+        return write(self, fingerprint, signature, tables)
+
+    monkeypatch.setattr(LabelStore, '_write', spy)
+    return writes
+
+
+# 스트리밍은 묶음마다 분류한 라벨을 모아 파일마다 한 번만 저장
+def test_stream_saves_labels_once(monkeypatch, tmp_path, sample_bytes, uniques):
+    writes = _count_writes(monkeypatch)
+    cache = FrameCache(str(tmp_path), readonly_dirs=())
+    pipeline.stream_workbook(sample_bytes, size=100, cache=cache)
+    assert writes == [len(uniques)]
+
+    labels, _ = LabelStore(str(tmp_path)).lookup(pipeline.get_classifier().fingerprint, uniques)
+    assert not pd.isna(labels).any()
+
+
+# 라벨 저장소는 버전별 키워드 수 한도를 지키고 정제 데이터 캐시와 같은 용량 한도로 삭제됨
+def test_label_store_budget(tmp_path, uniques):
+    cache = FrameCache(str(tmp_path), readonly_dirs=())
+    cache.put('frame', pd.DataFrame({'연관키워드': uniques}))
+    store = LabelStore(str(tmp_path), max_keywords=100, max_bytes=cache.info()['bytes'])
+    store.save('v1', [], uniques, ['미분류'] * len(uniques), ['미분류'] * len(uniques))
+
+    assert store.info()['keywords'] == 100
+    labels, _ = store.lookup('v1', uniques)
+    assert pd.isna(labels[:-100]).all() and not pd.isna(labels[-100:]).any()
+    # 라벨 파일을 더해 한도를 넘으면 오래 사용하지 않은 캐시 파일부터 삭제
+    assert cache.get('frame') is None
+    assert cache.info()['bytes'] <= cache.max_bytes
+
+
+# 규칙 하나만 바뀌면 저장된 결과를 이어받아 바뀐 규칙만 평가하고, 결과는 전체 분류와 같아야 함
+def test_reclassify_only_changed_rules(monkeypatch, tmp_path, uniques):
+    store = LabelStore(str(tmp_path))
+    before = KeywordClassifier(*FILTERS)
+    _, old_details = pipeline._classify_uniques(before, uniques, store)
+
+    name = list(rules.additional_filters)[-1]
+    additional = dict(rules.additional_filters, **{name: rules.additional_filters[name] + '|영어'})
+    after = KeywordClassifier(rules.unsuitable_filters, rules.suitable_filters, additional)
+    expected = after.classify(uniques)
+    changed = {position for position, (_, rule) in enumerate(after.ordered) if rule.name == name}
+
+    evaluated = []
+    match_position = after.match_position
+
+    def spy(text, positions=None):
+        evaluated.append(positions)
+        return match_position(text, positions)
+
+    monkeypatch.setattr(after, 'match_position', spy)
+    monkeypatch.setattr(pipeline, 'classify_sharded', lambda *args: pytest.fail('전체 규칙으로 다시 분류함'))
+    labels, details = pipeline._classify_uniques(after, uniques, store)
+
+    # 바뀐 규칙으로 분류됐던 키워드만 모든 규칙으로, 나머지는 바뀐 규칙만 평가
+    assert sum(positions is None for positions in evaluated) == (old_details == name).sum()
+    assert all(positions <= changed for positions in evaluated if positions is not None)
+    np.testing.assert_array_equal(labels, expected[0])
+    np.testing.assert_array_equal(details, expected[1])
+
+
+# 결과 캐시는 바이트 한도를 넘으면 가장 오래 사용하지 않은 결과부터 내보내고, 한도보다 큰 결과는 보관하지 않음
+def test_result_cache_lru_budget():
+    cache = ResultCache(max_bytes=2500)
+    cache.put('a', np.zeros(125))
+    cache.put('b', np.zeros(125))
+    assert cache.get('a') is not None
+    cache.put('c', np.zeros(125))
+
+    assert 'a' in cache and 'b' not in cache and 'c' in cache
+    assert cache.info()['bytes'] == 2000 and cache.info()['evictions'] == 1
+    assert cache.put('big', np.zeros(1000)) is not None and 'big' not in cache
+    assert cache.info()['bytes'] == 2000
+
+
+# 같은 키를 동시에 요청하면 한 번만 계산하고, 실패하면 모두 같은 예외를 받고 다음 요청에서 다시 계산
+def test_result_cache_get_or_build_once():
+    cache = ResultCache()
+    started, release = threading.Event(), threading.Event()
+    builds = []
+
+    def build():
+        builds.append(1)
+        started.set()
+        release.wait(5)
+        return pd.DataFrame({'x': [1, 2]})
+
+    with ThreadPoolExecutor(4) as executor:
+        owner = executor.submit(cache.get_or_build, 'df', build)
+        started.wait(5)
+        waiters = [executor.submit(cache.get_or_build, 'df', build) for _ in range(3)]
+        release.set()
+        values = [owner.result()] + [future.result() for future in waiters]
+    assert len(builds) == 1 and all(value is values[0] for value in values)
+    # 공유 결과는 읽기 전용
+    with pytest.raises(ValueError):
+        values[0].iloc[0, 0] = 3
+
+    def fail():
+        raise RuntimeError('build failed')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_build('bad', fail)
+    assert 'bad' not in cache
+    assert cache.get_or_build('bad', lambda: 1) == 1
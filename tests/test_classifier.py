@@ -0,0 +1,62 @@
+import os
+import warnings
+
+import pytest
+
+from keyword_analysis import pipeline, rules
+from keyword_analysis.classifier import KeywordClassifier, classify_with_regex, find_mismatches, generate_keywords
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_data', 'sample.xlsx')
+FILTERS = (rules.unsuitable_filters, rules.suitable_filters, rules.additional_filters)
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    return KeywordClassifier(*FILTERS)
+
+
+@pytest.fixture(scope='module')
+def sample_keywords():
+    with open(SAMPLE_PATH, 'rb') as f:
+        return pipeline.read_workbook(f.read())['연관키워드'].astype(str).tolist()
+
+
+@pytest.fixture(autouse=True)
+def quiet_regex_warnings():
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='This pattern is interpreted as a regular expression')
+        yield
+
+
+# 기본 규칙은 모두 오토마톤으로 평가 (정규식 대체 평가 없음)
+def test_default_rules_use_automaton(classifier):
+    assert [rule.name for rule in classifier.rules if not rule.uses_automaton] == []
+
+
+def test_sample_matches_regex(classifier, sample_keywords):
+    assert find_mismatches(classifier, sample_keywords, *FILTERS) == []
+    normalized = [pipeline.normalize_keyword(keyword) for keyword in sample_keywords]
+    assert find_mismatches(classifier, normalized, *FILTERS) == []
+
+
+def test_generated_keywords_match_regex(classifier):
+    keywords = generate_keywords(classifier, 20000, seed=0)
+    assert find_mismatches(classifier, keywords, *FILTERS) == []
+    # 생성 데이터가 전방탐색(?=)/부정 탐색(?!) 규칙을 실제로 거치는지 확인
+    _, details = classify_with_regex(keywords, *FILTERS)
+    lookahead_rules = {
+        name for filters in FILTERS for name, pattern in filters.items() if '(?=' in pattern or '(?!' in pattern
+    }
+    assert len(lookahead_rules & set(details)) >= len(lookahead_rules) // 2
+
+
+# 전방탐색/부정 탐색 모양별 경계 사례
+@pytest.mark.parametrize('keyword', [
+    '고등 영어', '고등 초등 영어', '초등 고등', '고등 국제학교',
+    '중국어 학원', '중국어 영어', '중국어 글로벌', '영어 중국어',
+    '토익 초등', '초등 토익', '캠프 온라인', '온라인 캠프', '캠프',
+    '육아 영어', '영어 육아', '육아', '대치 초등', '초등 대치', '대치 영어학원 초등',
+    '영어문법 초등', '초등 영어문법', '온라인 영어', '', ' ', '\n영어',
+])
+def test_lookahead_edge_cases_match_regex(classifier, keyword):
+    assert find_mismatches(classifier, [keyword], *FILTERS) == []
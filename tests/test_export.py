@@ -0,0 +1,104 @@
+import io
+import os
+import zipfile
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from keyword_analysis import pipeline, rules
+from keyword_analysis.export import bundle_parts, prepare_export, write_bundle
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_data', 'sample.xlsx')
+NAME = '결과'
+
+
+@pytest.fixture(scope='module')
+def final_df():
+    with open(SAMPLE_PATH, 'rb') as f:
+        data = f.read()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(pipeline, 'compact_enabled', False)
+        mp.setattr(pipeline, 'label_store_enabled', False)
+        return pipeline.classify_keywords(pipeline.clean_frame(pipeline.read_workbook(data)))
+
+
+@pytest.fixture(scope='module')
+def categories():
+    return list(rules.load_ruleset().qualitative_groups) + ['미분류']
+
+
+def _bundle(final_df, categories, fmt):
+    output = io.BytesIO()
+    calls = []
+    written = write_bundle(final_df, output, fmt, categories, splits=pipeline.split_categories, name=NAME,
+                           progress=lambda done, total, filename: calls.append((done, total, filename)))
+    return zipfile.ZipFile(output), written, calls
+
+
+# 분류별/분할별 파일은 정렬된 전체 데이터를 질적 분류(와 키워드_분류)로 거른 것과 같아야 함
+def test_bundle_parts_match_filters(final_df, categories):
+    df, _ = prepare_export(final_df)
+    parts = bundle_parts(df, categories, splits=pipeline.split_categories)
+    qualitative = df['키워드_분류_질적'].astype(str)
+
+    expected = []
+    for category in categories:
+        if (qualitative == category).any():
+            expected.append(category)
+            for label in pipeline.split_categories.get(category, []):
+                if ((qualitative == category) & (df['키워드_분류'].astype(str) == label)).any():
+                    expected.append(f'{category}_{label}')
+    assert [name for name, _, _ in parts] == expected
+    for name, _, rows in parts:
+        category, _, label = name.partition('_')
+        mask = qualitative == category
+        if label:
+            mask &= df['키워드_분류'].astype(str) == label
+        pd.testing.assert_frame_equal(df.take(rows), df[mask])
+
+
+def test_parquet_bundle_contents(final_df, categories):
+    bundle, written, calls = _bundle(final_df, categories, 'parquet')
+    df, stats = prepare_export(final_df)
+    parts = bundle_parts(df, categories, splits=pipeline.split_categories)
+
+    assert bundle.namelist() == written
+    assert written == [f'{NAME}_분류결과.parquet', f'{NAME}_통계.parquet'] + [f'분류별/{name}.parquet' for name, _, _ in parts]
+    assert calls == [(i, len(written), filename) for i, filename in enumerate(written, 1)]
+
+    # 각 항목은 해당 DataFrame 을 바로 to_parquet 으로 저장한 것과 같아야 함
+    def check(filename, expected):
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(io.BytesIO(bundle.read(filename))), pd.read_parquet(io.BytesIO(expected.to_parquet(index=False)))
+        )
+
+    check(written[0], df)
+    check(written[1], stats.reset_index())
+    for name, _, rows in parts:
+        check(f'분류별/{name}.parquet', df.take(rows))
+
+
+def test_csv_and_xlsx_bundle_contents(final_df, categories):
+    df, _ = prepare_export(final_df)
+    parts = bundle_parts(df, categories, splits=pipeline.split_categories)
+
+    bundle, written, _ = _bundle(final_df, categories, 'csv')
+    assert bundle.read(written[0]).startswith('\ufeff'.encode('utf-8'))
+    for name, _, rows in parts:
+        part = pd.read_csv(io.BytesIO(bundle.read(f'분류별/{name}.csv')), encoding='utf-8-sig')
+        assert part['연관키워드'].astype(str).tolist() == df['연관키워드'].take(rows).astype(str).tolist()
+
+    bundle, written, _ = _bundle(final_df, categories, 'xlsx')
+    assert written == [f'{NAME}.xlsx'] + [f'분류별/{name}.xlsx' for name, _, _ in parts]
+    workbook = openpyxl.load_workbook(io.BytesIO(bundle.read(written[0])), read_only=True)
+    assert workbook.sheetnames == ['통계', '원본데이터']
+    for name, sheet_name, rows in parts:
+        sheet = openpyxl.load_workbook(io.BytesIO(bundle.read(f'분류별/{name}.xlsx')), read_only=True).worksheets[0]
+        assert sheet.title == sheet_name[:31]
+        assert sheet.max_row == len(rows) + 1
+
+
+def test_bundle_rejects_unknown_format(final_df):
+    with pytest.raises(ValueError):
+        write_bundle(final_df, io.BytesIO(), 'json')
@@ -0,0 +1,17 @@
+from keyword_analysis.classifier import KeywordClassifier
+from keyword_analysis.guard import TIMEOUT_DETAIL, classify_guarded, guard_enabled
+
+
+# 지수 시간 역추적 규칙 ((a+)+) 은 정규식으로 평가되고, 한도를 넘긴 키워드만 '평가 시간 초과' 로 표시
+def test_classify_guarded_times_out_pathological_rule():
+    classifier = KeywordClassifier({}, {'위험 규칙': '^(a+)+$'}, {'영어': '영어'})
+    assert [rule.name for rule in classifier.risky_regex_rules] == ['위험 규칙']
+    assert guard_enabled(classifier, 'auto')
+
+    slow = 'a' * 40 + 'b'
+    keywords = ['aaa', slow, '영어 학원', '수학']
+    labels, details, timed_out = classify_guarded(classifier, keywords, budget=0.5, chunk_size=2)
+
+    assert timed_out == [slow]
+    assert list(details) == ['위험 규칙', TIMEOUT_DETAIL, '영어', '미분류']
+    assert list(labels) == ['적합', '미분류', '확장 가능 키워드', '미분류']
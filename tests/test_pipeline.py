@@ -0,0 +1,181 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from keyword_analysis import pipeline
+from keyword_analysis.cache import FrameCache
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_data', 'sample.xlsx')
+
+
+@pytest.fixture
+def sample_bytes():
+    with open(SAMPLE_PATH, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture(autouse=True)
+def default_mode(monkeypatch):
+    monkeypatch.setattr(pipeline, 'compact_enabled', False)
+    monkeypatch.setattr(pipeline, 'label_store_enabled', False)
+
+
+def _cache(tmp_path, name):
+    return FrameCache(str(tmp_path / name), readonly_dirs=())
+
+
+# 스트리밍 결과와 캐시가 read_excel 경로와 값/형식까지 같아야 함
+def test_stream_workbook_matches_read_excel(tmp_path, sample_bytes):
+    key = pipeline.content_hash(sample_bytes)
+    expected = pipeline.classify_keywords(pipeline.load_cleaned(sample_bytes, key, _cache(tmp_path, 'plain')))
+
+    stream_cache = _cache(tmp_path, 'stream')
+    streamed = pipeline.stream_workbook(sample_bytes, key, size=100, cache=stream_cache)
+    pd.testing.assert_frame_equal(streamed.reset_index(drop=True), expected.reset_index(drop=True), check_exact=True)
+
+    # 스트리밍이 저장한 캐시를 읽는 일반 경로도 같은 결과
+    cleaned = pipeline.load_cleaned(sample_bytes, key, stream_cache)
+    reloaded = pipeline.classify_keywords(cleaned)
+    pd.testing.assert_frame_equal(reloaded.reset_index(drop=True), expected.reset_index(drop=True), check_exact=True)
+
+
+def _metrics_frame(rows):
+    df = pd.DataFrame(rows, columns=['연관키워드', '월간검색수(PC)'])
+    for col in pipeline.numeric_columns[1:]:
+        df[col] = 1
+    for col in pipeline.ctr_columns:
+        df[col] = 0.5
+    df['연관키워드'] = df['연관키워드'].astype(pipeline.keyword_dtype)
+    return pipeline.add_totals(df)
+
+
+# 파일 a, b, c 에 같은 키워드 '영어' (b 의 검색수가 가장 큼), '파닉스' 는 a 에만 있음
+@pytest.mark.parametrize('policy, expected_value, expected_source', [
+    ('latest', 20, 'c'),
+    ('max', 40, 'b'),
+    ('mean', 23, '병합'),
+    ('sum', 70, '병합'),
+])
+def test_merge_policy_source_file(policy, expected_value, expected_source):
+    frames = [
+        _metrics_frame([('영어', 10), ('파닉스', 5)]),
+        _metrics_frame([('영어', 40)]),
+        _metrics_frame([('영어', 20)]),
+    ]
+    merged = pipeline.merge_frames(frames, policy, ['a', 'b', 'c']).set_index('연관키워드')
+    assert merged.loc['영어', '월간검색수(PC)'] == expected_value
+    assert merged.loc['영어', '출처_파일'] == expected_source
+    assert merged.loc['영어', '중복_횟수'] == 3
+    assert merged.loc['파닉스', '출처_파일'] == 'a'
+
+
+def test_merge_policy_first_has_no_source_file():
+    frames = [_metrics_frame([('영어', 10)]), _metrics_frame([('영어', 40)])]
+    merged = pipeline.merge_frames(frames, 'first', ['a', 'b'])
+    assert '출처_파일' not in merged.columns
+    assert merged['월간검색수(PC)'].tolist() == [10]
+
+
+# 압축 형식으로 통합할 때 라벨 범주는 파일을 분류한 규칙 세트를 따름
+@pytest.mark.parametrize('policy', ['first', 'max'])
+def test_merge_frames_compact_uses_ruleset_categories(tmp_path, monkeypatch, policy):
+    import json
+
+    from keyword_analysis import rules
+
+    doc = {
+        'name': 'mini', 'version': 1,
+        'suitable_filters': {'수학 교재': '수학'}, 'additional_filters': {}, 'unsuitable_filters': {},
+        'qualitative_groups': {'테스트 그룹': ['수학 교재']},
+    }
+    (tmp_path / 'mini.json').write_text(json.dumps(doc, ensure_ascii=False), encoding='utf-8')
+    monkeypatch.setattr(rules, 'rules_dir', str(tmp_path))
+
+    frames = [
+        pipeline.classify_keywords(_metrics_frame([('수학 문제집', 10), ('영어', 1)]), 'mini'),
+        pipeline.classify_keywords(_metrics_frame([('수학 문제집', 40)]), 'mini'),
+    ]
+    monkeypatch.setattr(pipeline, 'compact_enabled', True)
+    merged = pipeline.merge_frames(frames, policy, ['a', 'b'], 'mini').set_index('연관키워드')
+    assert '수학 교재' in merged['키워드_상세분류'].cat.categories
+    assert merged.loc['수학 문제집', '키워드_상세분류'] == '수학 교재'
+    assert merged.loc['수학 문제집', '키워드_분류_질적'] == '테스트 그룹'
+
+
+# mean 은 지표 값이 있던 파일만으로 평균 (지표가 없거나 빈 파일은 0 으로 세지 않음)
+def test_merge_policy_mean_ignores_missing_values():
+    with_value = _metrics_frame([('영어', 10), ('파닉스', 5)])
+    empty_ad = _metrics_frame([('영어', 30)])
+    empty_ad['월평균노출 광고수'] = np.nan
+    missing_ctr = _metrics_frame([('영어', 20)]).drop(columns=['월평균클릭률(PC)'])
+    with_value['월평균노출 광고수'] = 5
+    with_value['월평균클릭률(PC)'] = 0.9
+
+    merged = pipeline.merge_frames([with_value, empty_ad, missing_ctr], 'mean').set_index('연관키워드')
+    assert merged.loc['영어', '월간검색수(PC)'] == 20
+    assert merged.loc['영어', '월평균노출 광고수'] == 3  # (5 + 1) / 2 파일
+    assert merged.loc['영어', '월평균클릭률(PC)'] == pytest.approx((0.9 + 0.5) / 2)
+    assert merged.loc['영어', '중복_횟수'] == 3
+
+
+@pytest.fixture
+def classified(sample_bytes):
+    df = pipeline.merge_frames([pipeline.classify_keywords(pipeline.clean_frame(pipeline.read_workbook(sample_bytes)))])
+    # NaN 과 같은 값이 섞인 지표 (NaN 은 마지막, 같은 값은 원래 순서)
+    df.loc[df.index[::7], '월평균클릭률(PC)'] = np.nan
+    df['총 검색수'] = df['총 검색수'] // 100
+    return df
+
+
+def _plain_order(df, column, ascending=False):
+    return df.sort_values(column, ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+
+
+# 분류별 색인은 일반 pandas 필터/정렬/집계와 같아야 함
+def test_category_index_matches_pandas(classified):
+    df = classified.reset_index(drop=True)
+    index = pipeline.category_index(df, top_k=10)
+    categories = df['키워드_분류_질적'].astype(str)
+    labels = df['키워드_분류'].astype(str)
+
+    keys = [(category, categories == category) for category in categories.unique()]
+    for category in pipeline.split_categories:
+        keys += [((category, label), (categories == category) & (labels == label))
+                 for label in labels[categories == category].unique()]
+    assert set(index['rows']) == {key for key, _ in keys}
+    for key, mask in keys:
+        np.testing.assert_array_equal(index['rows'][key], np.flatnonzero(mask))
+        for metric in pipeline.sample_metrics:
+            np.testing.assert_array_equal(index['top'][(key, metric)], _plain_order(df[mask], metric)[:10])
+
+    means = df.groupby('키워드_분류_질적', observed=True)[pipeline.sample_metrics].mean()
+    for category, values in index['means'].items():
+        assert values == pytest.approx(means.loc[category].to_dict(), nan_ok=True)
+    for category, counts in index['details'].items():
+        expected = df[categories == category]['키워드_상세분류'].value_counts()
+        assert counts[counts > 0].sort_index().to_dict() == expected[expected > 0].sort_index().to_dict()
+
+
+# 분류 탐색의 정렬/상세분류 필터/페이지는 일반 pandas 필터/정렬 결과를 자른 것과 같아야 함
+@pytest.mark.parametrize('column, ascending', [('총 검색수', False), ('월평균클릭률(PC)', True), ('월평균클릭률(PC)', False)])
+def test_sorted_positions_and_pages_match_pandas(classified, column, ascending):
+    df = classified.reset_index(drop=True)
+    index = pipeline.category_index(df)
+    category = df['키워드_분류_질적'].astype(str).value_counts().index[0]
+    details = df.loc[index['rows'][category], '키워드_상세분류'].astype(str).value_counts().index[:2].tolist()
+
+    order = pipeline.sorted_positions(df, index['rows'][category], column, ascending, details)
+    subset = df[(df['키워드_분류_질적'].astype(str) == category) & df['키워드_상세분류'].isin(details)]
+    expected = _plain_order(subset, column, ascending)
+    np.testing.assert_array_equal(order, expected)
+
+    page_size = 25
+    pages = -(-len(order) // page_size)
+    columns = ['연관키워드', column]
+    for page in (1, 2, pages):
+        page_df = pipeline.page_frame(df, order, page, page_size, columns)
+        rows = expected[(page - 1) * page_size:page * page_size]
+        pd.testing.assert_frame_equal(page_df, df.loc[rows, columns])
+    assert pipeline.page_frame(df, order, pages + 1, page_size).empty
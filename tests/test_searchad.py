@@ -0,0 +1,100 @@
+import time
+
+import pytest
+import requests
+
+from keyword_analysis import pipeline, searchad
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**options):
+        server, url = searchad.start_stub_server(**options)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def _client(url, **options):
+    options.setdefault('cache', searchad.ResponseCache(ttl_hours=0))
+    options.setdefault('backoff', 0.01)
+    return searchad.SearchAdClient(base_url=url, **searchad.stub_credentials, **options)
+
+
+SEEDS = [f'영어{i}' for i in range(12)]
+
+
+# 시드 12개 → 5개씩 3번 요청, 결과는 묶음 순서대로
+def test_fetch_batches_seeds_in_order(stub):
+    server, url = stub()
+    progress = []
+    with _client(url, rate=0) as client:
+        df = client.fetch(SEEDS + ['영어 0', '영어0'], lambda done, total: progress.append((done, total)))
+    assert server.request_count == 3
+    assert progress[-1] == (3, 3)
+    assert list(df.columns) == pipeline.raw_columns
+    assert len(df) == len(SEEDS) * len(searchad._stub_suffixes)
+    assert df['연관키워드'].tolist()[:2] == ['영어0', '영어0추천']
+    assert df['연관키워드'].is_unique
+
+
+# 429 응답은 지수 백오프로 재시도해 빠짐없이 수집
+def test_fetch_retries_rate_limited_requests(stub):
+    server, url = stub(fail_every=2)
+    with _client(url, rate=0, workers=1) as client:
+        df = client.fetch(SEEDS)
+        sent = client.requests_sent
+    assert len(df) == len(SEEDS) * len(searchad._stub_suffixes)
+    assert sent == server.request_count
+    assert sent > 3
+
+
+def test_invalid_signature_is_not_retried(stub):
+    server, url = stub(secret_key='other')
+    with _client(url, rate=0) as client:
+        with pytest.raises(requests.HTTPError):
+            client.fetch(SEEDS[:1])
+    assert server.request_count == 1
+
+
+# 초당 요청 수 제한: 여러 스레드에서 요청해도 1/rate 초 간격으로 시작
+def test_rate_limit_spaces_requests(stub):
+    _, url = stub()
+    start = time.monotonic()
+    with _client(url, rate=10, workers=4) as client:
+        client.fetch(SEEDS + [f'수학{i}' for i in range(8)])
+    assert time.monotonic() - start >= 0.3 - 0.01  # 4번 요청 → 최소 3 간격
+
+
+def test_response_cache_skips_repeated_requests(stub, tmp_path):
+    server, url = stub()
+    cache = searchad.ResponseCache(str(tmp_path), ttl_hours=1)
+    with _client(url, rate=0, cache=cache) as client:
+        first = client.fetch(SEEDS)
+    with _client(url, rate=0, cache=cache) as client:
+        second = client.fetch(SEEDS)
+        assert client.requests_sent == 0 and client.cache_hits == 3
+    assert server.request_count == 3
+    assert first.equals(second)
+
+
+# 키워드 도구 형식 엑셀 → 업로드 파일과 같은 경로로 분석
+def test_fetch_workbook_is_keyword_tool_xlsx(stub, monkeypatch):
+    monkeypatch.setattr(pipeline, 'label_store_enabled', False)
+    _, url = stub()
+    data = searchad.fetch_workbook(
+        SEEDS[:2], base_url=url, rate=0, cache=searchad.ResponseCache(ttl_hours=0), **searchad.stub_credentials
+    )
+    raw = pipeline.read_workbook(data, columns=None)
+    assert list(raw.columns) == pipeline.raw_columns
+    assert len(raw) == 2 * len(searchad._stub_suffixes)
+
+    final_df = pipeline.classify_keywords(pipeline.clean_frame(pipeline.read_workbook(data)))
+    assert len(final_df) == len(raw)
+    assert set(final_df['키워드_분류']) <= {'적합', '확장 가능 키워드', '부적합', '미분류'}
+    assert (final_df['월간검색수(PC)'] >= 0).all()
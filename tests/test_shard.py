@@ -0,0 +1,50 @@
+import os
+
+import pandas as pd
+import pytest
+
+from keyword_analysis import cache, cli, pipeline, shard
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_data', 'sample.xlsx')
+
+
+@pytest.fixture(autouse=True)
+def default_mode(monkeypatch, tmp_path):
+    monkeypatch.setattr(pipeline, 'compact_enabled', False)
+    monkeypatch.setattr(pipeline, 'label_store_enabled', False)
+    monkeypatch.setattr(cache, 'default_cache_dir', str(tmp_path / 'cache'))
+    monkeypatch.setattr(shard, 'shard_min_keywords', 1)
+    yield
+    if shard._pool is not None:
+        shard._pool.shutdown()
+    shard._pool, shard._pool_workers = None, 0
+
+
+# 파일 하나는 작업 프로세스 없이 실행되어 분류를 여러 프로세스로 나누고, 결과는 나누지 않은 것과 같아야 함
+def test_single_file_cli_shards(monkeypatch, tmp_path):
+    pools = []
+    get_pool = shard._get_pool
+
+    def spy(workers):
+        pools.append(workers)
+        return get_pool(workers)
+
+    monkeypatch.setattr(shard, '_get_pool', spy)
+    results = {}
+    for workers in (1, 2):
+        monkeypatch.setattr(shard, 'classify_workers', workers)
+        output_dir = tmp_path / f'out{workers}'
+        assert cli.main([SAMPLE_PATH, '-o', str(output_dir), '-f', 'parquet']) == 0
+        results[workers] = pd.read_parquet(output_dir / 'sample_분류결과.parquet')
+
+    assert pools == [2]
+    pd.testing.assert_frame_equal(results[2], results[1])
+
+
+# 파일별 작업 프로세스는 남는 코어를 나눠 받아 그 수만큼 분류를 나눔
+def test_pool_workers_share_cores(monkeypatch):
+    monkeypatch.setattr(shard, 'classify_workers', None)
+    monkeypatch.setattr(os, 'cpu_count', lambda: 8)
+    with pipeline.make_process_pool(2) as pool:
+        assert pool.submit(shard.resolve_workers, 1).result() == 4
+    assert shard.resolve_workers(0) == 1